@@ -0,0 +1,100 @@
+import dataclasses
+import gc
+import importlib.metadata
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Optional
+
+SEED = 20240101
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """
+    Result of one benchmark. Timings are seconds per operation of each repeat,
+    `ops_per_second` is computed from the fastest repeat, which is the least affected by noise.
+    """
+    name: str
+    number: int
+    timings: list[float]
+    params: dict[str, Any] = dataclasses.field(default_factory=dict)
+    memory_bytes: Optional[int] = None
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1 / self.best if self.best > 0 else float('inf')
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'params': self.params,
+            'number': self.number,
+            'repeat': len(self.timings),
+            'best': self.best,
+            'median': self.median,
+            'ops_per_second': self.ops_per_second,
+            'memory_bytes': self.memory_bytes,
+            'timings': self.timings
+        }
+
+
+def measure(func: Callable[[], Any], *, number: int, repeat: int, warmup: int = 1) -> list[float]:
+    """
+    Calls `func` `number` times per repeat and returns seconds per call of each repeat.
+    Garbage collection is disabled while timing, like in `timeit`.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+
+            for _ in range(number):
+                func()
+
+            timings.append((time.perf_counter() - started_at) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return timings
+
+
+def get_environment() -> dict[str, Any]:
+    """
+    Returns versions and host details which affect results, so that runs on different setups are not compared blindly.
+    """
+    packages = {}
+
+    for package in ('eandb', 'pydantic', 'pydantic-core', 'httpx', 'httpcore'):
+        try:
+            packages[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            packages[package] = None
+
+    return {
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+        'seed': SEED
+    }
@@ -0,0 +1,98 @@
+import argparse
+import json
+import random
+import sys
+from typing import Optional
+
+from benchmarks import SEED, get_environment
+from benchmarks import client, imports, parsing
+
+SUITES = ('parsing', 'client', 'imports')
+
+
+def run(args: argparse.Namespace) -> dict:
+    random.seed(SEED)
+    results = []
+
+    if 'parsing' in args.suites:
+        factors = (1, 10) if args.quick else parsing.FACTORS
+        results += parsing.run(repeat=args.repeat, target_time=0.02 if args.quick else 0.2, factors=factors)
+
+    if 'client' in args.suites:
+        results += client.run(repeat=args.repeat, requests=200 if args.quick else 2000)
+
+    if 'imports' in args.suites:
+        results += imports.run(repeat=args.repeat * 2)
+
+    return {
+        'environment': get_environment(),
+        'settings': {'suites': args.suites, 'repeat': args.repeat, 'quick': args.quick},
+        'results': [result.to_dict() for result in results]
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Prints change of the best timing of each benchmark found in both reports and returns names of regressions,
+    i.e. benchmarks slower than the baseline by more than `threshold` (a fraction).
+    """
+    baseline_results = {result['name']: result for result in baseline['results']}
+    regressions = []
+
+    if baseline['environment']['packages'] != report['environment']['packages']:
+        print('Warning: package versions differ from the baseline', file=sys.stderr)
+
+    for result in report['results']:
+        if result['name'] not in baseline_results:
+            continue
+
+        change = result['best'] / baseline_results[result['name']]['best'] - 1
+        print(f'{result["name"]:<60} {change:+7.1%}', file=sys.stderr)
+
+        if change > threshold:
+            regressions.append(result['name'])
+
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Runs parsing, client and import time benchmarks and writes results as JSON.'
+    )
+    parser.add_argument('suites', nargs='*', help=f'Suites to run: {", ".join(SUITES)}, all by default')
+    parser.add_argument('-o', '--output', default='-', help='Output JSON file, `-` for stdout')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed repeats of each benchmark')
+    parser.add_argument('--quick', action='store_true', help='Smaller payloads and batches for a fast smoke run')
+    parser.add_argument('--compare', help='JSON file of a previous run to compare with')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1, help='Slowdown fraction reported as a regression, 0.1 by default'
+    )
+    args = parser.parse_args(argv)
+    args.suites = args.suites or list(SUITES)
+
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f'Unknown suite: {suite}')
+
+    report = run(args)
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+        if regressions:
+            print(f'Regressions: {", ".join(regressions)}', file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import random
+from typing import Callable
+
+import httpx
+
+from benchmarks import SEED, BenchmarkResult, measure
+from benchmarks.parsing import SAMPLES_DIR
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient
+
+SAMPLES = ('basic', 'food')
+
+
+def get_barcodes(count: int, *, seed: int = SEED) -> list[str]:
+    """
+    Returns `count` distinct pseudo-random 13-digit barcodes, the same for the same seed.
+    """
+    rng = random.Random(seed)
+    return [f'{value:013d}' for value in rng.sample(range(10 ** 12), count)]
+
+
+def get_handler(payload: bytes) -> Callable[[httpx.Request], httpx.Response]:
+    """
+    Returns in-process transport handler which answers every product request with `payload`,
+    so that only the client overhead is measured.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=payload, headers={'Content-Type': 'application/json'})
+
+    return handler
+
+
+def _run_sync(payload: bytes, barcodes: list[str], concurrency: int, repeat: int, lazy_metadata: bool) -> list[float]:
+    transport = httpx.MockTransport(get_handler(payload))
+
+    with EandbV2SyncClient(jwt='benchmark', lazy_metadata=lazy_metadata, transport=transport) as client:
+        timings = measure(lambda: client.get_products(barcodes, concurrency=concurrency), number=1, repeat=repeat)
+
+    return [timing / len(barcodes) for timing in timings]
+
+
+def _run_async(payload: bytes, barcodes: list[str], concurrency: int, repeat: int, lazy_metadata: bool) -> list[float]:
+    transport = httpx.MockTransport(get_handler(payload))
+    loop = asyncio.new_event_loop()
+
+    try:
+        client = EandbV2AsyncClient(jwt='benchmark', lazy_metadata=lazy_metadata, transport=transport)
+        timings = measure(
+            lambda: loop.run_until_complete(client.get_products(barcodes, concurrency=concurrency)),
+            number=1,
+            repeat=repeat
+        )
+        loop.run_until_complete(client.aclose())
+    finally:
+        loop.close()
+
+    return [timing / len(barcodes) for timing in timings]
+
+
+def run(*, repeat: int = 5, requests: int = 2000, concurrency: int = 50) -> list[BenchmarkResult]:
+    """
+    Measures end-to-end throughput of `get_products` of sync and async clients against an in-process transport.
+    Timings are seconds per request.
+
+    :param repeat: Number of timed batches of each benchmark
+    :param requests: Number of distinct barcodes in a batch
+    :param concurrency: Concurrency of batch methods
+    """
+    barcodes = get_barcodes(requests)
+    results = []
+
+    for sample in SAMPLES:
+        payload = (SAMPLES_DIR / f'{sample}.json').read_bytes()
+        # Re-encoded without indentation, like the API does
+        payload = json.dumps(json.loads(payload)).encode()
+
+        for client_name, run_client in (('sync', _run_sync), ('async', _run_async)):
+            for lazy_metadata in (False, True):
+                results.append(BenchmarkResult(
+                    name=f'client.{client_name}.{sample}' + ('.lazy' if lazy_metadata else ''),
+                    number=requests,
+                    timings=run_client(payload, barcodes, concurrency, repeat, lazy_metadata),
+                    params={
+                        'client': client_name,
+                        'sample': sample,
+                        'lazy_metadata': lazy_metadata,
+                        'requests': requests,
+                        'concurrency': concurrency,
+                        'payload_bytes': len(payload)
+                    }
+                ))
+
+    return results
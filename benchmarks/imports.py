@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+
+from benchmarks import BenchmarkResult
+from benchmarks.parsing import SAMPLES_DIR
+
+# Each scenario runs in a fresh interpreter and prints its duration in seconds
+_SCENARIOS = {
+    'import.models': '''
+import time
+started_at = time.perf_counter()
+import eandb.models.v2
+print(time.perf_counter() - started_at)
+''',
+    'import.clients': '''
+import time
+started_at = time.perf_counter()
+import eandb.clients.v2
+print(time.perf_counter() - started_at)
+''',
+    # Cold start of a process doing a single lookup: import, client construction and the first parsed response
+    'first_call.sync': '''
+import time
+started_at = time.perf_counter()
+import httpx
+from eandb.clients.v2 import EandbV2SyncClient
+transport = httpx.MockTransport(lambda request: httpx.Response(200, content=PAYLOAD))
+with EandbV2SyncClient(jwt='benchmark', transport=transport) as client:
+    client.get_product('123')
+print(time.perf_counter() - started_at)
+'''
+}
+
+
+def _run_scenario(code: str, payload: bytes) -> float:
+    output = subprocess.run(
+        [sys.executable, '-c', f'PAYLOAD = {payload!r}\n{code}'], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output)
+
+
+def run(*, repeat: int = 10) -> list[BenchmarkResult]:
+    """
+    Measures import time of the package and time to the first parsed response in fresh interpreters.
+
+    :param repeat: Number of interpreters started for each scenario
+    """
+    payload = json.dumps(json.loads((SAMPLES_DIR / 'food.json').read_bytes())).encode()
+
+    return [
+        BenchmarkResult(
+            name=name, number=1, timings=[_run_scenario(code, payload) for _ in range(repeat)], params={'repeat': repeat}
+        )
+        for name, code in _SCENARIOS.items()
+    ]
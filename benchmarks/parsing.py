@@ -0,0 +1,117 @@
+import copy
+import json
+import pathlib
+import random
+import string
+import tracemalloc
+from typing import Any, Iterator
+
+from benchmarks import SEED, BenchmarkResult, measure
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+
+SAMPLES_DIR = pathlib.Path(__file__).parent.parent / 'tests' / 'samples'
+FACTORS = (1, 10, 100)
+MODELS = {'ProductResponse': ProductResponse, 'LazyProductResponse': LazyProductResponse}
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choices(string.ascii_letters + ' ', k=max(length, 1)))
+
+
+def _repeat_lists(value: Any, factor: int) -> Any:
+    # Only outermost lists are repeated, so that nested lists (e.g. ingredients of groups) don't grow exponentially
+    if isinstance(value, list):
+        return [copy.deepcopy(item) for _ in range(factor) for item in value]
+
+    if isinstance(value, dict):
+        return {key: _repeat_lists(item, factor) for key, item in value.items()}
+
+    return value
+
+
+def enlarge(data: dict, factor: int, *, seed: int = SEED) -> dict:
+    """
+    Returns a copy of the response about `factor` times larger: metadata lists are repeated,
+    titles get extra languages and categories and images get distinct ids and urls.
+    The same seed gives the same payload.
+    """
+    if factor == 1:
+        return data
+
+    rng = random.Random(seed + factor)
+    data = copy.deepcopy(data)
+    product = data['product']
+
+    for i in range(len(product['titles']) * (factor - 1)):
+        product['titles'][f'x{i}'] = _random_text(rng, 40)
+
+    product['categories'] = [
+        {'id': f'{category["id"]}{i}', 'titles': {language: _random_text(rng, len(title))
+                                                  for language, title in category['titles'].items()}}
+        for i in range(factor) for category in product['categories']
+    ]
+    product['images'] = [
+        {**image, 'url': f'{image["url"]}?v={i}'} for i in range(factor) for image in product['images']
+    ]
+
+    if product.get('metadata'):
+        product['metadata'] = _repeat_lists(product['metadata'], factor)
+
+    return data
+
+
+def iter_payloads(factors: tuple[int, ...] = FACTORS) -> Iterator[tuple[str, int, bytes]]:
+    """
+    Yields name of a sample, enlargement factor and JSON payload for every sample in `tests/samples/`.
+    """
+    for path in sorted(SAMPLES_DIR.glob('*.json')):
+        data = json.loads(path.read_text())
+
+        for factor in factors:
+            yield path.stem, factor, json.dumps(enlarge(data, factor)).encode()
+
+
+def get_memory_per_object(model: type[ProductResponse], payload: bytes, count: int = 100) -> int:
+    """
+    Returns memory retained by one parsed response in bytes, averaged over `count` objects.
+    """
+    tracemalloc.start()
+
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = [model.model_validate_json(payload) for _ in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del objects
+    return (after - before) // count
+
+
+def run(*, repeat: int = 5, target_time: float = 0.2, factors: tuple[int, ...] = FACTORS) -> list[BenchmarkResult]:
+    """
+    Measures validation throughput and memory of every sample payload with each response model.
+
+    :param repeat: Number of timed repeats of each benchmark
+    :param target_time: Approximate duration of one repeat in seconds, used to choose the number of calls
+    :param factors: Enlargement factors of sample payloads
+    """
+    results = []
+
+    for sample, factor, payload in iter_payloads(factors):
+        for model_name, model in MODELS.items():
+            parse = lambda: model.model_validate_json(payload)  # noqa: E731
+
+            # Calibrated once per payload, so that repeats are comparable to each other
+            single = min(measure(parse, number=1, repeat=3))
+            number = max(1, int(target_time / single)) if single > 0 else 1000
+
+            results.append(BenchmarkResult(
+                name=f'parsing.{sample}.x{factor}.{model_name}',
+                number=number,
+                timings=measure(parse, number=number, repeat=repeat),
+                params={'sample': sample, 'factor': factor, 'model': model_name, 'payload_bytes': len(payload)},
+                memory_bytes=get_memory_per_object(model, payload)
+            ))
+
+    return results
@@ -0,0 +1,162 @@
+import enum
+from typing import Iterable, Optional
+
+
+class BarcodeType(enum.Enum):
+    EAN8 = enum.auto()
+    EAN13 = enum.auto()
+    UPCA = enum.auto()
+    UPCE = enum.auto()
+    ISBN10 = enum.auto()
+    ISBN13 = enum.auto()
+
+
+_ZERO = ord('0')
+
+
+def _gtin_check_digit(body: bytes) -> int:
+    # Digits are weighted 3, 1, 3, ... starting from the rightmost digit of the body
+    reversed_body = body[::-1]
+    weighted_by_3 = reversed_body[::2]
+    weighted_by_1 = reversed_body[1::2]
+    total = 3 * (sum(weighted_by_3) - _ZERO * len(weighted_by_3)) + sum(weighted_by_1) - _ZERO * len(weighted_by_1)
+    return (10 - total % 10) % 10
+
+
+def _is_valid_gtin(code: bytes) -> bool:
+    return _gtin_check_digit(code[:-1]) == code[-1] - _ZERO
+
+
+def _expand_upce(code: str) -> Optional[str]:
+    """
+    Expands 8-digit UPC-E code (number system, 6 digits, check digit) to 12-digit UPC-A code.
+    """
+    number_system, digits, check_digit = code[0], code[1:7], code[7]
+
+    if number_system not in '01':
+        return None
+
+    last = digits[5]
+
+    if last in '012':
+        body = digits[:2] + last + '0000' + digits[2:5]
+    elif last == '3':
+        body = digits[:3] + '00000' + digits[3:5]
+    elif last == '4':
+        body = digits[:4] + '00000' + digits[4]
+    else:
+        body = digits[:5] + '0000' + last
+
+    return number_system + body + check_digit
+
+
+def _is_valid_isbn10(code: str) -> bool:
+    if not code[:9].isdigit() or not (code[9].isdigit() or code[9] in 'Xx'):
+        return False
+
+    total = sum((10 - i) * (ord(c) - _ZERO) for i, c in enumerate(code[:9]))
+    total += 10 if code[9] in 'Xx' else ord(code[9]) - _ZERO
+    return total % 11 == 0
+
+
+def get_barcode_types(barcode: str) -> list[BarcodeType]:
+    """
+    Returns all barcode types the barcode is valid for, checking length, digits and check digit.
+    8-digit barcodes may be valid both as EAN-8 and UPC-E.
+
+    :param barcode: Barcode (EAN / UPC / ISBN)
+    :return: List of matching barcode types, empty for invalid barcodes.
+    """
+    length = len(barcode)
+
+    if length == 10:
+        return [BarcodeType.ISBN10] if barcode.isascii() and _is_valid_isbn10(barcode) else []
+
+    if length not in (8, 12, 13) or not barcode.isascii() or not barcode.isdigit():
+        return []
+
+    code = barcode.encode('ascii')
+
+    if length == 12:
+        return [BarcodeType.UPCA] if _is_valid_gtin(code) else []
+
+    if length == 13:
+        if not _is_valid_gtin(code):
+            return []
+
+        return [BarcodeType.EAN13, BarcodeType.ISBN13] if barcode[:3] in ('978', '979') else [BarcodeType.EAN13]
+
+    types = []
+
+    if _is_valid_gtin(code):
+        types.append(BarcodeType.EAN8)
+
+    upca = _expand_upce(barcode)
+
+    if upca is not None and _is_valid_gtin(upca.encode('ascii')):
+        types.append(BarcodeType.UPCE)
+
+    return types
+
+
+def is_valid_barcode(barcode: str) -> bool:
+    """
+    Checks whether the barcode is a valid EAN-8, EAN-13, UPC-A, UPC-E, ISBN-10 or ISBN-13 code.
+    """
+    return bool(get_barcode_types(barcode))
+
+
+def validate_barcodes(barcodes: Iterable[str]) -> list[bool]:
+    """
+    Validates many barcodes in one pass.
+
+    :param barcodes: Barcodes (EAN / UPC / ISBN)
+    :return: List of flags, `True` for each valid barcode.
+    """
+    return [is_valid_barcode(barcode) for barcode in barcodes]
+
+
+def filter_valid_barcodes(barcodes: Iterable[str]) -> tuple[list[str], list[str]]:
+    """
+    Splits barcodes into valid and invalid ones in one pass, preserving order.
+
+    :param barcodes: Barcodes (EAN / UPC / ISBN)
+    :return: Tuple of `(valid, invalid)` lists.
+    """
+    valid, invalid = [], []
+
+    for barcode in barcodes:
+        (valid if is_valid_barcode(barcode) else invalid).append(barcode)
+
+    return valid, invalid
+
+
+def canonicalize_barcode(barcode: str) -> str:
+    """
+    Returns canonical form of the barcode, so that equivalent codes are represented identically:
+    whitespace and hyphens are removed, valid UPC-A, UPC-E and ISBN-10 codes are converted to EAN-13.
+    8-digit codes valid both as EAN-8 and UPC-E are treated as EAN-8 and left unchanged.
+    Invalid barcodes are returned with whitespace and hyphens removed only.
+
+    :param barcode: Barcode (EAN / UPC / ISBN)
+    :return: Canonical barcode.
+    """
+    barcode = ''.join(barcode.split()).replace('-', '')
+    barcode_types = get_barcode_types(barcode)
+
+    if not barcode_types:
+        return barcode
+
+    barcode_type = barcode_types[0]
+
+    if barcode_type == BarcodeType.UPCA:
+        return '0' + barcode
+
+    if barcode_type == BarcodeType.UPCE:
+        return '0' + _expand_upce(barcode)
+
+    if barcode_type == BarcodeType.ISBN10:
+        body = '978' + barcode[:9]
+        return body + str(_gtin_check_digit(body.encode('ascii')))
+
+    return barcode
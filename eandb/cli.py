@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import collections
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from typing import AsyncIterator, BinaryIO, Optional, TextIO
+
+import httpx
+
+from eandb.clients.v2 import (
+    EandbV2AsyncClient, LRUProductCache, RetryPolicy, RateLimiter, BudgetManager, BudgetExhaustedError
+)
+from eandb.models.v2 import ProductResponse, EandbResponse
+from eandb.store import ProductStore
+
+_READ_BATCH_SIZE = 1000
+_CSV_COLUMNS = ('barcode', 'title', 'categories', 'manufacturer', 'error')
+
+
+class Checkpoint:
+    """
+    Progress of a bulk lookup run, saved atomically to a small JSON file.
+    All input lines before `input_line` are done, as well as lines of `done` barcodes after it
+    (a barcode is listed once per done line).
+    Results written to the output after `output_offset` are recovered from the output on resume.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.input_line = 0
+        self.output_offset = 0
+        self.done: collections.Counter[str] = collections.Counter()
+        self.exists = False
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        checkpoint = cls(path)
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+
+        checkpoint.input_line = data['input_line']
+        checkpoint.output_offset = data['output_offset']
+        checkpoint.done = collections.Counter(data['done'])
+        checkpoint.exists = True
+        return checkpoint
+
+    def save(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            data = {
+                'input_line': self.input_line, 'output_offset': self.output_offset, 'done': sorted(self.done.elements())
+            }
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+
+class _RecordWriter:
+    """
+    Formats lookup results as output lines and parses barcodes back from them.
+    """
+
+    def __init__(self, output_format: str):
+        self.output_format = output_format
+
+    def header(self) -> bytes:
+        return self._csv_line(_CSV_COLUMNS) if self.output_format == 'csv' else b''
+
+    def format(self, barcode: str, result: ProductResponse | EandbResponse | httpx.HTTPError) -> bytes:
+        if self.output_format == 'csv':
+            return self._format_csv(barcode, result)
+
+        if isinstance(result, ProductResponse):
+            return f'{{"barcode": {json.dumps(barcode)}, "product": {result.product.model_dump_json()}}}\n'.encode()
+
+        return (json.dumps({'barcode': barcode, 'error': self._get_error(result)}, ensure_ascii=False) + '\n').encode()
+
+    def parse_barcode(self, line: bytes) -> Optional[str]:
+        if self.output_format == 'csv':
+            row = next(csv.reader([line.decode()]))
+            return row[0] if row and row != list(_CSV_COLUMNS) else None
+
+        return json.loads(line)['barcode']
+
+    def _format_csv(self, barcode: str, result: ProductResponse | EandbResponse | httpx.HTTPError) -> bytes:
+        if not isinstance(result, ProductResponse):
+            return self._csv_line((barcode, '', '', '', self._get_error(result)['description']))
+
+        product = result.product
+        return self._csv_line((
+            barcode,
+            self._get_title(product.titles),
+            '|'.join(self._get_title(category.titles) for category in product.categories),
+            self._get_title(product.manufacturer.titles) if product.manufacturer else '',
+            ''
+        ))
+
+    @staticmethod
+    def _get_title(titles: dict[str, str]) -> str:
+        return titles.get('en') or next(iter(titles.values()), '')
+
+    @staticmethod
+    def _get_error(result: EandbResponse | httpx.HTTPError) -> dict:
+        if isinstance(result, EandbResponse):
+            return result.error.model_dump()
+
+        status_code = result.response.status_code if isinstance(result, httpx.HTTPStatusError) else None
+        return {'code': status_code, 'description': str(result) or type(result).__name__}
+
+    @staticmethod
+    def _csv_line(row) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(row)
+        return buffer.getvalue().encode()
+
+
+class _Progress:
+    """
+    Tracks completed input lines, so that the checkpoint holds a watermark and only the few barcodes
+    completed out of order after it.
+    """
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.watermark = checkpoint.input_line
+        self.skip = collections.Counter(checkpoint.done)
+        self._completed: dict[int, str] = {}
+
+    def should_skip(self, barcode: str) -> bool:
+        """
+        Checks whether the line was done by a previous run. Lines of a barcode are done in input order,
+        so the first lines of the barcode are the done ones.
+        """
+        if not self.skip[barcode]:
+            return False
+
+        self.skip[barcode] -= 1
+        return True
+
+    def complete(self, index: int, barcode: str) -> None:
+        self._completed[index] = barcode
+
+        while self.watermark in self._completed:
+            del self._completed[self.watermark]
+            self.watermark += 1
+
+    def done(self) -> collections.Counter[str]:
+        return +self.skip + collections.Counter(barcode for barcode in self._completed.values() if barcode)
+
+
+async def _read_lines(file: TextIO, start: int) -> AsyncIterator[tuple[int, str]]:
+    # Lines are read in batches on a worker thread, so that a slow stdin does not block requests in flight
+    index = 0
+
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(file, _READ_BATCH_SIZE)))
+
+        if not batch:
+            return
+
+        for line in batch:
+            if index >= start:
+                yield index, line.strip()
+
+            index += 1
+
+
+def _recover_output(path: str, checkpoint: Checkpoint, writer: _RecordWriter) -> collections.Counter[str]:
+    """
+    Returns barcodes of results written after the checkpoint was saved, dropping a partially written last line.
+    """
+    recovered = collections.Counter()
+
+    with open(path, 'r+b') as f:
+        f.seek(checkpoint.output_offset)
+        tail = f.read()
+        complete_length = tail.rfind(b'\n') + 1
+        f.truncate(checkpoint.output_offset + complete_length)
+
+    for line in tail[:complete_length].splitlines():
+        barcode = writer.parse_barcode(line)
+
+        if barcode is not None:
+            recovered[barcode] += 1
+
+    return recovered
+
+
+def _open_output(path: str, checkpoint: Checkpoint, writer: _RecordWriter) -> BinaryIO:
+    if path == '-':
+        output = sys.stdout.buffer
+    elif checkpoint.exists and os.path.exists(path):
+        checkpoint.done += _recover_output(path, checkpoint, writer)
+        return open(path, 'ab')
+    else:
+        output = open(path, 'wb')
+
+    output.write(writer.header())
+    return output
+
+
+async def _lookup(
+    client: EandbV2AsyncClient, barcode: str
+) -> tuple[str, ProductResponse | EandbResponse | httpx.HTTPError | BudgetExhaustedError]:
+    try:
+        return barcode, await client.get_product(barcode)
+    except (httpx.HTTPError, BudgetExhaustedError) as e:
+        return barcode, e
+
+
+async def run(args: argparse.Namespace) -> int:
+    checkpoint = Checkpoint.load(args.checkpoint) if args.checkpoint else Checkpoint(os.devnull)
+    writer = _RecordWriter(args.format)
+    output = _open_output(args.output, checkpoint, writer)
+    progress = _Progress(checkpoint)
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+
+    # Lines of barcodes in flight, each line gets a record but a barcode is looked up once
+    in_flight: dict[str, list[int]] = {}
+    pending = set()
+    stats = {'found': 0, 'not_found': 0, 'failed': 0}
+    unsaved = 0
+    exhausted = False
+
+    def _save_checkpoint() -> None:
+        nonlocal unsaved
+
+        output.flush()
+
+        if args.checkpoint:
+            checkpoint.input_line = progress.watermark
+            checkpoint.done = progress.done()
+            checkpoint.output_offset = output.tell()
+            checkpoint.save()
+
+        unsaved = 0
+
+    def _handle(tasks) -> None:
+        nonlocal unsaved, exhausted
+
+        for task in tasks:
+            barcode, result = task.result()
+            lines = in_flight.pop(barcode)
+
+            if isinstance(result, BudgetExhaustedError):
+                # Lines stay pending and are looked up on resume
+                exhausted = True
+                continue
+
+            record = writer.format(barcode, result)
+
+            for index in lines:
+                output.write(record)
+                progress.complete(index, barcode)
+
+            if isinstance(result, ProductResponse):
+                stats['found'] += 1
+            elif isinstance(result, EandbResponse):
+                stats['not_found'] += 1
+            else:
+                stats['failed'] += 1
+
+            unsaved += 1
+
+        if unsaved >= args.checkpoint_interval:
+            _save_checkpoint()
+
+    client = EandbV2AsyncClient(
+        jwt=args.jwt,
+        # Repeated barcodes are served from the cache
+        cache=LRUProductCache(max_entries=args.cache_size),
+        store=ProductStore(args.store) if args.store else None,
+        retry=RetryPolicy(max_attempts=args.max_attempts),
+        rate_limiter=RateLimiter(args.rate) if args.rate else None,
+        budget=BudgetManager(spend_limit=args.spend_limit) if args.spend_limit is not None else None
+    )
+
+    try:
+        async with client:
+            async for index, barcode in _read_lines(input_file, checkpoint.input_line):
+                if exhausted:
+                    break
+
+                if not barcode:
+                    progress.complete(index, barcode)
+                    continue
+
+                if progress.should_skip(barcode):
+                    progress.complete(index, barcode)
+                    continue
+
+                if barcode in in_flight:
+                    in_flight[barcode].append(index)
+                    continue
+
+                in_flight[barcode] = [index]
+                pending.add(asyncio.ensure_future(_lookup(client, barcode)))
+
+                if len(pending) >= args.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    _handle(done)
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                _handle(done)
+    finally:
+        for task in pending:
+            task.cancel()
+
+        _save_checkpoint()
+
+        if input_file is not sys.stdin:
+            input_file.close()
+
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    print(
+        f'Found: {stats["found"]}, not found: {stats["not_found"]}, failed: {stats["failed"]}'
+        + (', stopped: budget exhausted' if exhausted else ''),
+        file=sys.stderr
+    )
+    return 3 if exhausted else 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='eandb',
+        description='Looks up products by barcodes read line by line and writes one record per line.'
+    )
+    parser.add_argument('input', nargs='?', default='-', help='File with one barcode per line, `-` for stdin')
+    parser.add_argument('-o', '--output', default='-', help='Output file, `-` for stdout')
+    parser.add_argument('--jwt', default=os.environ.get('EANDB_JWT', ''), help='API token, defaults to $EANDB_JWT')
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl', help='Output format')
+    parser.add_argument('--concurrency', type=int, default=10, help='Maximum number of requests in flight')
+    parser.add_argument('--rate', type=float, help='Maximum number of requests per second')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Attempts per barcode on throttling and errors')
+    parser.add_argument('--spend-limit', type=int, help='Maximum number of paid requests of the run')
+    parser.add_argument(
+        '--cache-size', type=int, default=100_000, help='Number of recent results reused for repeated barcodes'
+    )
+    parser.add_argument(
+        '--store', help='Offline product store built by `python -m eandb.store`, stored products are not requested'
+    )
+    parser.add_argument('--checkpoint', help='Checkpoint file, the run is resumed from it if it exists')
+    parser.add_argument(
+        '--checkpoint-interval', type=int, default=1000, help='Number of results between checkpoint saves'
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    if not args.jwt:
+        parser.error('`--jwt` param or EANDB_JWT environment variable is required')
+
+    if args.concurrency < 1:
+        parser.error('`--concurrency` param must be positive')
+
+    if args.checkpoint and args.output == '-':
+        parser.error('`--checkpoint` param requires `--output` file')
+
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,62 +1,663 @@
 import abc
+import asyncio
+import collections
+import concurrent.futures
+import inspect
+import time
 from types import TracebackType
-from typing import Optional, Type
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Type
 
 import httpx
 
-from eandb.models.v2 import ProductResponse, EandbResponse
+from eandb.barcodes import canonicalize_barcode, is_valid_barcode
+from eandb.clients.v2.budget import BudgetManager, BudgetExhaustedError
+from eandb.clients.v2.metrics import RequestTiming, RequestObserver, MetricsAggregator, _Trace
+from eandb.clients.v2.cache import (
+    CacheEntry, CacheStats, ProductCache, LRUProductCache, SQLiteProductCache, StaleWhileRevalidate
+)
+from eandb.clients.v2.retry import RetryPolicy, AdaptiveConcurrencyLimiter, RateLimiter
+from eandb.clients.v2.resilience import HedgingPolicy, CircuitBreaker, CircuitOpenError
+from eandb.clients.v2.credentials import Credential, CredentialPool, CredentialsExhaustedError
+from eandb.clients.v2.transport import TransportConfig, _get_default_ssl_context
+from eandb.models.v2 import ProductResponse, EandbResponse, Error, ErrorType, LazyProductResponse
+from eandb.store import ProductStore
+
+
+def _validate_json(model: type[ProductResponse], content: bytes) -> ProductResponse:
+    # Module-level, so that it can be pickled for a process pool
+    return model.model_validate_json(content)
 
 
 class EandbV2AbstractClient(abc.ABC):
     DEFAULT_BASE_URL = 'https://ean-db.com'
     PRODUCT_ENDPOINT = '/api/v2/product/{barcode}'
+    WARMUP_ENDPOINT = '/'
 
-    def __init__(self, *, jwt: str = ''):
-        if not jwt:
+    def __init__(
+        self,
+        *,
+        jwt: str = '',
+        cache: Optional[ProductCache] = None,
+        validate_barcodes: bool = False,
+        canonicalize_barcodes: bool = False,
+        lazy_metadata: bool = False,
+        retry: Optional[RetryPolicy] = None,
+        budget: Optional[BudgetManager] = None,
+        observers: Iterable[RequestObserver] = (),
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        store: Optional[ProductStore] = None,
+        revalidation: Optional[StaleWhileRevalidate] = None,
+        credentials: Optional[CredentialPool] = None
+    ):
+        if not jwt and credentials is None:
             raise ValueError('`jwt` param is empty')
 
+        if revalidation is not None and cache is None:
+            raise ValueError('`revalidation` param requires `cache`')
+
         self.jwt = jwt
+        self.cache = cache
+        self.validate_barcodes = validate_barcodes
+        self.canonicalize_barcodes = canonicalize_barcodes
+        self.product_response_model = LazyProductResponse if lazy_metadata else ProductResponse
+        self.retry = retry
+        self.budget = budget
+        self.observers = list(observers)
+        self.circuit_breaker = circuit_breaker
+        self.store = store
+        self.revalidation = revalidation
+        self.credentials = credentials
+        self.cache_stats = CacheStats()
+
+    def _barcode_key(self, barcode: str) -> str:
+        """
+        Returns barcode used for requests, caching and deduplication.
+        """
+        return canonicalize_barcode(barcode) if self.canonicalize_barcodes else barcode
+
+    def _unique_barcodes(self, barcodes: Iterable[str]) -> Iterator[str]:
+        seen = set()
+
+        for barcode in barcodes:
+            key = self._barcode_key(barcode)
+
+            if key in seen:
+                continue
+
+            seen.add(key)
+            yield barcode
+
+    def _map_results(self, barcodes: list[str], results: dict[str, Any]) -> dict[str, Any]:
+        """
+        Maps results of unique barcodes back to every input barcode, including duplicates and equivalent codes.
+        Barcodes left pending because of an exhausted budget are omitted.
+        """
+        if not self.canonicalize_barcodes:
+            return results
+
+        results_by_key = {self._barcode_key(barcode): result for barcode, result in results.items()}
+        return {
+            barcode: results_by_key[key]
+            for barcode in barcodes
+            if (key := self._barcode_key(barcode)) in results_by_key
+        }
+
+    def _get_client_kwargs(
+        self, jwt: str, transport: TransportConfig | httpx.BaseTransport | httpx.AsyncBaseTransport | None,
+        kwargs: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Returns arguments of the httpx client: defaults, then transport settings, then arguments given explicitly.
+        An httpx transport (e.g. `httpx.MockTransport`) is passed to the httpx client as is.
+        Unless TLS settings are given, clients share a default SSL context.
+        """
+        if isinstance(transport, TransportConfig):
+            transport_kwargs = transport.get_client_kwargs()
+        elif transport is not None:
+            transport_kwargs = {'transport': transport}
+        else:
+            transport_kwargs = {}
+
+        if 'transport' not in transport_kwargs and not {'verify', 'cert', 'trust_env', 'transport'} & kwargs.keys():
+            transport_kwargs['verify'] = _get_default_ssl_context(bool(kwargs.get('http2', transport_kwargs.get('http2'))))
+
+        return {
+            'headers': {'Authorization': f'Bearer {jwt}', 'Accept': 'application/json'},
+            'base_url': self.DEFAULT_BASE_URL,
+            **transport_kwargs,
+            **kwargs
+        }
+
+    def _get_budget(self, budget: Optional[BudgetManager]) -> Optional[BudgetManager]:
+        return budget if budget is not None else self.budget
 
     @staticmethod
-    def _process_product_response(response: httpx.Response) -> ProductResponse | EandbResponse:
+    def _try_reserve(budget: Optional[BudgetManager]) -> bool:
+        """
+        Reserves budget for a request dispatched by a batch method, returns `False` if the budget is exhausted.
+        """
+        if budget is None:
+            return True
+
+        try:
+            budget.reserve()
+        except BudgetExhaustedError:
+            return False
+
+        return True
+
+    def _check_barcode(self, barcode: str) -> Optional[EandbResponse]:
+        """
+        Returns `INVALID_BARCODE` error response without an HTTP request if local validation is enabled
+        and the barcode is malformed or has a wrong check digit.
+        """
+        if not self.validate_barcodes or is_valid_barcode(barcode):
+            return None
+
+        return EandbResponse(error=Error(code=httpx.codes.BAD_REQUEST, description=f'Invalid barcode: {barcode}'))
+
+    def _process_product_response(self, response: httpx.Response) -> ProductResponse | EandbResponse:
+        # Validating JSON bytes directly avoids building an intermediate dict
         if response.status_code == httpx.codes.OK:
-            return ProductResponse.model_validate(response.json())
+            return self.product_response_model.model_validate_json(response.content)
 
         if response.status_code in (httpx.codes.NOT_FOUND, httpx.codes.FORBIDDEN, httpx.codes.BAD_REQUEST):
-            return EandbResponse.model_validate(response.json())
+            return EandbResponse.model_validate_json(response.content)
 
         response.raise_for_status()
 
+    def _parse_product_response(
+        self, response: httpx.Response, timing: Optional[RequestTiming]
+    ) -> ProductResponse | EandbResponse:
+        if timing is None:
+            return self._process_product_response(response)
 
-class EandbV2SyncClient(EandbV2AbstractClient):
-    def __init__(self, *, jwt: str = '', **kwargs):
-        super().__init__(jwt=jwt)
+        started_at = time.monotonic()
 
-        default_headers = {'Authorization': f'Bearer {jwt}', 'Accept': 'application/json'}
+        try:
+            return self._process_product_response(response)
+        finally:
+            timing.parse += time.monotonic() - started_at
 
-        self._client = httpx.Client(
-            headers=kwargs.get('headers', default_headers),
-            base_url=kwargs.get('base_url', self.DEFAULT_BASE_URL),
-            **kwargs
+    def _start_timing(self, barcode: str) -> Optional[RequestTiming]:
+        return RequestTiming(barcode=barcode) if self.observers else None
+
+    def _notify(
+        self,
+        timing: Optional[RequestTiming],
+        result: ProductResponse | EandbResponse | None = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        if timing is None:
+            return
+
+        timing.finish(result, error)
+
+        for observer in self.observers:
+            observer.on_request(timing)
+
+    @staticmethod
+    def _process_raw_product_response(response: httpx.Response) -> bytes:
+        if response.status_code not in (
+            httpx.codes.OK, httpx.codes.NOT_FOUND, httpx.codes.FORBIDDEN, httpx.codes.BAD_REQUEST
+        ):
+            response.raise_for_status()
+
+        return response.content
+
+    def _get_stored(
+        self, barcode: str, timing: Optional[RequestTiming] = None
+    ) -> ProductResponse | EandbResponse | None:
+        """
+        Returns a product from the offline store, looked up before the cache and the API.
+        """
+        content = self.store.get_raw(barcode) if self.store is not None else None
+
+        if content is None:
+            return None
+
+        self.cache_stats.record('store_hits')
+
+        if timing is not None:
+            timing.cache = 'store'
+
+        return self.product_response_model.model_validate_json(content)
+
+    def _get_cached(
+        self, barcode: str, timing: Optional[RequestTiming] = None
+    ) -> ProductResponse | EandbResponse | None:
+        if self.cache is None:
+            return None
+
+        entry = self.cache.get(barcode)
+
+        if timing is not None:
+            timing.cache = 'miss' if entry is None else 'hit'
+
+        if entry is None:
+            self.cache_stats.record('misses')
+            return None
+
+        self.cache_stats.record('hits')
+
+        if self.revalidation is not None and self.revalidation.should_refresh(barcode, entry):
+            self.cache_stats.record('refreshes')
+            self._schedule_refresh(barcode)
+
+        if entry.response is not None:
+            return entry.response
+
+        return self._process_cache_entry(entry)
+
+    @abc.abstractmethod
+    def _schedule_refresh(self, barcode: str) -> None:
+        """
+        Starts a background refresh of a cached product, see `StaleWhileRevalidate`.
+        """
+
+    def _finish_refresh(self, barcode: str, result: ProductResponse | EandbResponse | None) -> None:
+        """
+        Records outcome of a background refresh, `result` is `None` if the refresh raised an exception.
+        """
+        succeeded = isinstance(result, ProductResponse) or (
+            result is not None and result.get_error_type() == ErrorType.PRODUCT_NOT_FOUND
         )
 
-    def get_product(self, barcode: str) -> ProductResponse | EandbResponse:
+        if not succeeded:
+            self.cache_stats.record('refresh_failures')
+
+        self.revalidation.record(barcode, succeeded)
+
+    def _record_balance(self, response: httpx.Response, result: ProductResponse | EandbResponse) -> None:
+        """
+        Records balance of the account whose token of the credential pool was used for the request.
+        """
+        if self.credentials is not None and isinstance(result, ProductResponse):
+            self.credentials.record_balance(
+                response.request.headers['Authorization'].removeprefix('Bearer '), result.balance
+            )
+
+    def _get_stale_cached(
+        self, barcode: str, timing: Optional[RequestTiming] = None
+    ) -> ProductResponse | EandbResponse | None:
+        """
+        Returns an expired cached response, served instead of failing while the circuit breaker is open.
+        """
+        entry = self.cache.get_stale(barcode) if self.cache is not None else None
+
+        if entry is None:
+            return None
+
+        self.cache_stats.record('stale')
+
+        if timing is not None:
+            timing.cache = 'stale'
+
+        if entry.response is not None:
+            return entry.response
+
+        return self._process_cache_entry(entry)
+
+    def _check_circuit(self) -> None:
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+            raise CircuitOpenError('Circuit breaker is open, requests are not sent')
+
+    def _record_circuit(self, failed: Optional[bool]) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(failed)
+
+    def _process_cache_entry(self, entry: CacheEntry) -> ProductResponse | EandbResponse:
+        if entry.status_code == httpx.codes.OK:
+            return self.product_response_model.model_validate_json(entry.content)
+
+        return EandbResponse.model_validate_json(entry.content)
+
+    def _set_cached(
+        self, barcode: str, response: httpx.Response, result: ProductResponse | EandbResponse
+    ) -> ProductResponse | EandbResponse:
+        if self.cache is not None:
+            self.cache.set(barcode, response.status_code, response.content, result)
+
+        return result
+
+
+class EandbV2SyncClient(EandbV2AbstractClient):
+    def __init__(
+        self,
+        *,
+        jwt: str = '',
+        cache: Optional[ProductCache] = None,
+        validate_barcodes: bool = False,
+        canonicalize_barcodes: bool = False,
+        lazy_metadata: bool = False,
+        retry: Optional[RetryPolicy] = None,
+        budget: Optional[BudgetManager] = None,
+        observers: Iterable[RequestObserver] = (),
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        store: Optional[ProductStore] = None,
+        revalidation: Optional[StaleWhileRevalidate] = None,
+        credentials: Optional[CredentialPool] = None,
+        transport: TransportConfig | httpx.BaseTransport | httpx.AsyncBaseTransport | None = None,
+        **kwargs
+    ):
+        super().__init__(
+            jwt=jwt,
+            cache=cache,
+            validate_barcodes=validate_barcodes,
+            canonicalize_barcodes=canonicalize_barcodes,
+            lazy_metadata=lazy_metadata,
+            retry=retry,
+            budget=budget,
+            observers=observers,
+            circuit_breaker=circuit_breaker,
+            store=store,
+            revalidation=revalidation,
+            credentials=credentials
+        )
+
+        # Threads are started on demand, up to one per refresh in flight
+        self._refresh_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=revalidation.max_refreshes, thread_name_prefix='eandb-refresh'
+        ) if revalidation is not None else None
+        self._client = httpx.Client(**self._get_client_kwargs(jwt, transport, kwargs))
+
+    def get_product(self, barcode: str, *, budget: Optional[BudgetManager] = None) -> ProductResponse | EandbResponse:
         """
         Returns product info by barcode.
         An exception (`httpx.HTTPStatusError`) is raised in case of any unexpected error (5xx or transport error).
+        An exception (`BudgetExhaustedError`) is raised if the request would exceed the budget.
 
         :param barcode: Barcode (EAN / UPC / ISBN) of a product
+        :param budget: Budget to spend, defaults to the budget of the client
         :return: `ProductResponse` object with product info or `EandbResponse` object with error info.
         """
-        response = self._client.get(self.PRODUCT_ENDPOINT.format(barcode=barcode))
-        return self._process_product_response(response)
+        return self._get_product(barcode, self._get_budget(budget), reserved=False)
+
+    def _get_product(
+        self, barcode: str, budget: Optional[BudgetManager], reserved: bool, refresh: bool = False
+    ) -> ProductResponse | EandbResponse:
+        timing = self._start_timing(barcode)
+
+        try:
+            result = self._lookup_product(barcode, budget, reserved, timing, refresh)
+        except BaseException as e:
+            self._notify(timing, error=e)
+            raise
+
+        self._notify(timing, result)
+        return result
+
+    def _lookup_product(
+        self,
+        barcode: str,
+        budget: Optional[BudgetManager],
+        reserved: bool,
+        timing: Optional[RequestTiming],
+        refresh: bool = False
+    ) -> ProductResponse | EandbResponse:
+        try:
+            barcode = self._barcode_key(barcode)
+            invalid_barcode_response = self._check_barcode(barcode)
+
+            if invalid_barcode_response is not None:
+                return invalid_barcode_response
+
+            if refresh:
+                if timing is not None:
+                    timing.cache = 'refresh'
+            else:
+                stored = self._get_stored(barcode, timing)
+
+                if stored is not None:
+                    return stored
+
+                cached = self._get_cached(barcode, timing)
+
+                if cached is not None:
+                    return cached
+
+            if budget is not None and not reserved:
+                budget.reserve()
+                reserved = True
+
+            try:
+                response = self._request(barcode, timing)
+            except CircuitOpenError:
+                # A refresh fails instead, so that the stale entry is not reported as refreshed
+                stale = self._get_stale_cached(barcode, timing) if not refresh else None
+
+                if stale is None:
+                    raise
+
+                return stale
+
+            result = self._parse_product_response(response, timing)
+            self._record_balance(response, result)
+
+            if reserved:
+                reserved = False
+                budget.commit(result)
+
+            return self._set_cached(barcode, response, result)
+        finally:
+            # Reservation is returned if the product was not requested or the request failed
+            if reserved:
+                budget.release()
+
+    def _schedule_refresh(self, barcode: str) -> None:
+        self._refresh_executor.submit(self._refresh, barcode)
+
+    def _refresh(self, barcode: str) -> None:
+        result = None
+
+        try:
+            result = self._get_product(barcode, self.budget, reserved=False, refresh=True)
+        except Exception:
+            # Observers are notified of the error, the stale entry is served until the refresh is retried
+            pass
+        finally:
+            self._finish_refresh(barcode, result)
+
+    def get_product_raw(self, barcode: str) -> bytes:
+        """
+        Returns undecoded JSON of product info or error info by barcode, for callers which only store or forward it.
+        Caches and local barcode validation are not used.
+        An exception (`httpx.HTTPStatusError`) is raised in case of any unexpected error (5xx or transport error).
+
+        :param barcode: Barcode (EAN / UPC / ISBN) of a product
+        :return: Response body.
+        """
+        response = self._request(self._barcode_key(barcode))
+        return self._process_raw_product_response(response)
+
+    def _request(self, barcode: str, timing: Optional[RequestTiming] = None) -> httpx.Response:
+        extensions = {'trace': _Trace(timing)} if timing is not None else None
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if timing is not None:
+                timing.attempts = attempt
+
+            self._check_circuit()
+
+            try:
+                response = self._get(self.PRODUCT_ENDPOINT.format(barcode=barcode), extensions)
+            except httpx.TransportError as e:
+                self._record_circuit(failed=True)
+
+                if self.retry is None or not self.retry.should_retry(attempt, error=e):
+                    raise
+
+                self._sleep(self.retry.get_delay(attempt), timing)
+                continue
+            except BaseException:
+                self._record_circuit(failed=None)
+                raise
+
+            self._record_circuit(failed=response.is_server_error)
+
+            if timing is not None:
+                timing.status_code = response.status_code
+
+            if self.retry is None or not self.retry.should_retry(attempt, response=response):
+                return response
+
+            self._sleep(self.retry.get_delay(attempt, response), timing)
+
+    def _get(self, url: str, extensions: Optional[dict[str, Any]]) -> httpx.Response:
+        """
+        Sends a product request, with a token of the credential pool if there is one.
+        A request failed because of its token is retried with another token.
+        """
+        if self.credentials is None:
+            return self._client.get(url, extensions=extensions)
+
+        while True:
+            credential = self.credentials.acquire_blocking()
+            response = None
+
+            try:
+                response = self._client.get(url, headers=credential.headers, extensions=extensions)
+            finally:
+                retry = self.credentials.release(credential, response)
+
+            if not retry:
+                return response
+
+    @staticmethod
+    def _sleep(delay: float, timing: Optional[RequestTiming]) -> None:
+        if timing is not None:
+            timing.queue += delay
+
+        time.sleep(delay)
+
+    def warmup(self, connections: int = 1) -> int:
+        """
+        Opens connections to the API before traffic arrives, so that first lookups don't wait for TLS handshakes.
+        Sends `connections` concurrent HEAD requests, which are not charged.
+
+        :param connections: Number of connections to open
+        :return: Number of successful requests.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=connections, thread_name_prefix='eandb') as executor:
+            return sum(executor.map(lambda _: self._warmup_connection(), range(connections)))
+
+    def _warmup_connection(self) -> bool:
+        try:
+            self._client.head(self.WARMUP_ENDPOINT)
+        except httpx.HTTPError:
+            return False
+
+        return True
+
+    def get_products(
+        self, barcodes: Iterable[str], *, concurrency: int = 10, budget: Optional[BudgetManager] = None
+    ) -> dict[str, ProductResponse | EandbResponse | httpx.HTTPError]:
+        """
+        Returns product info for multiple barcodes, fetching up to `concurrency` products at a time
+        on a thread pool. Duplicate barcodes (and equivalent barcodes if `canonicalize_barcodes` is set)
+        are requested only once.
+        Unexpected errors (5xx or transport error) are returned in place of a result instead of being raised.
+        Once the budget is exhausted, no more requests are dispatched and remaining barcodes are omitted from the result.
+
+        :param barcodes: Barcodes (EAN / UPC / ISBN) of products
+        :param concurrency: Maximum number of requests in flight
+        :param budget: Budget to spend, defaults to the budget of the client
+        :return: Dict mapping each barcode to `ProductResponse`, `EandbResponse` or `httpx.HTTPError`.
+        """
+        barcodes = list(barcodes)
+        return self._map_results(
+            barcodes, dict(self.iter_products(barcodes, concurrency=concurrency, budget=budget))
+        )
+
+    def iter_products(
+        self,
+        barcodes: Iterable[str],
+        *,
+        concurrency: int = 10,
+        ordered: bool = False,
+        budget: Optional[BudgetManager] = None
+    ) -> Iterator[tuple[str, ProductResponse | EandbResponse | httpx.HTTPError]]:
+        """
+        Same as `get_products`, but yields `(barcode, result)` pairs as soon as they are available.
+        Only the first of duplicate or equivalent barcodes is yielded.
+        Barcodes are consumed lazily, so arbitrarily long iterables can be processed in bounded memory.
+        Once the budget is exhausted, results of requests in flight are yielded and iteration stops.
+
+        :param barcodes: Barcodes (EAN / UPC / ISBN) of products
+        :param concurrency: Maximum number of requests in flight
+        :param ordered: Yield results in input order instead of order of completion
+        :param budget: Budget to spend, defaults to the budget of the client
+        :return: Iterator of `(barcode, result)` pairs.
+        """
+        if concurrency < 1:
+            raise ValueError('`concurrency` param must be positive')
+
+        budget = self._get_budget(budget)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='eandb')
+        pending = collections.deque()
+
+        try:
+            for barcode in self._unique_barcodes(barcodes):
+                invalid_barcode_response = self._check_barcode(self._barcode_key(barcode))
+
+                if invalid_barcode_response is not None:
+                    # Resolved future keeps the result in input order when `ordered` is set
+                    future = concurrent.futures.Future()
+                    future.set_result((barcode, invalid_barcode_response))
+                    pending.append(future)
+                elif self._try_reserve(budget):
+                    pending.append(executor.submit(self._get_product_or_error, barcode, budget))
+                else:
+                    break
+
+                if len(pending) >= concurrency:
+                    yield from self._pop_completed(pending, ordered)
+
+            while pending:
+                yield from self._pop_completed(pending, ordered)
+        finally:
+            for future in pending:
+                # Cancelled requests were never sent, so their reservations are returned
+                if future.cancel() and budget is not None:
+                    budget.release()
+
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _pop_completed(pending: collections.deque, ordered: bool) -> Iterator:
+        if ordered:
+            yield pending.popleft().result()
+            return
+
+        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+        for future in done:
+            pending.remove(future)
+            yield future.result()
+
+    def _get_product_or_error(
+        self, barcode: str, budget: Optional[BudgetManager]
+    ) -> tuple[str, ProductResponse | EandbResponse | httpx.HTTPError]:
+        # Budget is reserved by the batch method on dispatch
+        try:
+            return barcode, self._get_product(barcode, budget, reserved=budget is not None)
+        except httpx.HTTPError as e:
+            return barcode, e
 
     def close(self):
         """
-        Closes underlying httpx client.
+        Waits for background refreshes and closes underlying httpx client.
         """
+        self._shutdown_refreshes()
         self._client.close()
 
+    def _shutdown_refreshes(self) -> None:
+        if self._refresh_executor is not None:
+            self._refresh_executor.shutdown(wait=True)
+
     def __enter__(self):
         self._client.__enter__()
         return self
@@ -67,38 +668,548 @@ class EandbV2SyncClient(EandbV2AbstractClient):
         exc_value: Optional[BaseException] = None,
         traceback: Optional[TracebackType] = None,
     ):
+        self._shutdown_refreshes()
         self._client.__exit__(exc_type, exc_value, traceback)
 
 
-class EandbV2AsyncClient(EandbV2AbstractClient):
-    def __init__(self, *, jwt: str = '', **kwargs):
-        super().__init__(jwt=jwt)
+class _SharedRequest:
+    """
+    Request in flight shared by concurrent `get_product` calls, cancelled when all of them are cancelled.
+    """
+    __slots__ = ('task', 'waiters')
 
-        default_headers = {'Authorization': f'Bearer {jwt}', 'Accept': 'application/json'}
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
 
-        self._client = httpx.AsyncClient(
-            headers=kwargs.get('headers', default_headers),
-            base_url=kwargs.get('base_url', self.DEFAULT_BASE_URL),
-            **kwargs
+
+class EandbV2AsyncClient(EandbV2AbstractClient):
+    def __init__(
+        self,
+        *,
+        jwt: str = '',
+        cache: Optional[ProductCache] = None,
+        validate_barcodes: bool = False,
+        canonicalize_barcodes: bool = False,
+        lazy_metadata: bool = False,
+        retry: Optional[RetryPolicy] = None,
+        budget: Optional[BudgetManager] = None,
+        observers: Iterable[RequestObserver] = (),
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        store: Optional[ProductStore] = None,
+        revalidation: Optional[StaleWhileRevalidate] = None,
+        credentials: Optional[CredentialPool] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[concurrent.futures.Executor] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        transport: TransportConfig | httpx.BaseTransport | httpx.AsyncBaseTransport | None = None,
+        **kwargs
+    ):
+        super().__init__(
+            jwt=jwt,
+            cache=cache,
+            validate_barcodes=validate_barcodes,
+            canonicalize_barcodes=canonicalize_barcodes,
+            lazy_metadata=lazy_metadata,
+            retry=retry,
+            budget=budget,
+            observers=observers,
+            circuit_breaker=circuit_breaker,
+            store=store,
+            revalidation=revalidation,
+            credentials=credentials
         )
 
-    async def get_product(self, barcode: str) -> ProductResponse | EandbResponse:
+        self.hedging = hedging
+        self.offload_threshold = offload_threshold
+        self.offload_executor = offload_executor
+        self.concurrency_limiter = concurrency_limiter
+        self.rate_limiter = rate_limiter
+        self._in_flight: dict[str, _SharedRequest] = {}
+        self._refreshes: set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._client = httpx.AsyncClient(**self._get_client_kwargs(jwt, transport, kwargs))
+
+    async def get_product(
+        self, barcode: str, *, budget: Optional[BudgetManager] = None
+    ) -> ProductResponse | EandbResponse:
         """
         Returns product info by barcode.
+        Concurrent calls for the same barcode share a single HTTP request.
         An exception (`httpx.HTTPStatusError`) is raised in case of any unexpected error (5xx or transport error).
+        An exception (`BudgetExhaustedError`) is raised if the request would exceed the budget.
 
         :param barcode: Barcode (EAN / UPC / ISBN) of a product
+        :param budget: Budget to spend, defaults to the budget of the client
         :return: `ProductResponse` object with product info or `EandbResponse` object with error info.
         """
-        response = await self._client.get(self.PRODUCT_ENDPOINT.format(barcode=barcode))
-        return self._process_product_response(response)
+        return await self._get_product(barcode, self._get_budget(budget), reserved=False)
+
+    async def _get_product(
+        self, barcode: str, budget: Optional[BudgetManager], reserved: bool, refresh: bool = False
+    ) -> ProductResponse | EandbResponse:
+        timing = self._start_timing(barcode)
+
+        try:
+            result = await self._lookup_product(barcode, budget, reserved, timing, refresh)
+        except BaseException as e:
+            self._notify(timing, error=e)
+            raise
+
+        self._notify(timing, result)
+        return result
+
+    async def _lookup_product(
+        self,
+        barcode: str,
+        budget: Optional[BudgetManager],
+        reserved: bool,
+        timing: Optional[RequestTiming],
+        refresh: bool = False
+    ) -> ProductResponse | EandbResponse:
+        try:
+            barcode = self._barcode_key(barcode)
+            invalid_barcode_response = self._check_barcode(barcode)
+
+            if invalid_barcode_response is not None:
+                return invalid_barcode_response
+
+            if refresh:
+                if timing is not None:
+                    timing.cache = 'refresh'
+            else:
+                stored = self._get_stored(barcode, timing)
+
+                if stored is not None:
+                    return stored
+
+                cached = await self._get_cached_async(barcode, timing)
+
+                if cached is not None:
+                    return cached
+
+            shared_request = self._in_flight.get(barcode)
+
+            if shared_request is None:
+                if budget is not None and not reserved:
+                    budget.reserve()
+
+                # The reservation is passed to the shared request, which commits or releases it
+                reserved = False
+                shared_request = _SharedRequest(
+                    asyncio.ensure_future(self._fetch_product(barcode, budget, timing, stale_fallback=not refresh))
+                )
+                shared_request.task.add_done_callback(lambda _: self._forget_in_flight(barcode, shared_request))
+                self._in_flight[barcode] = shared_request
+            else:
+                self.cache_stats.record('coalesced')
+
+                if timing is not None:
+                    timing.cache = 'coalesced'
+        finally:
+            if reserved:
+                budget.release()
+
+        shared_request.waiters += 1
+
+        try:
+            # Shielded, so that cancellation of one caller does not cancel the request shared with other callers
+            return await asyncio.shield(shared_request.task)
+        except asyncio.CancelledError:
+            if shared_request.waiters == 1:
+                shared_request.task.cancel()
+
+            raise
+        finally:
+            shared_request.waiters -= 1
+
+    def _forget_in_flight(self, barcode: str, shared_request: '_SharedRequest') -> None:
+        if self._in_flight.get(barcode) is shared_request:
+            del self._in_flight[barcode]
+
+    async def _fetch_product(
+        self,
+        barcode: str,
+        budget: Optional[BudgetManager],
+        timing: Optional[RequestTiming],
+        stale_fallback: bool = True
+    ) -> ProductResponse | EandbResponse:
+        try:
+            response = await self._request(barcode, timing)
+            result = await self._parse_product_response_async(response, timing)
+            self._record_balance(response, result)
+        except CircuitOpenError:
+            if budget is not None:
+                budget.release()
+
+            stale = await self._get_stale_cached_async(barcode, timing) if stale_fallback else None
+
+            if stale is None:
+                raise
+
+            return stale
+        except BaseException:
+            if budget is not None:
+                budget.release()
+
+            raise
+
+        if budget is not None:
+            budget.commit(result)
+
+        return await self._set_cached_async(barcode, response, result)
+
+    async def _parse_product_response_async(
+        self, response: httpx.Response, timing: Optional[RequestTiming]
+    ) -> ProductResponse | EandbResponse:
+        """
+        Decodes and validates products larger than `offload_threshold` on `offload_executor`,
+        so that huge responses don't block the event loop. Small and error responses are parsed inline.
+        """
+        if (
+            self.offload_threshold is None
+            or response.status_code != httpx.codes.OK
+            or len(response.content) < self.offload_threshold
+        ):
+            return self._parse_product_response(response, timing)
+
+        started_at = time.monotonic()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.offload_executor, _validate_json, self.product_response_model, response.content
+            )
+        finally:
+            if timing is not None:
+                timing.parse += time.monotonic() - started_at
+
+    async def _get_cached_async(
+        self, barcode: str, timing: Optional[RequestTiming] = None
+    ) -> ProductResponse | EandbResponse | None:
+        # Refreshes are scheduled on the loop, also from the worker thread reading a blocking cache
+        self._loop = asyncio.get_running_loop()
+
+        if self.cache is None or not self.cache.blocking:
+            return self._get_cached(barcode, timing)
+
+        return await asyncio.to_thread(self._get_cached, barcode, timing)
+
+    def _schedule_refresh(self, barcode: str) -> None:
+        self._loop.call_soon_threadsafe(self._start_refresh, barcode)
+
+    def _start_refresh(self, barcode: str) -> None:
+        task = asyncio.ensure_future(self._refresh(barcode))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, barcode: str) -> None:
+        result = None
+
+        try:
+            result = await self._get_product(barcode, self.budget, reserved=False, refresh=True)
+        except Exception:
+            # Observers are notified of the error, the stale entry is served until the refresh is retried
+            pass
+        finally:
+            self._finish_refresh(barcode, result)
+
+    async def _get_stale_cached_async(
+        self, barcode: str, timing: Optional[RequestTiming] = None
+    ) -> ProductResponse | EandbResponse | None:
+        if self.cache is None or not self.cache.blocking:
+            return self._get_stale_cached(barcode, timing)
+
+        return await asyncio.to_thread(self._get_stale_cached, barcode, timing)
+
+    async def _set_cached_async(
+        self, barcode: str, response: httpx.Response, result: ProductResponse | EandbResponse
+    ) -> ProductResponse | EandbResponse:
+        if self.cache is None or not self.cache.blocking:
+            return self._set_cached(barcode, response, result)
+
+        return await asyncio.to_thread(self._set_cached, barcode, response, result)
+
+    async def get_product_raw(self, barcode: str) -> bytes:
+        """
+        Returns undecoded JSON of product info or error info by barcode, for callers which only store or forward it.
+        Caches and local barcode validation are not used.
+        An exception (`httpx.HTTPStatusError`) is raised in case of any unexpected error (5xx or transport error).
+
+        :param barcode: Barcode (EAN / UPC / ISBN) of a product
+        :return: Response body.
+        """
+        response = await self._request(self._barcode_key(barcode))
+        return self._process_raw_product_response(response)
+
+    async def _request(self, barcode: str, timing: Optional[RequestTiming] = None) -> httpx.Response:
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if timing is not None:
+                timing.attempts = attempt
+
+            try:
+                if self.hedging is not None:
+                    response = await self._send_hedged(barcode, timing)
+                else:
+                    response = await self._send(barcode, timing)
+            except httpx.TransportError as e:
+                if self.retry is None or not self.retry.should_retry(attempt, error=e):
+                    raise
+
+                await self._sleep(self.retry.get_delay(attempt), timing)
+                continue
+
+            if timing is not None:
+                timing.status_code = response.status_code
+
+            if self.retry is None or not self.retry.should_retry(attempt, response=response):
+                return response
+
+            await self._sleep(self.retry.get_delay(attempt, response), timing)
+
+    @staticmethod
+    async def _sleep(delay: float, timing: Optional[RequestTiming]) -> None:
+        if timing is not None:
+            timing.queue += delay
+
+        await asyncio.sleep(delay)
+
+    async def _send_hedged(self, barcode: str, timing: Optional[RequestTiming]) -> httpx.Response:
+        """
+        Sends a request and a hedge if it has not answered within the hedging delay, returns the first response.
+        The hedge is not traced, so that phases of `timing` are not counted twice.
+        """
+        started_at = time.monotonic()
+        primary = asyncio.ensure_future(self._send(barcode, timing))
+        tasks = {primary}
+        hedged = False
+        latency = None
+
+        try:
+            delay = self.hedging.delay
+
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+
+                if not done and self.hedging.should_hedge():
+                    hedged = True
+                    tasks.add(asyncio.ensure_future(self._send(barcode)))
+
+                    if timing is not None:
+                        timing.hedged = True
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                # The primary request is preferred if both answered at once
+                if primary in done and primary.exception() is None:
+                    # Latency of a request which lost to its hedge is unknown, so only the primary one is learned
+                    latency = time.monotonic() - started_at
+                    return primary.result()
+
+                for task in done - {primary}:
+                    if task.exception() is None:
+                        return task.result()
+
+                # A failed request is waited for its hedge, the error is raised if both failed
+                if not tasks:
+                    raise (primary if primary in done else done.pop()).exception()
+        finally:
+            self.hedging.record(latency, hedged)
+
+            for task in tasks:
+                task.cancel()
+
+    async def _send(self, barcode: str, timing: Optional[RequestTiming] = None) -> httpx.Response:
+        self._check_circuit()
+
+        try:
+            response = await self._send_limited(barcode, timing)
+        except httpx.TransportError:
+            self._record_circuit(failed=True)
+            raise
+        except BaseException:
+            self._record_circuit(failed=None)
+            raise
+
+        self._record_circuit(failed=response.is_server_error)
+        return response
+
+    async def _send_limited(self, barcode: str, timing: Optional[RequestTiming] = None) -> httpx.Response:
+        url = self.PRODUCT_ENDPOINT.format(barcode=barcode)
+        extensions = {'trace': _Trace(timing).trace_async} if timing is not None else None
+        queued_at = time.monotonic()
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+        if self.concurrency_limiter is None:
+            if timing is not None:
+                timing.queue += time.monotonic() - queued_at
+
+            return await self._get(url, extensions)
+
+        await self.concurrency_limiter.acquire()
+        started_at = time.monotonic()
+
+        if timing is not None:
+            timing.queue += started_at - queued_at
+
+        try:
+            response = await self._get(url, extensions)
+        except httpx.TransportError:
+            self.concurrency_limiter.release(time.monotonic() - started_at, congested=True)
+            raise
+        except BaseException:
+            self.concurrency_limiter.release(None)
+            raise
+
+        congested = response.status_code == httpx.codes.TOO_MANY_REQUESTS or response.is_server_error
+        self.concurrency_limiter.release(time.monotonic() - started_at, congested=congested)
+        return response
+
+    async def _get(self, url: str, extensions: Optional[dict[str, Any]]) -> httpx.Response:
+        """
+        Sends a product request, with a token of the credential pool if there is one.
+        A request failed because of its token is retried with another token.
+        """
+        if self.credentials is None:
+            return await self._client.get(url, extensions=extensions)
+
+        while True:
+            credential = await self.credentials.acquire()
+            response = None
+
+            try:
+                response = await self._client.get(url, headers=credential.headers, extensions=extensions)
+            finally:
+                retry = self.credentials.release(credential, response)
+
+            if not retry:
+                return response
+
+    async def warmup(self, connections: int = 1) -> int:
+        """
+        Opens connections to the API before traffic arrives, so that first lookups don't wait for TLS handshakes.
+        Sends `connections` concurrent HEAD requests, which are not charged.
+        With HTTP/2 a single connection multiplexes all requests, so one connection is enough.
+
+        :param connections: Number of connections to open
+        :return: Number of successful requests.
+        """
+        return sum(await asyncio.gather(*(self._warmup_connection() for _ in range(connections))))
+
+    async def _warmup_connection(self) -> bool:
+        try:
+            await self._client.head(self.WARMUP_ENDPOINT)
+        except httpx.HTTPError:
+            return False
+
+        return True
+
+    async def get_products(
+        self, barcodes: Iterable[str], *, concurrency: int = 10, budget: Optional[BudgetManager] = None
+    ) -> dict[str, ProductResponse | EandbResponse | httpx.HTTPError]:
+        """
+        Returns product info for multiple barcodes, fetching up to `concurrency` products at a time.
+        Duplicate barcodes (and equivalent barcodes if `canonicalize_barcodes` is set) are requested only once.
+        Unexpected errors (5xx or transport error) are returned in place of a result instead of being raised.
+        Once the budget is exhausted, no more requests are dispatched and remaining barcodes are omitted from the result.
+
+        :param barcodes: Barcodes (EAN / UPC / ISBN) of products
+        :param concurrency: Maximum number of requests in flight
+        :param budget: Budget to spend, defaults to the budget of the client
+        :return: Dict mapping each barcode to `ProductResponse`, `EandbResponse` or `httpx.HTTPError`.
+        """
+        barcodes = list(barcodes)
+        results = {
+            barcode: result
+            async for barcode, result in self.iter_products(barcodes, concurrency=concurrency, budget=budget)
+        }
+        return self._map_results(barcodes, results)
+
+    async def iter_products(
+        self, barcodes: Iterable[str], *, concurrency: int = 10, budget: Optional[BudgetManager] = None
+    ) -> AsyncIterator[tuple[str, ProductResponse | EandbResponse | httpx.HTTPError]]:
+        """
+        Same as `get_products`, but yields `(barcode, result)` pairs as soon as they are completed.
+        Only the first of duplicate or equivalent barcodes is yielded.
+        Barcodes are consumed lazily, so arbitrarily long iterables can be processed in bounded memory.
+        Once the budget is exhausted, results of requests in flight are yielded and iteration stops.
+
+        :param barcodes: Barcodes (EAN / UPC / ISBN) of products
+        :param concurrency: Maximum number of requests in flight
+        :param budget: Budget to spend, defaults to the budget of the client
+        :return: Async iterator of `(barcode, result)` pairs in order of completion.
+        """
+        if concurrency < 1:
+            raise ValueError('`concurrency` param must be positive')
+
+        budget = self._get_budget(budget)
+
+        barcodes_iter = self._unique_barcodes(barcodes)
+        pending = set()
+
+        try:
+            for barcode in barcodes_iter:
+                invalid_barcode_response = self._check_barcode(self._barcode_key(barcode))
+
+                if invalid_barcode_response is not None:
+                    yield barcode, invalid_barcode_response
+                    continue
+
+                if not self._try_reserve(budget):
+                    break
+
+                pending.add(asyncio.ensure_future(self._get_product_or_error(barcode, budget)))
+
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                    for task in done:
+                        yield task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                # Tasks cancelled before they started never reach the code returning their reservations
+                if budget is not None and inspect.getcoroutinestate(task.get_coro()) == inspect.CORO_CREATED:
+                    budget.release()
+
+                task.cancel()
+
+    async def _get_product_or_error(
+        self, barcode: str, budget: Optional[BudgetManager]
+    ) -> tuple[str, ProductResponse | EandbResponse | httpx.HTTPError]:
+        # Budget is reserved by the batch method on dispatch
+        try:
+            return barcode, await self._get_product(barcode, budget, reserved=budget is not None)
+        except httpx.HTTPError as e:
+            return barcode, e
 
     async def aclose(self):
         """
-        Closes underlying httpx client.
+        Cancels background refreshes and closes underlying httpx client.
         """
+        await self._cancel_refreshes()
         await self._client.aclose()
 
+    async def _cancel_refreshes(self) -> None:
+        for task in self._refreshes:
+            task.cancel()
+
+        await asyncio.gather(*self._refreshes, return_exceptions=True)
+
     async def __aenter__(self):
         await self._client.__aenter__()
         return self
@@ -109,4 +1220,5 @@ class EandbV2AsyncClient(EandbV2AbstractClient):
         exc_value: Optional[BaseException] = None,
         traceback: Optional[TracebackType] = None,
     ):
+        await self._cancel_refreshes()
         await self._client.__aexit__(exc_type, exc_value, traceback)
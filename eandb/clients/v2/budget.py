@@ -0,0 +1,206 @@
+import collections
+import threading
+import time
+from typing import Optional
+
+from eandb.models.v2 import ProductResponse, EandbResponse, ErrorType
+
+
+class BudgetExhaustedError(Exception):
+    """
+    Raised when a request would exceed the spend limit or the account balance of a `BudgetManager`.
+    """
+
+
+class BudgetManager:
+    """
+    Tracks account balance reported by API responses and limits spending of clients sharing the budget.
+    Every request is reserved before it is sent, so requests in flight are accounted for,
+    and is counted as spent when a product is returned. Error responses and failed requests are not counted.
+    Thread-safe, so one budget can be shared by sync and async clients.
+
+    :param min_balance: Balance to keep, no requests are dispatched once it would be reached
+    :param spend_limit: Maximum number of paid requests, `None` for no limit
+    :param burn_rate_window: Time window in seconds used to compute `burn_rate`
+    """
+
+    def __init__(
+        self,
+        *,
+        min_balance: int = 0,
+        spend_limit: Optional[int] = None,
+        burn_rate_window: float = 5 * 60,
+        _parent: Optional['BudgetManager'] = None
+    ):
+        self.min_balance = min_balance
+        self.spend_limit = spend_limit
+        self.burn_rate_window = burn_rate_window
+
+        self._parent = _parent
+        self._balance: Optional[int] = None
+        self._spent = 0
+        self._reserved = 0
+        self._balance_history: collections.deque[tuple[float, int]] = collections.deque()
+        self._lock = threading.Lock()
+
+    def job(self, *, spend_limit: Optional[int] = None) -> 'BudgetManager':
+        """
+        Returns a budget for a single job: it has its own spend limit and spent counter,
+        while the balance is checked and tracked by this budget.
+
+        :param spend_limit: Maximum number of paid requests of the job, `None` for no limit
+        :return: `BudgetManager` object.
+        """
+        return BudgetManager(spend_limit=spend_limit, burn_rate_window=self.burn_rate_window, _parent=self)
+
+    @property
+    def balance(self) -> Optional[int]:
+        """
+        Latest account balance reported by the API, `None` until the first product is returned.
+        """
+        if self._parent is not None:
+            return self._parent.balance
+
+        return self._balance
+
+    @property
+    def spent(self) -> int:
+        return self._spent
+
+    @property
+    def reserved(self) -> int:
+        """
+        Number of requests in flight.
+        """
+        return self._reserved
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """
+        Number of requests that can still be dispatched, `None` if unlimited or the balance is not known yet.
+        """
+        with self._lock:
+            remaining = self._get_remaining()
+
+        if self._parent is not None:
+            parent_remaining = self._parent.remaining
+
+            if parent_remaining is not None:
+                remaining = parent_remaining if remaining is None else min(remaining, parent_remaining)
+
+        return remaining
+
+    @property
+    def burn_rate(self) -> Optional[float]:
+        """
+        Balance spent per second within the last `burn_rate_window` seconds, `None` if not known yet.
+        """
+        if self._parent is not None:
+            return self._parent.burn_rate
+
+        with self._lock:
+            self._trim_history(time.monotonic())
+
+            if len(self._balance_history) < 2:
+                return None
+
+            (first_time, first_balance), (last_time, last_balance) = self._balance_history[0], self._balance_history[-1]
+
+        if last_time <= first_time:
+            return None
+
+        return max(0.0, (first_balance - last_balance) / (last_time - first_time))
+
+    def is_exhausted(self) -> bool:
+        remaining = self.remaining
+        return remaining is not None and remaining <= 0
+
+    def reserve(self) -> None:
+        """
+        Reserves budget for one request.
+        An exception (`BudgetExhaustedError`) is raised if the spend limit or the balance would be exceeded.
+        """
+        with self._lock:
+            remaining = self._get_remaining()
+
+            if remaining is not None and remaining <= 0:
+                raise BudgetExhaustedError(self._get_exhausted_reason())
+
+            self._reserved += 1
+
+        if self._parent is not None:
+            try:
+                self._parent.reserve()
+            except BudgetExhaustedError:
+                with self._lock:
+                    self._reserved -= 1
+
+                raise
+
+    def release(self) -> None:
+        """
+        Releases a reservation of a request which was not sent or not charged.
+        """
+        with self._lock:
+            self._reserved -= 1
+
+        if self._parent is not None:
+            self._parent.release()
+
+    def commit(self, result: ProductResponse | EandbResponse) -> None:
+        """
+        Releases a reservation of a sent request and records its outcome.
+        """
+        if not isinstance(result, ProductResponse):
+            if result.get_error_type() == ErrorType.EMPTY_BALANCE:
+                self.update_balance(0)
+
+            self.release()
+            return
+
+        with self._lock:
+            self._reserved -= 1
+            self._spent += 1
+
+        if self._parent is not None:
+            self._parent.commit(result)
+        else:
+            self.update_balance(result.balance)
+
+    def update_balance(self, balance: int) -> None:
+        """
+        Sets current account balance, e.g. known from a previous run.
+        """
+        if self._parent is not None:
+            self._parent.update_balance(balance)
+            return
+
+        now = time.monotonic()
+
+        with self._lock:
+            self._balance = balance
+            self._balance_history.append((now, balance))
+            self._trim_history(now)
+
+    def _get_remaining(self) -> Optional[int]:
+        remaining = None
+
+        if self.spend_limit is not None:
+            remaining = self.spend_limit - self._spent - self._reserved
+
+        if self._balance is not None:
+            balance_remaining = self._balance - self.min_balance - self._reserved
+            remaining = balance_remaining if remaining is None else min(remaining, balance_remaining)
+
+        return remaining
+
+    def _get_exhausted_reason(self) -> str:
+        if self.spend_limit is not None and self._spent + self._reserved >= self.spend_limit:
+            return f'Spend limit of {self.spend_limit} requests is reached'
+
+        return f'Account balance of {self._balance} is too low'
+
+    def _trim_history(self, now: float) -> None:
+        # The last sample is always kept, so that the balance is known after an idle period
+        while len(self._balance_history) > 1 and now - self._balance_history[0][0] > self.burn_rate_window:
+            self._balance_history.popleft()
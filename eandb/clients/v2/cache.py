@@ -0,0 +1,401 @@
+import abc
+import collections
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from eandb.models.v2 import ProductResponse, EandbResponse
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_NOT_FOUND_TTL = 24 * 60 * 60
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheEntry:
+    """
+    Cached API response. Depending on the cache, either raw `content` or a parsed `response` (or both) is set.
+    """
+    status_code: int
+    stored_at: float
+    expires_at: float
+    content: Optional[bytes] = None
+    response: ProductResponse | EandbResponse | None = None
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) >= self.expires_at
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """
+    Counters of cache lookups made by a client.
+    `coalesced` counts requests that were served by joining an identical request already in flight,
+    `stale` counts expired entries served while the circuit breaker was open,
+    `store_hits` counts lookups served from the offline product store.
+    `refreshes` counts background refreshes started by `StaleWhileRevalidate`, `refresh_failures` those which failed.
+    """
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    stale: int = 0
+    store_hits: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+
+class StaleWhileRevalidate:
+    """
+    Cache policy of clients: a cached entry older than `soft_ttl` is returned right away,
+    while a background lookup refreshes it in the cache. Entries are served until they expire by TTL of the cache
+    (the hard TTL), after that lookups wait for the API as usual.
+    At most `max_refreshes` refreshes are in flight, other stale entries are served without a refresh meanwhile.
+    A failed refresh (a raised exception or an error response other than `PRODUCT_NOT_FOUND`) keeps the stale entry,
+    and the barcode is not refreshed again for `retry_after` seconds.
+    Thread-safe.
+
+    :param soft_ttl: Age of cached entries in seconds after which they are refreshed in background
+    :param max_refreshes: Maximum number of background refreshes in flight
+    :param retry_after: Seconds before a barcode is refreshed again after a failed refresh
+    """
+
+    def __init__(self, *, soft_ttl: float, max_refreshes: int = 10, retry_after: float = 60.0):
+        if max_refreshes < 1:
+            raise ValueError('`max_refreshes` param must be positive')
+
+        self.soft_ttl = soft_ttl
+        self.max_refreshes = max_refreshes
+        self.retry_after = retry_after
+
+        self._refreshing: set[str] = set()
+        # Barcodes of recently failed refreshes in order of failure
+        self._failed_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def refreshing(self) -> int:
+        """
+        Number of refreshes in flight.
+        """
+        return len(self._refreshing)
+
+    def should_refresh(self, barcode: str, entry: CacheEntry) -> bool:
+        """
+        Checks whether a served cache entry should be refreshed, and counts the refresh as in flight if so.
+        Every started refresh must be followed by `record()`.
+        """
+        if time.time() - entry.stored_at < self.soft_ttl:
+            return False
+
+        with self._lock:
+            if barcode in self._refreshing or len(self._refreshing) >= self.max_refreshes:
+                return False
+
+            failed_at = self._failed_at.get(barcode)
+
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                return False
+
+            self._refreshing.add(barcode)
+            return True
+
+    def record(self, barcode: str, succeeded: bool) -> None:
+        """
+        Records outcome of a refresh.
+        """
+        with self._lock:
+            self._refreshing.discard(barcode)
+            self._failed_at.pop(barcode, None)
+
+            if succeeded:
+                return
+
+            now = time.monotonic()
+            self._failed_at[barcode] = now
+
+            while self._failed_at and now - next(iter(self._failed_at.values())) >= self.retry_after:
+                del self._failed_at[next(iter(self._failed_at))]
+
+
+class ProductCache(abc.ABC):
+    """
+    Base class for product caches used by `EandbV2SyncClient` and `EandbV2AsyncClient`.
+    Successful responses are cached for `ttl` seconds, `PRODUCT_NOT_FOUND` responses for `not_found_ttl` seconds.
+    Other responses are never cached.
+
+    Caches with `blocking = True` do I/O, so `EandbV2AsyncClient` calls them on a worker thread
+    instead of the event loop.
+    """
+    blocking = False
+
+    def __init__(self, *, ttl: float = DEFAULT_TTL, not_found_ttl: Optional[float] = DEFAULT_NOT_FOUND_TTL):
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+
+    @abc.abstractmethod
+    def get(self, barcode: str) -> Optional[CacheEntry]:
+        """
+        Returns a non-expired cache entry for the barcode or `None`.
+        """
+
+    def get_stale(self, barcode: str) -> Optional[CacheEntry]:
+        """
+        Returns a cache entry for the barcode even if it is expired, or `None`.
+        Used to serve lookups while the API is unavailable, caches which drop expired entries return `None`.
+        """
+        return None
+
+    @abc.abstractmethod
+    def _store(self, barcode: str, entry: CacheEntry) -> None:
+        pass
+
+    def set(
+        self, barcode: str, status_code: int, content: bytes, response: ProductResponse | EandbResponse
+    ) -> None:
+        """
+        Stores an API response if it is cacheable.
+        """
+        ttl = self._get_ttl(status_code)
+
+        if not ttl or ttl <= 0:
+            return
+
+        now = time.time()
+        self._store(
+            barcode,
+            CacheEntry(status_code=status_code, stored_at=now, expires_at=now + ttl, content=content, response=response)
+        )
+
+    def _get_ttl(self, status_code: int) -> Optional[float]:
+        if status_code == httpx.codes.OK:
+            return self.ttl
+
+        if status_code == httpx.codes.NOT_FOUND:
+            return self.not_found_ttl
+
+        return None
+
+
+class LRUProductCache(ProductCache):
+    """
+    In-process cache of parsed responses, evicting least recently used entries above `max_entries`.
+
+    :param max_entries: Maximum number of stored entries
+    :param ttl: TTL of successful responses in seconds
+    :param not_found_ttl: TTL of `PRODUCT_NOT_FOUND` responses in seconds, `None` disables caching them
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl: float = DEFAULT_TTL,
+        not_found_ttl: Optional[float] = DEFAULT_NOT_FOUND_TTL
+    ):
+        super().__init__(ttl=ttl, not_found_ttl=not_found_ttl)
+
+        self.max_entries = max_entries
+
+        self._entries: collections.OrderedDict[str, CacheEntry] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, barcode: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(barcode)
+
+            # Expired entries are kept until evicted or replaced, so that they can be served by `get_stale()`
+            if entry is None or entry.is_expired():
+                return None
+
+            self._entries.move_to_end(barcode)
+            return entry
+
+    def get_stale(self, barcode: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(barcode)
+
+    def delete(self, barcode: str) -> None:
+        with self._lock:
+            self._entries.pop(barcode, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, barcode: str, entry: CacheEntry) -> None:
+        # Parsed response is kept instead of raw content, so hits skip both network and validation
+        entry = dataclasses.replace(entry, content=None)
+
+        with self._lock:
+            self._entries[barcode] = entry
+            self._entries.move_to_end(barcode)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteProductCache(ProductCache):
+    """
+    Persistent cache storing raw JSON responses in a local SQLite file.
+    The file can be shared between threads and processes on one host.
+    Reads don't take the write lock: access time used for eviction is updated only when it is older
+    than `access_update_interval`, so eviction order is approximate.
+
+    :param path: Path to SQLite database file
+    :param max_entries: Approximate maximum number of stored entries, least recently used entries are evicted first
+    :param ttl: TTL of successful responses in seconds
+    :param not_found_ttl: TTL of `PRODUCT_NOT_FOUND` responses in seconds, `None` disables caching them
+    :param timeout: Seconds to wait for a lock held by another connection
+    :param access_update_interval: Minimum interval between access time updates of an entry in seconds
+    """
+    blocking = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            barcode TEXT PRIMARY KEY,
+            status_code INTEGER NOT NULL,
+            content BLOB NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS products_accessed_at ON products (accessed_at);
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        max_entries: Optional[int] = 1_000_000,
+        ttl: float = DEFAULT_TTL,
+        not_found_ttl: Optional[float] = DEFAULT_NOT_FOUND_TTL,
+        timeout: float = 30.0,
+        access_update_interval: float = 60 * 60
+    ):
+        super().__init__(ttl=ttl, not_found_ttl=not_found_ttl)
+
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.access_update_interval = access_update_interval
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+
+        with self._connection() as connection:
+            connection.executescript(self._SCHEMA)
+
+    def get(self, barcode: str) -> Optional[CacheEntry]:
+        now = time.time()
+
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT status_code, content, stored_at, expires_at, accessed_at FROM products WHERE barcode = ?', (barcode,)
+        ).fetchone()
+
+        if row is None or row[3] <= now:
+            return None
+
+        if now - row[4] >= self.access_update_interval:
+            with connection:
+                connection.execute('UPDATE products SET accessed_at = ? WHERE barcode = ?', (now, barcode))
+
+        return CacheEntry(status_code=row[0], content=row[1], stored_at=row[2], expires_at=row[3])
+
+    def get_stale(self, barcode: str) -> Optional[CacheEntry]:
+        """
+        Returns a cache entry for the barcode even if it is expired, expired entries are kept until `evict()`.
+        """
+        row = self._connection().execute(
+            'SELECT status_code, content, stored_at, expires_at FROM products WHERE barcode = ?', (barcode,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return CacheEntry(status_code=row[0], content=row[1], stored_at=row[2], expires_at=row[3])
+
+    def delete(self, barcode: str) -> None:
+        with self._connection() as connection:
+            connection.execute('DELETE FROM products WHERE barcode = ?', (barcode,))
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute('DELETE FROM products')
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Closes SQLite connection of the current thread.
+        """
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _store(self, barcode: str, entry: CacheEntry) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO products (barcode, status_code, content, stored_at, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (barcode, entry.status_code, entry.content, entry.stored_at, entry.expires_at, entry.stored_at)
+            )
+
+        if self._should_evict():
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes expired entries and least recently used entries above `max_entries`.
+        Called automatically every `max_entries / 100` writes.
+        """
+        with self._connection() as connection:
+            connection.execute('DELETE FROM products WHERE expires_at <= ?', (time.time(),))
+
+            if self.max_entries is not None:
+                connection.execute(
+                    'DELETE FROM products WHERE barcode IN '
+                    '(SELECT barcode FROM products ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+
+    def _should_evict(self) -> bool:
+        eviction_interval = max(1, (self.max_entries or 100_000) // 100)
+
+        with self._lock:
+            self._writes_since_eviction += 1
+
+            if self._writes_since_eviction < eviction_interval:
+                return False
+
+            self._writes_since_eviction = 0
+            return True
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+
+        return connection
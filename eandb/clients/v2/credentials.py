@@ -0,0 +1,271 @@
+import asyncio
+import dataclasses
+import math
+import threading
+import time
+from typing import Iterable, Optional
+
+import httpx
+import pydantic
+
+from eandb.models.v2 import EandbResponse, ErrorType
+
+#: Errors which mean that a token can't be used anymore, until it's renewed or the account is topped up
+_DISABLING_ERRORS = frozenset((
+    ErrorType.INVALID_JWT, ErrorType.ACCOUNT_NOT_CONFIRMED, ErrorType.JWT_REVOKED, ErrorType.JWT_EXPIRED,
+    ErrorType.EMPTY_BALANCE
+))
+
+
+class CredentialsExhaustedError(httpx.HTTPError):
+    """
+    Raised without sending a request when every token of the credential pool was pulled from rotation.
+    """
+
+
+@dataclasses.dataclass
+class Credential:
+    """
+    API token of a `CredentialPool` with its limits and state.
+    `balance` is the account balance reported by the last successful lookup, `None` until then.
+    `error_type` is the error which pulled the token from rotation, `None` for tokens in rotation.
+
+    :param jwt: API token
+    :param max_concurrency: Maximum number of requests in flight with the token, `None` for unlimited
+    :param rate: Maximum average number of requests per second with the token, `None` for unlimited
+    :param burst: Maximum number of requests sent at once after an idle period, defaults to `rate` rounded up
+    """
+    jwt: str
+    max_concurrency: Optional[int] = None
+    rate: Optional[float] = None
+    burst: Optional[int] = None
+    balance: Optional[int] = None
+    error_type: Optional[ErrorType] = None
+    in_flight: int = 0
+    requests: int = 0
+    _tokens: float = dataclasses.field(default=0.0, repr=False)
+    _updated_at: float = dataclasses.field(default_factory=time.monotonic, repr=False)
+
+    def __post_init__(self):
+        if self.rate is not None:
+            if self.rate <= 0:
+                raise ValueError('`rate` param must be positive')
+
+            self.burst = self.burst if self.burst is not None else max(1, math.ceil(self.rate))
+            self._tokens = float(self.burst)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'Authorization': f'Bearer {self.jwt}'}
+
+    def _get_delay(self, now: float) -> float:
+        """
+        Returns seconds until a request can be sent within the rate limit, 0 if it can be sent now.
+        """
+        if self.rate is None:
+            return 0.0
+
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class CredentialPool:
+    """
+    Spreads requests of a client across API tokens of several accounts, so that throughput and balance add up.
+    Each request takes the token with the fewest requests in flight among tokens within their own concurrency
+    and rate limits, waiting if there is none.
+    Tokens are pulled from rotation on `INVALID_JWT`, `ACCOUNT_NOT_CONFIRMED`, `JWT_REVOKED`, `JWT_EXPIRED`
+    and `EMPTY_BALANCE` errors, or when the reported balance reaches zero, and the request is retried with another
+    token. Once no token is left, lookups raise `CredentialsExhaustedError`.
+    Thread-safe, so one pool can be shared by clients.
+
+    :param jwts: API tokens, or `Credential` objects for tokens with their own limits
+    :param max_concurrency: Maximum number of requests in flight per token, `None` for unlimited
+    :param rate: Maximum average number of requests per second per token, `None` for unlimited
+    :param burst: Maximum number of requests sent at once with a token after an idle period
+    """
+
+    def __init__(
+        self,
+        jwts: Iterable[str | Credential],
+        *,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None
+    ):
+        self.credentials = [
+            jwt if isinstance(jwt, Credential) else Credential(
+                jwt=jwt, max_concurrency=max_concurrency, rate=rate, burst=burst
+            )
+            for jwt in jwts
+        ]
+
+        if not self.credentials:
+            raise ValueError('`jwts` param is empty')
+
+        self._by_jwt = {credential.jwt: credential for credential in self.credentials}
+        self._next = 0
+        self._condition = threading.Condition()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def available(self) -> list[Credential]:
+        """
+        Tokens in rotation.
+        """
+        return [credential for credential in self.credentials if credential.error_type is None]
+
+    @property
+    def balance(self) -> Optional[int]:
+        """
+        Total reported balance of tokens in rotation, `None` until every one of them has reported it.
+        """
+        balances = [credential.balance for credential in self.available]
+        return None if None in balances else sum(balances)
+
+    def _try_acquire(self) -> tuple[Optional[Credential], Optional[float]]:
+        """
+        Takes a token if one is within its limits.
+
+        :return: The token or `None`, and seconds until a rate limited token is available
+            (`None` if only a released request can free a token).
+        """
+        now = time.monotonic()
+        selected, delay = None, None
+
+        if not self.available:
+            raise CredentialsExhaustedError(
+                'All API tokens were pulled from rotation: '
+                + ', '.join(sorted({credential.error_type.name for credential in self.credentials}))
+            )
+
+        for index in range(len(self.credentials)):
+            credential = self.credentials[(self._next + index) % len(self.credentials)]
+
+            if credential.error_type is not None or (
+                credential.max_concurrency is not None and credential.in_flight >= credential.max_concurrency
+            ):
+                continue
+
+            credential_delay = credential._get_delay(now)
+
+            if credential_delay > 0:
+                delay = credential_delay if delay is None else min(delay, credential_delay)
+            elif selected is None or credential.in_flight < selected.in_flight:
+                selected = credential
+
+        if selected is None:
+            return None, delay
+
+        if selected.rate is not None:
+            selected._tokens -= 1
+
+        selected.in_flight += 1
+        self._next = (self.credentials.index(selected) + 1) % len(self.credentials)
+        return selected, None
+
+    def acquire_blocking(self) -> Credential:
+        """
+        Takes a token for a request, waiting for one within its limits. Must be followed by `release()`.
+        """
+        with self._condition:
+            while True:
+                credential, delay = self._try_acquire()
+
+                if credential is not None:
+                    return credential
+
+                self._condition.wait(delay)
+
+    async def acquire(self) -> Credential:
+        """
+        Takes a token for a request, waiting for one within its limits. Must be followed by `release()`.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            with self._condition:
+                credential, delay = self._try_acquire()
+
+                if credential is not None:
+                    return credential
+
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+
+            try:
+                await asyncio.wait((waiter[1],), timeout=delay)
+            finally:
+                with self._condition:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(self, credential: Credential, response: Optional[httpx.Response]) -> bool:
+        """
+        Returns a token taken for a request, and pulls it from rotation if the response is an error of the token.
+
+        :param credential: The token
+        :param response: Response of the request, `None` if it failed
+        :return: `True` if the token was pulled from rotation and the request can be retried with another token.
+        """
+        error_type = self._get_error_type(response)
+
+        with self._condition:
+            credential.in_flight -= 1
+            credential.requests += 1
+
+            if error_type in _DISABLING_ERRORS and credential.error_type is None:
+                credential.error_type = error_type
+
+            self._wake_up()
+            return error_type in _DISABLING_ERRORS and bool(self.available)
+
+    def record_balance(self, jwt: str, balance: int) -> None:
+        """
+        Records the account balance reported by a successful lookup with the token.
+        A token without balance is pulled from rotation before it fails a request.
+        """
+        credential = self._by_jwt.get(jwt)
+
+        if credential is None:
+            return
+
+        with self._condition:
+            credential.balance = balance
+
+            if balance <= 0 and credential.error_type is None:
+                credential.error_type = ErrorType.EMPTY_BALANCE
+
+    def restore(self, jwt: str) -> None:
+        """
+        Puts a token back into rotation, e.g. after the account was topped up.
+        """
+        with self._condition:
+            credential = self._by_jwt[jwt]
+            credential.error_type = None
+            credential.balance = None
+            self._wake_up()
+
+    @staticmethod
+    def _get_error_type(response: Optional[httpx.Response]) -> Optional[ErrorType]:
+        if response is None or response.status_code != httpx.codes.FORBIDDEN:
+            return None
+
+        try:
+            return EandbResponse.model_validate_json(response.content).get_error_type()
+        except pydantic.ValidationError:
+            return None
+
+    def _wake_up(self) -> None:
+        self._condition.notify_all()
+
+        for loop, waiter in self._waiters:
+            loop.call_soon_threadsafe(_set_done, waiter)
+
+        self._waiters.clear()
+
+
+def _set_done(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,186 @@
+import abc
+import bisect
+import collections
+import dataclasses
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from eandb.models.v2 import ProductResponse, EandbResponse
+
+PHASES = ('queue', 'connect', 'ttfb', 'read', 'parse', 'total')
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclasses.dataclass
+class RequestTiming:
+    """
+    Timing breakdown of a `get_product` call in seconds, summed over retries:
+    `queue` - waiting for concurrency and rate limiters and retry delays,
+    `connect` - TCP connection and TLS handshake, `ttfb` - from sending the request to response headers,
+    `read` - response body, `parse` - JSON decoding and validation (done in a single pass by pydantic),
+    `total` - the whole call.
+
+    `cache` is `hit`, `miss`, `coalesced` (joined an identical request in flight), `stale` (expired entry served
+    while the circuit breaker was open), `store` (served from the offline product store) or `refresh`
+    (background refresh of a cached entry), `None` without a cache. `hedged` is set if a hedged request was sent.
+    `error_type` is name of `ErrorType` of an error response or name of a raised exception class.
+    """
+    barcode: str
+    status_code: Optional[int] = None
+    error_type: Optional[str] = None
+    cache: Optional[str] = None
+    attempts: int = 0
+    hedged: bool = False
+    queue: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    read: float = 0.0
+    parse: float = 0.0
+    total: float = 0.0
+    started_at: float = dataclasses.field(default_factory=time.monotonic, repr=False)
+
+    def finish(
+        self, result: ProductResponse | EandbResponse | None = None, error: Optional[BaseException] = None
+    ) -> None:
+        self.total = time.monotonic() - self.started_at
+
+        if error is not None:
+            self.error_type = type(error).__name__
+
+            if isinstance(error, httpx.HTTPStatusError):
+                self.status_code = error.response.status_code
+        elif isinstance(result, EandbResponse) and result.error is not None:
+            error_type = result.get_error_type()
+            self.error_type = error_type.name if error_type is not None else 'UNKNOWN'
+            self.status_code = self.status_code or result.error.code
+        elif self.status_code is None:
+            self.status_code = httpx.codes.OK
+
+
+class RequestObserver(abc.ABC):
+    """
+    Receives timing of every `get_product` call of a client, including calls made by batch methods.
+    Called on the thread (or event loop) of the call, so implementations should be fast and must not raise.
+    """
+
+    @abc.abstractmethod
+    def on_request(self, timing: RequestTiming) -> None:
+        pass
+
+
+class _Trace:
+    """
+    Collects connection and response phases from httpcore trace events of one HTTP request.
+    """
+    __slots__ = ('timing', '_phase_started_at', '_request_sent_at')
+
+    def __init__(self, timing: RequestTiming):
+        self.timing = timing
+        self._phase_started_at = 0.0
+        self._request_sent_at = 0.0
+
+    def __call__(self, name: str, info: dict) -> None:
+        now = time.monotonic()
+        # Event names look like `connection.connect_tcp.started` or `http11.receive_response_body.complete`
+        step, _, state = name.rpartition('.')
+        step = step.rpartition('.')[2]
+
+        if state == 'started':
+            self._phase_started_at = now
+
+            if step == 'send_request_headers':
+                self._request_sent_at = now
+        elif state == 'complete':
+            if step in ('connect_tcp', 'connect_unix_socket', 'start_tls'):
+                self.timing.connect += now - self._phase_started_at
+            elif step == 'receive_response_headers':
+                self.timing.ttfb += now - self._request_sent_at
+            elif step == 'receive_response_body':
+                self.timing.read += now - self._phase_started_at
+
+    async def trace_async(self, name: str, info: dict) -> None:
+        self(name, info)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsAggregator(RequestObserver):
+    """
+    In-process request counters and latency histograms of each phase of `RequestTiming`,
+    exported in Prometheus text format by `to_prometheus()`.
+
+    :param buckets: Upper bounds of histogram buckets in seconds
+    :param prefix: Prefix of metric names
+    """
+
+    def __init__(self, *, buckets: tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = 'eandb'):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+
+        self._requests: collections.Counter[tuple[str, str, str]] = collections.Counter()
+        self._histograms = {phase: _Histogram(len(self.buckets)) for phase in PHASES}
+        self._lock = threading.Lock()
+
+    def on_request(self, timing: RequestTiming) -> None:
+        labels = (str(timing.status_code or ''), timing.error_type or '', timing.cache or '')
+
+        with self._lock:
+            self._requests[labels] += 1
+
+            for phase, histogram in self._histograms.items():
+                value = getattr(timing, phase)
+                index = bisect.bisect_left(self.buckets, value)
+
+                if index < len(self.buckets):
+                    histogram.counts[index] += 1
+
+                histogram.sum += value
+                histogram.count += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(self._requests.values())
+
+    def to_prometheus(self) -> str:
+        """
+        Returns metrics in Prometheus text exposition format.
+        """
+        requests_name = f'{self.prefix}_requests_total'
+        phase_name = f'{self.prefix}_request_phase_seconds'
+
+        lines = [
+            f'# HELP {requests_name} Product lookups by status code, error type and cache outcome.',
+            f'# TYPE {requests_name} counter'
+        ]
+
+        with self._lock:
+            for (status_code, error_type, cache), count in sorted(self._requests.items()):
+                lines.append(
+                    f'{requests_name}{{status="{status_code}",error_type="{error_type}",cache="{cache}"}} {count}'
+                )
+
+            lines.append(f'# HELP {phase_name} Duration of product lookup phases.')
+            lines.append(f'# TYPE {phase_name} histogram')
+
+            for phase, histogram in self._histograms.items():
+                cumulative = 0
+
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{phase_name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+
+                lines.append(f'{phase_name}_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{phase_name}_sum{{phase="{phase}"}} {histogram.sum}')
+                lines.append(f'{phase_name}_count{{phase="{phase}"}} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
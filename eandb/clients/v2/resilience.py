@@ -0,0 +1,220 @@
+import collections
+import math
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+
+class HedgingPolicy:
+    """
+    Hedged requests of `EandbV2AsyncClient`: if a request has not answered within the hedging delay,
+    a second identical request is sent and the first answer is kept, the other request is cancelled.
+    The delay is either fixed or learned as `percentile` of recent latencies, so that only the slowest requests
+    are hedged. A hedged lookup may be charged twice, so hedges are limited to `max_hedge_ratio` of recent requests.
+
+    :param delay: Fixed hedging delay in seconds, `None` to learn it from latencies
+    :param percentile: Percentile of recent latencies used as the learned delay
+    :param min_delay: Minimum learned delay in seconds
+    :param max_delay: Maximum learned delay in seconds
+    :param window: Number of recent requests used to learn the delay and to limit hedges
+    :param min_samples: Number of latencies required before hedging with a learned delay
+    :param max_hedge_ratio: Maximum fraction of recent requests which are hedged
+    """
+
+    def __init__(
+        self,
+        *,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        min_delay: float = 0.01,
+        max_delay: float = 5.0,
+        window: int = 1000,
+        min_samples: int = 20,
+        max_hedge_ratio: float = 0.1
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError('`percentile` param must be between 0 and 1')
+
+        self.fixed_delay = delay
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+
+        self._latencies: collections.deque[float] = collections.deque(maxlen=window)
+        self._learned_delay: Optional[float] = None
+        self._samples_since_update = 0
+        # Hedged flags of recent requests, hedges in flight are counted in `_hedges` as well
+        self._recent: collections.deque[bool] = collections.deque(maxlen=window)
+        self._hedges = 0
+
+    @property
+    def delay(self) -> Optional[float]:
+        """
+        Current hedging delay in seconds, `None` if there are not enough latencies to learn it yet.
+        """
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+
+        return self._learned_delay
+
+    def should_hedge(self) -> bool:
+        """
+        Checks whether a hedge can be sent within `max_hedge_ratio`, and counts it if so.
+        """
+        if self._hedges >= max(1.0, self.max_hedge_ratio * len(self._recent)):
+            return False
+
+        self._hedges += 1
+        return True
+
+    def record(self, latency: Optional[float], hedged: bool) -> None:
+        """
+        Records a completed request.
+
+        :param latency: Latency of the first request if it answered first, `None` otherwise
+        :param hedged: A hedge was sent for the request
+        """
+        if len(self._recent) == self._recent.maxlen and self._recent[0]:
+            self._hedges -= 1
+
+        self._recent.append(hedged)
+
+        if latency is None:
+            return
+
+        self._latencies.append(latency)
+        self._samples_since_update += 1
+
+        # Sorting the window is amortized over a tenth of the window
+        if len(self._latencies) >= self.min_samples and (
+            self._learned_delay is None or self._samples_since_update >= max(1, self.window // 10)
+        ):
+            self._samples_since_update = 0
+            latencies = sorted(self._latencies)
+            value = latencies[min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)]
+            self._learned_delay = min(self.max_delay, max(self.min_delay, value))
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """
+    Raised without sending a request while the circuit breaker of a client is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests while the API is clearly unhealthy. The circuit opens when at least `failure_rate`
+    of the last `window` requests (and at least `min_requests`) failed with a transport error or 5xx status.
+    While it is open, lookups fail fast with `CircuitOpenError` or are served from expired cache entries.
+    After `open_duration` seconds up to `half_open_requests` probe requests are let through:
+    the circuit closes when they all succeed and opens again on a failure.
+    Thread-safe, so one breaker can be shared by clients calling the same API.
+
+    :param failure_rate: Fraction of failed requests which opens the circuit
+    :param min_requests: Minimum number of recent requests to evaluate the failure rate
+    :param window: Number of recent requests used to compute the failure rate
+    :param open_duration: Seconds the circuit stays open before probing
+    :param half_open_requests: Number of probe requests
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        min_requests: int = 20,
+        window: int = 100,
+        open_duration: float = 30.0,
+        half_open_requests: int = 1
+    ):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_requests = half_open_requests
+
+        self._state = self.CLOSED
+        self._outcomes: collections.deque[bool] = collections.deque(maxlen=window)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._get_state()
+
+    def allow_request(self) -> bool:
+        """
+        Checks whether a request can be sent, taking a probe slot in half-open state.
+        Every allowed request must be followed by `record()`.
+        """
+        with self._lock:
+            state = self._get_state()
+
+            if state == self.CLOSED:
+                return True
+
+            if state == self.OPEN or self._probes >= self.half_open_requests:
+                return False
+
+            self._probes += 1
+            return True
+
+    def record(self, failed: Optional[bool]) -> None:
+        """
+        Records outcome of an allowed request.
+
+        :param failed: Request failed with a transport error or 5xx status, `None` if it was cancelled
+        """
+        with self._lock:
+            state = self._get_state()
+
+            if state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+                if failed:
+                    self._open()
+                elif failed is not None:
+                    self._probe_successes += 1
+
+                    if self._probe_successes >= self.half_open_requests:
+                        self._state = self.CLOSED
+                        self._outcomes.clear()
+                        self._failures = 0
+
+                return
+
+            # Late outcomes of requests sent before the circuit opened are ignored
+            if state == self.OPEN or failed is None:
+                return
+
+            if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+                self._failures -= 1
+
+            self._outcomes.append(failed)
+            self._failures += failed
+
+            if len(self._outcomes) >= self.min_requests and self._failures >= self.failure_rate * len(self._outcomes):
+                self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def _get_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+
+        return self._state
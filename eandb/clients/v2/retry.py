@@ -0,0 +1,235 @@
+import asyncio
+import collections
+import dataclasses
+import email.utils
+import math
+import random
+import time
+from typing import Optional
+
+import httpx
+
+RETRY_STATUS_CODES = frozenset({
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.INTERNAL_SERVER_ERROR,
+    httpx.codes.BAD_GATEWAY,
+    httpx.codes.SERVICE_UNAVAILABLE,
+    httpx.codes.GATEWAY_TIMEOUT
+})
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """
+    Retry policy for throttled (429), failed (5xx) and transport-level requests.
+    Delays grow exponentially with "full jitter", a `Retry-After` header of the response takes precedence.
+
+    :param max_attempts: Maximum number of attempts including the first one
+    :param backoff_base: Delay before the first retry in seconds
+    :param backoff_max: Maximum delay in seconds
+    :param jitter: Randomize delays between 0 and the exponential backoff value
+    :param max_retry_after: Maximum `Retry-After` value to honor in seconds, longer ones are not retried
+    :param status_codes: Response status codes to retry
+    :param retry_transport_errors: Retry connection errors, timeouts, etc.
+    """
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    jitter: bool = True
+    max_retry_after: float = 60.0
+    status_codes: frozenset[int] = RETRY_STATUS_CODES
+    retry_transport_errors: bool = True
+
+    def should_retry(
+        self, attempt: int, response: Optional[httpx.Response] = None, error: Optional[Exception] = None
+    ) -> bool:
+        """
+        Checks whether a request should be retried after `attempt` attempts.
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if error is not None:
+            return self.retry_transport_errors and isinstance(error, httpx.TransportError)
+
+        if response.status_code not in self.status_codes:
+            return False
+
+        retry_after = get_retry_after(response)
+        return retry_after is None or retry_after <= self.max_retry_after
+
+    def get_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Returns delay in seconds before the next attempt.
+        """
+        retry_after = get_retry_after(response) if response is not None else None
+
+        if retry_after is not None:
+            return retry_after
+
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+def get_retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Parses `Retry-After` header, given either in seconds or as HTTP date.
+    """
+    value = response.headers.get('Retry-After')
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD (additive increase, multiplicative decrease) limit of requests in flight for `EandbV2AsyncClient`.
+    The limit grows by about `increase` per round trip while requests succeed with normal latency,
+    and is multiplied by `decrease_factor` on throttling, server errors or latency above `latency_tolerance` times
+    the baseline latency.
+
+    :param initial_limit: Initial number of requests in flight
+    :param min_limit: Minimum number of requests in flight
+    :param max_limit: Maximum number of requests in flight
+    :param increase: Additive limit increase per round trip
+    :param decrease_factor: Multiplicative limit decrease on congestion
+    :param latency_tolerance: Latency to baseline latency ratio considered as congestion
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('Limits must satisfy 1 <= `min_limit` <= `initial_limit` <= `max_limit`')
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+                self._wake_up()
+                raise
+
+        self._in_flight += 1
+
+    def release(self, latency: Optional[float], congested: bool = False) -> None:
+        """
+        Releases a slot and adjusts the limit by outcome of the request.
+
+        :param latency: Request latency in seconds, `None` for requests without outcome (e.g. cancelled ones)
+        :param congested: Request was throttled or failed because of server overload
+        """
+        self._in_flight -= 1
+
+        if latency is None:
+            self._wake_up()
+            return
+
+        if self._baseline_latency is None or latency < self._baseline_latency:
+            self._baseline_latency = latency
+        else:
+            # Baseline slowly follows persistent latency changes
+            self._baseline_latency += (latency - self._baseline_latency) * 0.01
+
+        if congested or latency > self._baseline_latency * self.latency_tolerance:
+            self._decrease(latency)
+        else:
+            self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+
+        self._wake_up()
+
+    def _decrease(self, latency: float) -> None:
+        now = time.monotonic()
+
+        # At most one decrease per round trip, as requests in flight were sent with the previous limit
+        if now - self._last_decrease < latency:
+            return
+
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+
+    def _wake_up(self) -> None:
+        available = self.limit - self._in_flight
+
+        while available > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                available -= 1
+
+
+class RateLimiter:
+    """
+    Token bucket limiting requests per second of `EandbV2AsyncClient`, retries included.
+
+    :param rate: Maximum average number of requests per second
+    :param burst: Maximum number of requests sent at once after an idle period, defaults to `rate` rounded up
+    """
+
+    def __init__(self, rate: float, *, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError('`rate` param must be positive')
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, math.ceil(rate))
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
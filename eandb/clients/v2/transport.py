@@ -0,0 +1,60 @@
+import dataclasses
+import functools
+import ssl
+from typing import Any, Optional
+
+import httpx
+
+
+@functools.lru_cache
+def _get_default_ssl_context(http2: bool) -> ssl.SSLContext:
+    """
+    Returns the SSL context shared by clients with default verification settings.
+    Loading CA certificates takes most of the time of creating an httpx client, so it is done once per process.
+    """
+    context = httpx.create_ssl_context(verify=True, trust_env=True)
+
+    if http2:
+        context.set_alpn_protocols(['http/1.1', 'h2'])
+
+    return context
+
+
+@dataclasses.dataclass
+class TransportConfig:
+    """
+    Connection pool, protocol and timeout settings of the underlying httpx client.
+
+    :param max_connections: Maximum number of open connections
+    :param max_keepalive_connections: Maximum number of idle connections kept open
+    :param keepalive_expiry: Seconds an idle connection is kept open
+    :param http2: Multiplex requests over HTTP/2 connections, requires `h2` package: pip install eandb[http2]
+    :param connect_timeout: Seconds to establish a connection, including TLS handshake
+    :param read_timeout: Seconds to wait for a chunk of the response
+    :param write_timeout: Seconds to send a chunk of the request
+    :param pool_timeout: Seconds to wait for a connection from the pool, `None` to wait forever
+    """
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+    connect_timeout: Optional[float] = 5.0
+    read_timeout: Optional[float] = 5.0
+    write_timeout: Optional[float] = 5.0
+    pool_timeout: Optional[float] = 5.0
+
+    def get_client_kwargs(self) -> dict[str, Any]:
+        """
+        Returns keyword arguments of `httpx.Client` and `httpx.AsyncClient`.
+        """
+        return {
+            'limits': httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            'timeout': httpx.Timeout(
+                connect=self.connect_timeout, read=self.read_timeout, write=self.write_timeout, pool=self.pool_timeout
+            ),
+            'http2': self.http2
+        }
@@ -1,7 +1,14 @@
 import enum
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+
+class _BaseModel(BaseModel):
+    # Validation schemas are built on first use instead of on import, which keeps import time low
+    # for processes doing a few lookups
+    model_config = ConfigDict(defer_build=True)
 
 
 class ErrorType(enum.Enum):
@@ -24,12 +31,12 @@ _ERROR_MESSAGE_TO_CODE = {
 }
 
 
-class Error(BaseModel):
+class Error(_BaseModel):
     code: int
     description: str
 
 
-class EandbResponse(BaseModel):
+class EandbResponse(_BaseModel):
     error: Optional[Error] = None
 
     def get_error_type(self) -> Optional[ErrorType]:
@@ -46,8 +53,8 @@ class EandbResponse(BaseModel):
         return None
 
 
-class Measurement(BaseModel):
-    class MeasurementValue(BaseModel):
+class Measurement(_BaseModel):
+    class MeasurementValue(_BaseModel):
         value: str
         unit: str
 
@@ -56,44 +63,44 @@ class Measurement(BaseModel):
     lessThan: Optional[MeasurementValue] = None
 
 
-class DimensionsType(BaseModel):
+class DimensionsType(_BaseModel):
     width: Optional[Measurement] = None
     height: Optional[Measurement] = None
     length: Optional[Measurement] = None
     depth: Optional[Measurement] = None
 
 
-class Product(BaseModel):
-    class BarcodeDetails(BaseModel):
+class Product(_BaseModel):
+    class BarcodeDetails(_BaseModel):
         type: str
         description: str
         country: Optional[str] = None
 
-    class Category(BaseModel):
+    class Category(_BaseModel):
         id: str
         titles: dict[str, str]
 
-    class Manufacturer(BaseModel):
+    class Manufacturer(_BaseModel):
         id: Optional[str] = None
         titles: dict[str, str]
         wikidataId: Optional[str] = None
 
-    class Image(BaseModel):
+    class Image(_BaseModel):
         url: str
         isCatalog: bool
         width: int
         height: int
 
-    class Metadata(BaseModel):
-        class Apparel(BaseModel):
+    class Metadata(_BaseModel):
+        class Apparel(_BaseModel):
             sizes: Optional[list[Measurement]]
 
-        class Electric(BaseModel):
-            class BatteryCapacity(BaseModel):
+        class Electric(_BaseModel):
+            class BatteryCapacity(_BaseModel):
                 energy: Optional[Measurement] = None
                 nominal: Optional[Measurement] = None
 
-            class Voltage(BaseModel):
+            class Voltage(_BaseModel):
                 input: Optional[Measurement] = None
                 nominal: Optional[Measurement] = None
                 operational: Optional[Measurement] = None
@@ -103,25 +110,25 @@ class Product(BaseModel):
             batterySize: Optional[str]
             voltage: Optional[Voltage]
 
-        class ExternalIds(BaseModel):
+        class ExternalIds(_BaseModel):
             amazonAsin: Optional[str] = None
             bisacCodes: Optional[list[str]] = None
 
-        class Generic(BaseModel):
-            class Color(BaseModel):
+        class Generic(_BaseModel):
+            class Color(_BaseModel):
                 baseColor: str
                 shade: Optional[str] = None
 
-            class Contributor(BaseModel):
+            class Contributor(_BaseModel):
                 names: dict[str, str]
                 type: str
 
-            class Dimensions(BaseModel):
+            class Dimensions(_BaseModel):
                 product: Optional[DimensionsType] = None
                 packaging: Optional[DimensionsType] = None
 
-            class Ingredients(BaseModel):
-                class Ingredient(BaseModel):
+            class Ingredients(_BaseModel):
+                class Ingredient(_BaseModel):
                     originalNames: Optional[dict[str, str]] = None
                     id: Optional[str] = None
                     canonicalNames: Optional[dict[str, str]] = None
@@ -134,7 +141,7 @@ class Product(BaseModel):
                 groupName: Optional[str]
                 ingredientsGroup: list[Ingredient]
 
-            class Weight(BaseModel):
+            class Weight(_BaseModel):
                 net: Optional[Measurement] = None
                 gross: Optional[Measurement] = None
                 unknown: Optional[Measurement] = None
@@ -151,8 +158,8 @@ class Product(BaseModel):
             volume: Optional[Measurement] = None
             weight: Optional[Weight] = None
 
-        class Food(BaseModel):
-            class Nutriments(BaseModel):
+        class Food(_BaseModel):
+            class Nutriments(_BaseModel):
                 energy: Optional[Measurement] = None
                 fat: Optional[Measurement] = None
                 saturatedFat: Optional[Measurement] = None
@@ -171,11 +178,11 @@ class Product(BaseModel):
 
             nutrimentsPer100Grams: Optional[Nutriments]
 
-        class PrintBook(BaseModel):
+        class PrintBook(_BaseModel):
             numPages: Optional[int] = None
             bindingType: Optional[str] = None
 
-        class Media(BaseModel):
+        class Media(_BaseModel):
             publicationYear: Optional[int] = None
 
         apparel: Optional[Apparel] = None
@@ -199,3 +206,114 @@ class Product(BaseModel):
 class ProductResponse(EandbResponse):
     balance: int
     product: Product
+
+
+class LazyMetadata:
+    """
+    Drop-in replacement for `Product.Metadata`, which keeps raw data and validates each section
+    (`food`, `generic`, `electric`, ...) on first access.
+    Validation errors of a section are raised on access to that section.
+    """
+    __slots__ = ('_raw', '_sections', '_metadata')
+
+    def __init__(self, raw: dict[str, Any]):
+        self._raw = raw
+        self._sections = {}
+        self._metadata = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_') or name not in Product.Metadata.model_fields:
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+        try:
+            return self._sections[name]
+        except KeyError:
+            pass
+
+        section = getattr(Product.Metadata.model_validate({name: self._raw.get(name)}), name)
+        self._sections[name] = section
+        return section
+
+    def to_metadata(self) -> Product.Metadata:
+        """
+        Validates all sections and returns regular `Product.Metadata` object, validated once and then reused.
+        """
+        if self._metadata is None:
+            self._metadata = Product.Metadata.model_validate(self._raw)
+
+        return self._metadata
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyMetadata):
+            return self._raw == other._raw
+
+        if isinstance(other, Product.Metadata):
+            return self.to_metadata() == other
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({", ".join(key for key, value in self._raw.items() if value is not None)})'
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.union_schema(
+            [
+                core_schema.is_instance_schema(cls),
+                core_schema.no_info_after_validator_function(cls, core_schema.dict_schema())
+            ],
+            serialization=core_schema.plain_serializer_function_ser_schema(cls._serialize, info_arg=True)
+        )
+
+    @staticmethod
+    def _serialize(metadata: 'LazyMetadata', info: core_schema.SerializationInfo) -> dict[str, Any]:
+        return metadata.to_metadata().model_dump(
+            mode=info.mode,
+            by_alias=info.by_alias,
+            exclude_unset=info.exclude_unset,
+            exclude_defaults=info.exclude_defaults,
+            exclude_none=info.exclude_none
+        )
+
+
+class LazyProduct(Product):
+    """
+    `Product` with lazily validated `metadata`.
+    Compares equal to a regular `Product` with the same data.
+    """
+    metadata: Optional[LazyMetadata]
+
+    def to_product(self) -> Product:
+        """
+        Returns regular `Product` object with all metadata sections validated.
+        """
+        return Product.model_construct(
+            **{name: getattr(self, name) for name in Product.model_fields if name != 'metadata'},
+            metadata=self.metadata.to_metadata() if self.metadata is not None else None
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Product) and not isinstance(other, LazyProduct):
+            return self.to_product() == other
+
+        return super().__eq__(other)
+
+
+class LazyProductResponse(ProductResponse):
+    """
+    `ProductResponse` with lazily validated `product.metadata`.
+    Compares equal to a regular `ProductResponse` with the same data.
+    """
+    product: LazyProduct
+
+    def to_product_response(self) -> ProductResponse:
+        """
+        Returns regular `ProductResponse` object with all metadata sections validated.
+        """
+        return ProductResponse.model_construct(error=self.error, balance=self.balance, product=self.product.to_product())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ProductResponse) and not isinstance(other, LazyProductResponse):
+            return self.to_product_response() == other
+
+        return super().__eq__(other)
@@ -0,0 +1,169 @@
+import sys
+from typing import Any, Iterator, Optional
+
+from eandb.models.v2 import Product, ProductResponse, LazyMetadata
+
+
+class CompactProduct:
+    """
+    Memory-compact, read-only counterpart of `Product` with the same attributes.
+    Categories, manufacturers and barcode details are shared between products of a `ProductCatalog`,
+    so they must not be modified.
+    """
+    __slots__ = (
+        'barcode', 'barcodeDetails', 'titles', 'categories', 'manufacturer', 'relatedBrands', '_images', 'metadata'
+    )
+
+    def __init__(
+        self,
+        barcode: str,
+        barcodeDetails: Product.BarcodeDetails,
+        titles: dict[str, str],
+        categories: tuple[Product.Category, ...],
+        manufacturer: Optional[Product.Manufacturer],
+        relatedBrands: tuple[Product.Manufacturer, ...],
+        images: tuple[Product.Image, ...],
+        metadata: Any
+    ):
+        self.barcode = barcode
+        self.barcodeDetails = barcodeDetails
+        self.titles = titles
+        self.categories = categories
+        self.manufacturer = manufacturer
+        self.relatedBrands = relatedBrands
+        # Images are unique per product, so they are kept as plain tuples and built on access
+        self._images = tuple((image.url, image.isCatalog, image.width, image.height) for image in images)
+        self.metadata = metadata
+
+    @property
+    def images(self) -> tuple[Product.Image, ...]:
+        return tuple(
+            Product.Image.model_construct(url=url, isCatalog=is_catalog, width=width, height=height)
+            for url, is_catalog, width, height in self._images
+        )
+
+    def to_product(self) -> Product:
+        """
+        Returns regular `Product` object with copies of shared data.
+        """
+        return Product(
+            barcode=self.barcode,
+            barcodeDetails=self.barcodeDetails.model_copy(),
+            titles=dict(self.titles),
+            categories=[category.model_copy(deep=True) for category in self.categories],
+            manufacturer=self.manufacturer.model_copy(deep=True) if self.manufacturer else None,
+            relatedBrands=[brand.model_copy(deep=True) for brand in self.relatedBrands],
+            images=list(self.images),
+            metadata=self.metadata.to_metadata() if isinstance(self.metadata, LazyMetadata) else self.metadata
+        )
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(barcode={self.barcode!r}, titles={self.titles!r})'
+
+
+class ProductCatalog:
+    """
+    In-memory collection of products optimized for millions of records.
+    Identical categories, manufacturers and barcode details are stored once and shared between products,
+    language codes are interned and per-product data is kept in `CompactProduct` slots.
+    Shared objects are not released when products are replaced, call `compact()` after replacing many products.
+    """
+
+    def __init__(self):
+        self._products: dict[str, CompactProduct] = {}
+        self._interned: dict[tuple, Any] = {}
+
+    def add(self, product: Product | ProductResponse) -> CompactProduct:
+        """
+        Adds a product to the catalog, replacing a product with the same barcode.
+
+        :param product: `Product` or `ProductResponse` object
+        :return: Stored `CompactProduct` object.
+        """
+        if isinstance(product, ProductResponse):
+            product = product.product
+
+        compact_product = CompactProduct(
+            barcode=product.barcode,
+            barcodeDetails=self._intern_barcode_details(product.barcodeDetails),
+            titles=self._intern_titles(product.titles),
+            categories=tuple(self._intern_category(category) for category in product.categories),
+            manufacturer=self._intern_manufacturer(product.manufacturer) if product.manufacturer else None,
+            relatedBrands=tuple(self._intern_manufacturer(brand) for brand in product.relatedBrands),
+            images=tuple(product.images),
+            metadata=product.metadata
+        )
+
+        self._products[compact_product.barcode] = compact_product
+        return compact_product
+
+    def compact(self) -> None:
+        """
+        Releases shared categories, manufacturers and barcode details no longer used by any product.
+        """
+        used = set()
+
+        for product in self._products.values():
+            used.add(id(product.barcodeDetails))
+            used.update(id(category) for category in product.categories)
+            used.update(id(brand) for brand in product.relatedBrands)
+
+            if product.manufacturer is not None:
+                used.add(id(product.manufacturer))
+
+        self._interned = {key: value for key, value in self._interned.items() if id(value) in used}
+
+    @property
+    def shared_objects_count(self) -> int:
+        """
+        Number of distinct categories, manufacturers and barcode details stored in the catalog.
+        """
+        return len(self._interned)
+
+    def get(self, barcode: str) -> Optional[CompactProduct]:
+        return self._products.get(barcode)
+
+    def __getitem__(self, barcode: str) -> CompactProduct:
+        return self._products[barcode]
+
+    def __contains__(self, barcode: str) -> bool:
+        return barcode in self._products
+
+    def __iter__(self) -> Iterator[CompactProduct]:
+        return iter(self._products.values())
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    @staticmethod
+    def _intern_titles(titles: dict[str, str]) -> dict[str, str]:
+        return {sys.intern(language): title for language, title in titles.items()}
+
+    def _intern(self, key: tuple, factory) -> Any:
+        value = self._interned.get(key)
+
+        if value is None:
+            value = self._interned[key] = factory()
+
+        return value
+
+    def _intern_barcode_details(self, details: Product.BarcodeDetails) -> Product.BarcodeDetails:
+        key = ('barcodeDetails', details.type, details.description, details.country)
+        return self._intern(key, lambda: details)
+
+    def _intern_category(self, category: Product.Category) -> Product.Category:
+        key = ('category', category.id, *sorted(category.titles.items()))
+        return self._intern(
+            key, lambda: Product.Category(id=category.id, titles=self._intern_titles(category.titles))
+        )
+
+    def _intern_manufacturer(self, manufacturer: Product.Manufacturer) -> Product.Manufacturer:
+        key = ('manufacturer', manufacturer.id, manufacturer.wikidataId, *sorted(manufacturer.titles.items()))
+        return self._intern(
+            key,
+            lambda: Product.Manufacturer(
+                id=manufacturer.id,
+                titles=self._intern_titles(manufacturer.titles),
+                wikidataId=manufacturer.wikidataId
+            )
+        )
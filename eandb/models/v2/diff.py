@@ -0,0 +1,73 @@
+import hashlib
+import json
+from typing import Any, Mapping
+
+from eandb.models.v2 import Product, ProductResponse
+from eandb.models.v2.catalog import CompactProduct
+
+#: Sections compared by `diff_products`, metadata is compared by subsection
+SECTIONS = (
+    'barcode', 'barcodeDetails', 'titles', 'categories', 'manufacturer', 'relatedBrands', 'images',
+    *(f'metadata.{name}' for name in Product.Metadata.model_fields)
+)
+
+
+def _get_product(product: Product | ProductResponse | CompactProduct) -> Product:
+    if isinstance(product, ProductResponse):
+        return product.product
+
+    if isinstance(product, CompactProduct):
+        return product.to_product()
+
+    return product
+
+
+def _canonical_json(value: Any) -> bytes:
+    # Sorted keys make the result independent of dict ordering, e.g. of titles received in a different order
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(_canonical_json(value)).hexdigest()
+
+
+def _get_sections(product: Product | ProductResponse | CompactProduct) -> dict[str, Any]:
+    # Fields and sections without value are left out, so that fields added to the models with a `None` default
+    # don't change fingerprints of existing products
+    data = _get_product(product).model_dump(mode='json', exclude_none=True)
+    metadata = data.pop('metadata', None) or {}
+    sections = {**data, **{f'metadata.{name}': value for name, value in metadata.items()}}
+    return {name: sections[name] for name in SECTIONS if name in sections}
+
+
+def get_fingerprint(product: Product | ProductResponse | CompactProduct) -> str:
+    """
+    Returns a stable content hash (hex SHA-256) of a product, for change detection between fetches.
+    Only product data is hashed, so the `balance` of a response doesn't affect it, and neither does
+    the order of keys in dicts or lazy validation of metadata. Order of lists (e.g. images) is significant.
+    """
+    return _hash(_get_sections(product))
+
+
+def get_section_fingerprints(product: Product | ProductResponse | CompactProduct) -> dict[str, str]:
+    """
+    Returns content hashes of each section of `SECTIONS`, which can be stored instead of products
+    and compared with later fetches by `diff_products`.
+    """
+    return {name: _hash(value) for name, value in _get_sections(product).items()}
+
+
+def diff_products(
+    old: Product | ProductResponse | CompactProduct | Mapping[str, str],
+    new: Product | ProductResponse | CompactProduct | Mapping[str, str]
+) -> list[str]:
+    """
+    Returns names of changed sections in order of `SECTIONS`, an empty list if products are the same.
+    Metadata changes are reported by subsection, e.g. `metadata.food`.
+
+    :param old: Product, or its section fingerprints returned by `get_section_fingerprints`
+    :param new: Product, or its section fingerprints returned by `get_section_fingerprints`
+    """
+    old_sections = old if isinstance(old, Mapping) else get_section_fingerprints(old)
+    new_sections = new if isinstance(new, Mapping) else get_section_fingerprints(new)
+    return [name for name in SECTIONS if old_sections.get(name) != new_sections.get(name)]
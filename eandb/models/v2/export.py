@@ -0,0 +1,233 @@
+import csv
+import itertools
+import os
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TextIO
+
+from eandb.models.v2 import Product, ProductResponse, Measurement, DimensionsType
+
+if TYPE_CHECKING:
+    import pyarrow
+
+_NUTRIMENTS = tuple(Product.Metadata.Food.Nutriments.model_fields)
+_DIMENSIONS = tuple(DimensionsType.model_fields)
+_WEIGHTS = ('net', 'gross')
+
+STRING = 'string'
+FLOAT = 'float'
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('`pyarrow` package is required for Parquet and Arrow export: pip install eandb[arrow]')
+
+    return pyarrow
+
+
+def _get_measurement(measurement: Optional[Measurement]) -> tuple[Optional[float], Optional[str]]:
+    if measurement is None or measurement.equals is None:
+        return None, None
+
+    try:
+        value = float(measurement.equals.value)
+    except ValueError:
+        value = None
+
+    return value, measurement.equals.unit
+
+
+def _get_title(titles: Optional[dict[str, str]], languages: tuple[str, ...]) -> Optional[str]:
+    if not titles:
+        return None
+
+    for language in languages:
+        if language in titles:
+            return titles[language]
+
+    return next(iter(titles.values()))
+
+
+class ProductExporter:
+    """
+    Flattens products into table rows with a fixed schema and writes them to CSV, Parquet or Arrow files
+    in batches, so that any number of products is exported in bounded memory.
+
+    Columns are: barcode details, titles in selected languages, primary (first) category, manufacturer,
+    first image, net and gross weight, volume, product dimensions and nutriments per 100 grams.
+    Each measurement is exported as a float value and a unit column, only exact (`equals`) values are exported.
+
+    :param languages: Languages of title columns, category and manufacturer titles use the first available one
+    """
+
+    def __init__(self, *, languages: Iterable[str] = ('en',)):
+        self.languages = tuple(languages)
+        self.columns: list[tuple[str, str]] = [
+            ('barcode', STRING),
+            ('barcode_type', STRING),
+            ('barcode_country', STRING),
+            *((f'title_{language}', STRING) for language in self.languages),
+            ('category_id', STRING),
+            ('category_title', STRING),
+            ('manufacturer_id', STRING),
+            ('manufacturer_title', STRING),
+            ('manufacturer_wikidata_id', STRING),
+            ('image_url', STRING),
+            *self._measurement_columns(*(f'weight_{name}' for name in _WEIGHTS), 'volume'),
+            *self._measurement_columns(*(f'dimensions_{name}' for name in _DIMENSIONS)),
+            *self._measurement_columns(*(f'nutriments_{name}' for name in _NUTRIMENTS))
+        ]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+    @staticmethod
+    def _measurement_columns(*names: str) -> Iterator[tuple[str, str]]:
+        for name in names:
+            yield name, FLOAT
+            yield f'{name}_unit', STRING
+
+    def flatten(self, product: Product | ProductResponse) -> tuple[Any, ...]:
+        """
+        Returns table row of the product, values are in the order of `columns`.
+        """
+        if isinstance(product, ProductResponse):
+            product = product.product
+
+        category = product.categories[0] if product.categories else None
+        manufacturer = product.manufacturer
+        metadata = product.metadata
+        generic = metadata.generic if metadata is not None else None
+        weight = generic.weight if generic is not None else None
+        dimensions = generic.dimensions.product if generic is not None and generic.dimensions is not None else None
+        food = metadata.food if metadata is not None else None
+        nutriments = food.nutrimentsPer100Grams if food is not None else None
+
+        row = [
+            product.barcode,
+            product.barcodeDetails.type,
+            product.barcodeDetails.country,
+            *(product.titles.get(language) for language in self.languages),
+            category.id if category is not None else None,
+            _get_title(category.titles, self.languages) if category is not None else None,
+            manufacturer.id if manufacturer is not None else None,
+            _get_title(manufacturer.titles, self.languages) if manufacturer is not None else None,
+            manufacturer.wikidataId if manufacturer is not None else None,
+            product.images[0].url if product.images else None
+        ]
+
+        for name in _WEIGHTS:
+            row.extend(_get_measurement(getattr(weight, name) if weight is not None else None))
+
+        row.extend(_get_measurement(generic.volume if generic is not None else None))
+
+        for name in _DIMENSIONS:
+            row.extend(_get_measurement(getattr(dimensions, name) if dimensions is not None else None))
+
+        for name in _NUTRIMENTS:
+            row.extend(_get_measurement(getattr(nutriments, name) if nutriments is not None else None))
+
+        return tuple(row)
+
+    def iter_batches(
+        self, products: Iterable[Product | ProductResponse], *, batch_size: int = 10_000
+    ) -> Iterator[list[tuple[Any, ...]]]:
+        """
+        Yields lists of up to `batch_size` rows, consuming products lazily.
+        """
+        products = iter(products)
+
+        while batch := [self.flatten(product) for product in itertools.islice(products, batch_size)]:
+            yield batch
+
+    def iter_record_batches(
+        self, products: Iterable[Product | ProductResponse], *, batch_size: int = 10_000
+    ) -> Iterator['pyarrow.RecordBatch']:
+        """
+        Yields `pyarrow.RecordBatch` objects of up to `batch_size` rows, requires `pyarrow` package.
+        """
+        pyarrow = _import_pyarrow()
+        schema = self.get_arrow_schema()
+
+        for batch in self.iter_batches(products, batch_size=batch_size):
+            yield pyarrow.RecordBatch.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(zip(*batch), schema)], schema=schema
+            )
+
+    def get_arrow_schema(self) -> 'pyarrow.Schema':
+        pyarrow = _import_pyarrow()
+        types = {STRING: pyarrow.string(), FLOAT: pyarrow.float64()}
+        return pyarrow.schema([(name, types[column_type]) for name, column_type in self.columns])
+
+    def to_csv(
+        self,
+        products: Iterable[Product | ProductResponse],
+        file: str | os.PathLike | TextIO,
+        *,
+        batch_size: int = 10_000
+    ) -> int:
+        """
+        Writes products to CSV file with a header row, missing values are written as empty strings.
+
+        :param products: `Product` or `ProductResponse` objects
+        :param file: Path or text file object
+        :param batch_size: Number of rows written at once
+        :return: Number of written products.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'w', encoding='utf-8', newline='') as f:
+                return self.to_csv(products, f, batch_size=batch_size)
+
+        writer = csv.writer(file)
+        writer.writerow(self.column_names)
+        count = 0
+
+        for batch in self.iter_batches(products, batch_size=batch_size):
+            writer.writerows(batch)
+            count += len(batch)
+
+        return count
+
+    def to_parquet(
+        self, products: Iterable[Product | ProductResponse], file: Any, *, batch_size: int = 10_000, **kwargs
+    ) -> int:
+        """
+        Writes products to Parquet file, one row group per batch. Requires `pyarrow` package.
+
+        :param products: `Product` or `ProductResponse` objects
+        :param file: Path or binary file object
+        :param batch_size: Number of rows per row group
+        :param kwargs: Additional arguments of `pyarrow.parquet.ParquetWriter`, e.g. `compression`
+        :return: Number of written products.
+        """
+        _import_pyarrow()
+        import pyarrow.parquet
+
+        with pyarrow.parquet.ParquetWriter(file, self.get_arrow_schema(), **kwargs) as writer:
+            return self._write_record_batches(writer, products, batch_size)
+
+    def to_arrow(
+        self, products: Iterable[Product | ProductResponse], file: Any, *, batch_size: int = 10_000
+    ) -> int:
+        """
+        Writes products to Arrow IPC file (Feather v2). Requires `pyarrow` package.
+
+        :param products: `Product` or `ProductResponse` objects
+        :param file: Path or binary file object
+        :param batch_size: Number of rows per record batch
+        :return: Number of written products.
+        """
+        pyarrow = _import_pyarrow()
+
+        with pyarrow.ipc.new_file(file, self.get_arrow_schema()) as writer:
+            return self._write_record_batches(writer, products, batch_size)
+
+    def _write_record_batches(self, writer, products: Iterable[Product | ProductResponse], batch_size: int) -> int:
+        count = 0
+
+        for record_batch in self.iter_record_batches(products, batch_size=batch_size):
+            writer.write_batch(record_batch)
+            count += record_batch.num_rows
+
+        return count
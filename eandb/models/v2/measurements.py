@@ -0,0 +1,242 @@
+import dataclasses
+import types
+import typing
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+from eandb.models.v2 import Product, ProductResponse, Measurement
+
+if TYPE_CHECKING:
+    import numpy
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('`numpy` package is required for measurement normalization: pip install eandb[numpy]')
+
+    return numpy
+
+
+# Unit names as returned by the API and their common abbreviations, mapped to canonical unit and conversion factor
+_UNIT_ALIASES: dict[str, tuple[tuple[str, ...], float]] = {
+    'g': (('g', 'gr', 'gram', 'grams'), 1.0),
+    'kg': (('kg', 'kilogram', 'kilograms'), 1000.0),
+    'mg': (('mg', 'milligram', 'milligrams'), 1e-3),
+    'mcg': (('mcg', 'ug', 'µg', 'microgram', 'micrograms'), 1e-6),
+    'oz': (('oz', 'ounce', 'ounces'), 28.349523125),
+    'lb': (('lb', 'lbs', 'pound', 'pounds'), 453.59237),
+    'ml': (('ml', 'milliliter', 'milliliters', 'millilitre', 'millilitres', 'cm3', 'cubic_centimeters'), 1.0),
+    'cl': (('cl', 'centiliter', 'centiliters', 'centilitre', 'centilitres'), 10.0),
+    'dl': (('dl', 'deciliter', 'deciliters', 'decilitre', 'decilitres'), 100.0),
+    'l': (('l', 'liter', 'liters', 'litre', 'litres'), 1000.0),
+    'fl oz': (('fl oz', 'fl_oz', 'fluid_ounce', 'fluid_ounces', 'fluid ounce', 'fluid ounces'), 29.5735295625),
+    'gal': (('gal', 'gallon', 'gallons'), 3785.411784),
+    'mm': (('mm', 'millimeter', 'millimeters', 'millimetre', 'millimetres'), 1.0),
+    'cm': (('cm', 'centimeter', 'centimeters', 'centimetre', 'centimetres'), 10.0),
+    'm': (('m', 'meter', 'meters', 'metre', 'metres'), 1000.0),
+    'in': (('in', 'inch', 'inches'), 25.4),
+    'ft': (('ft', 'foot', 'feet'), 304.8),
+    'W': (('w', 'watt', 'watts'), 1.0),
+    'kW': (('kw', 'kilowatt', 'kilowatts'), 1000.0),
+    'kcal': (('kcal', 'kilocalorie', 'kilocalories'), 1.0),
+    'kJ': (('kj', 'kilojoule', 'kilojoules'), 1 / 4.184),
+    'V': (('v', 'volt', 'volts'), 1.0),
+    'mV': (('millivolt', 'millivolts'), 1e-3),
+    'Wh': (('wh', 'watt_hour', 'watt_hours', 'watt-hours'), 1.0),
+    'kWh': (('kwh', 'kilowatt_hour', 'kilowatt_hours'), 1000.0),
+    'mAh': (('mah', 'milliampere_hour', 'milliampere_hours'), 1.0),
+    'Ah': (('ah', 'ampere_hour', 'ampere_hours'), 1000.0),
+    'pcs': (('pcs', 'pc', 'piece', 'pieces', 'item', 'items', 'count'), 1.0),
+    'months': (('month', 'months'), 1.0),
+    'years': (('year', 'years'), 12.0)
+}
+
+# Canonical unit of each unit group
+_UNIT_GROUPS = {
+    'g': ('g', 'kg', 'mg', 'mcg', 'oz', 'lb'),
+    'ml': ('ml', 'cl', 'dl', 'l', 'fl oz', 'gal'),
+    'mm': ('mm', 'cm', 'm', 'in', 'ft'),
+    'W': ('W', 'kW'),
+    'kcal': ('kcal', 'kJ'),
+    'V': ('V', 'mV'),
+    'Wh': ('Wh', 'kWh'),
+    'mAh': ('mAh', 'Ah'),
+    'pcs': ('pcs',),
+    'months': ('months', 'years')
+}
+
+_FACTORS: dict[tuple[str, str], float] = {
+    (alias, canonical_unit): _UNIT_ALIASES[unit][1]
+    for canonical_unit, units in _UNIT_GROUPS.items()
+    for unit in units
+    for alias in _UNIT_ALIASES[unit][0]
+}
+
+
+def _get_canonical_unit(path: str) -> str:
+    if path == 'food.nutrimentsPer100Grams.energy':
+        return 'kcal'
+
+    if path.startswith(('food.nutrimentsPer100Grams.', 'generic.weight.')):
+        return 'g'
+
+    if path.startswith('generic.dimensions.'):
+        return 'mm'
+
+    if path.startswith('electric.voltage.'):
+        return 'V'
+
+    return {
+        'generic.volume': 'ml',
+        'generic.power': 'W',
+        'generic.numberOfItems': 'pcs',
+        'generic.recommendedAge': 'months',
+        'electric.batteryCapacity.energy': 'Wh',
+        'electric.batteryCapacity.nominal': 'mAh'
+    }[path]
+
+
+def _iter_measurement_paths(model: type[BaseModel], prefix: str = '') -> Iterator[str]:
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+
+        if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+
+        if annotation is Measurement:
+            yield prefix + name
+        elif typing.get_origin(annotation) is None and issubclass(annotation, BaseModel):
+            yield from _iter_measurement_paths(annotation, f'{prefix}{name}.')
+
+
+#: Canonical unit of every single-valued `Measurement` field of `Product.Metadata`, keyed by dotted path.
+#: Lists of measurements (apparel sizes, ingredient amounts) have no single value per product and are not included.
+MEASUREMENT_FIELDS: dict[str, str] = {
+    path: _get_canonical_unit(path) for path in _iter_measurement_paths(Product.Metadata)
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class NormalizedMeasurements:
+    """
+    Values of one `Measurement` field of many products, converted to the canonical `unit`.
+    The value is taken from `equals`, otherwise from `greaterThan` or `lessThan` as flagged by the masks.
+    `NaN` values are flagged as `missing`: not set, not a number or in a unit which can't be converted.
+    """
+    unit: str
+    values: 'numpy.ndarray'
+    missing: 'numpy.ndarray'
+    greater_than: 'numpy.ndarray'
+    less_than: 'numpy.ndarray'
+    unknown_unit: 'numpy.ndarray'
+
+
+def _get_path(metadata: Any, path: list[str]) -> Optional[Measurement]:
+    for name in path:
+        if metadata is None:
+            return None
+
+        metadata = getattr(metadata, name)
+
+    return metadata
+
+
+def _parse_floats(np, values: list[str]) -> 'numpy.ndarray':
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        pass
+
+    parsed = np.full(len(values), np.nan)
+
+    for i, value in enumerate(values):
+        try:
+            parsed[i] = float(value)
+        except ValueError:
+            pass
+
+    return parsed
+
+
+def _normalize_field(np, measurements: list[Optional[Measurement]], unit: str) -> NormalizedMeasurements:
+    count = len(measurements)
+    greater_than = np.zeros(count, dtype=bool)
+    less_than = np.zeros(count, dtype=bool)
+    indexes, raw_values, raw_units = [], [], []
+
+    for i, measurement in enumerate(measurements):
+        if measurement is None:
+            continue
+
+        if measurement.equals is not None:
+            value = measurement.equals
+        elif measurement.greaterThan is not None:
+            value = measurement.greaterThan
+            greater_than[i] = True
+        elif measurement.lessThan is not None:
+            value = measurement.lessThan
+            less_than[i] = True
+        else:
+            continue
+
+        indexes.append(i)
+        raw_values.append(value.value)
+        raw_units.append(value.unit)
+
+    # Each distinct unit is resolved once, then conversion is applied to all values at once
+    unit_codes: dict[str, int] = {}
+    codes = np.fromiter(
+        (unit_codes.setdefault(raw_unit, len(unit_codes)) for raw_unit in raw_units), dtype=np.intp, count=len(raw_units)
+    )
+    factors = np.array(
+        [_FACTORS.get((raw_unit.strip().lower(), unit), np.nan) for raw_unit in unit_codes], dtype=np.float64
+    )
+
+    values = np.full(count, np.nan)
+    values[indexes] = _parse_floats(np, raw_values) * factors[codes]
+
+    unknown_unit = np.zeros(count, dtype=bool)
+    unknown_unit[indexes] = np.isnan(factors[codes])
+
+    return NormalizedMeasurements(
+        unit=unit,
+        values=values,
+        missing=np.isnan(values),
+        greater_than=greater_than,
+        less_than=less_than,
+        unknown_unit=unknown_unit
+    )
+
+
+def normalize_measurements(
+    products: Iterable[Product | ProductResponse], fields: Optional[Iterable[str]] = None
+) -> dict[str, NormalizedMeasurements]:
+    """
+    Converts measurements of many products to float arrays in canonical units
+    (g, ml, mm, W, kcal, V, Wh, mAh, pcs, months). Requires `numpy` package.
+
+    :param products: `Product` or `ProductResponse` objects
+    :param fields: Dotted paths of fields from `MEASUREMENT_FIELDS`, e.g. `food.nutrimentsPer100Grams.fat`,
+        all fields by default
+    :return: Dict mapping each field to `NormalizedMeasurements` with one value per product.
+    """
+    np = _import_numpy()
+    fields = tuple(fields) if fields is not None else tuple(MEASUREMENT_FIELDS)
+
+    for field in fields:
+        if field not in MEASUREMENT_FIELDS:
+            raise ValueError(f'Unknown measurement field: {field}')
+
+    metadata = [
+        (product.product if isinstance(product, ProductResponse) else product).metadata for product in products
+    ]
+
+    return {
+        field: _normalize_field(
+            np, [_get_path(item, field.split('.')) for item in metadata], MEASUREMENT_FIELDS[field]
+        )
+        for field in fields
+    }
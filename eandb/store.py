@@ -0,0 +1,270 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, BinaryIO, Iterator, Optional
+
+from eandb.models.v2 import ProductResponse
+
+_MAGIC = b'EANDBPS\x00'
+_VERSION = 1
+# Magic, version, key size, number of products, offset of the index
+_HEADER = struct.Struct('<8sIIQQ')
+_RESPONSE_PREFIX = b'{"balance":0,"product":'
+_RESPONSE_SUFFIX = b'}'
+
+
+def _get_entry_struct(key_size: int) -> struct.Struct:
+    # NUL-padded barcode, offset and length of the product JSON
+    return struct.Struct(f'<{key_size}sQI')
+
+
+class ProductStoreBuilder:
+    """
+    Writes an offline product store file from product records, e.g. JSONL dumps collected over time.
+    Product JSON is appended to the file as records are added, only the barcode index is kept in memory.
+    The last record of a barcode wins. The file is written to a temporary path and moved into place by `finish()`,
+    so readers never see a partially written store.
+
+    :param path: Path of the store file
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        self._tmp_path = f'{self.path}.tmp'
+        self._file: Optional[BinaryIO] = open(self._tmp_path, 'wb')
+        self._file.write(b'\0' * _HEADER.size)
+        self._offset = _HEADER.size
+        self._index: dict[bytes, tuple[int, int]] = {}
+
+    @property
+    def count(self) -> int:
+        """
+        Number of distinct barcodes added so far.
+        """
+        return len(self._index)
+
+    def add(self, barcode: str, product: bytes | dict[str, Any]) -> None:
+        """
+        Adds a product.
+
+        :param barcode: Barcode the product is looked up by
+        :param product: Product JSON, as `product` of an API response, or its decoded dict
+        """
+        if not isinstance(product, bytes):
+            product = json.dumps(product, ensure_ascii=False, separators=(',', ':')).encode()
+
+        self._file.write(product)
+        self._index[barcode.encode()] = (self._offset, len(product))
+        self._offset += len(product)
+
+    def add_record(self, record: dict[str, Any]) -> bool:
+        """
+        Adds a product from an API response (`{"balance": ..., "product": {...}}`) or a record written by
+        the `eandb` command (`{"barcode": ..., "product": {...}}`). Error records are skipped.
+
+        :return: `True` if a product was added.
+        """
+        product = record.get('product')
+
+        if not product:
+            return False
+
+        self.add(record.get('barcode') or product['barcode'], product)
+        return True
+
+    def add_jsonl(self, file: BinaryIO) -> int:
+        """
+        Adds products from a file with one record per line, see `add_record()`.
+
+        :return: Number of added products.
+        """
+        return sum(self.add_record(json.loads(line)) for line in file if line.strip())
+
+    def finish(self) -> int:
+        """
+        Writes the sorted barcode index and moves the store file into place.
+
+        :return: Number of products in the store.
+        """
+        keys = sorted(self._index)
+        key_size = max(map(len, keys), default=0)
+        entry_struct = _get_entry_struct(key_size)
+
+        self._file.write(b''.join(entry_struct.pack(key, *self._index[key]) for key in keys))
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, key_size, len(keys), self._offset))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+        os.replace(self._tmp_path, self.path)
+        return len(keys)
+
+    def discard(self) -> None:
+        """
+        Deletes the partially written store.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'ProductStoreBuilder':
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if self._file is None:
+            return
+
+        if exc_type is None:
+            self.finish()
+        else:
+            self.discard()
+
+
+class ProductStore:
+    """
+    Read-only offline product store written by `ProductStoreBuilder`. The file is memory-mapped, and lookups
+    binary search the sorted index in O(log n) and read only the pages they touch, so opening a store is instant
+    regardless of its size. Processes opening the same file share its pages through the OS page cache,
+    and stores are pickled by path, so they can be passed to worker processes.
+
+    Can be passed to clients as `store`, to serve stored products without requests and fall back to the API
+    for other barcodes.
+
+    :param path: Path of the store file
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if hasattr(self._mmap, 'madvise'):
+            # Lookups are random, so read-ahead only wastes I/O and page cache
+            self._mmap.madvise(mmap.MADV_RANDOM)
+
+        if len(self._mmap) < _HEADER.size or self._mmap[:len(_MAGIC)] != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f'Not a product store file: {self.path}')
+
+        _, version, self._key_size, self._count, self._index_offset = _HEADER.unpack_from(self._mmap)
+
+        if version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f'Unsupported product store version {version}: {self.path}')
+
+        self._entry_struct = _get_entry_struct(self._key_size)
+
+    def _find(self, barcode: str) -> Optional[tuple[int, int]]:
+        key = barcode.encode()
+
+        if len(key) > self._key_size:
+            return None
+
+        # Keys are NUL-padded, which preserves their order
+        key = key.ljust(self._key_size, b'\0')
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            position = self._index_offset + middle * self._entry_struct.size
+            middle_key = self._mmap[position:position + self._key_size]
+
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                _, offset, length = self._entry_struct.unpack_from(self._mmap, position)
+                return offset, length
+
+        return None
+
+    def get_product_raw(self, barcode: str) -> Optional[bytes]:
+        """
+        Returns undecoded product JSON by barcode, `None` if the barcode is not in the store.
+        """
+        location = self._find(barcode)
+
+        if location is None:
+            return None
+
+        offset, length = location
+        return self._mmap[offset:offset + length]
+
+    def get_raw(self, barcode: str) -> Optional[bytes]:
+        """
+        Returns undecoded JSON of product info in the format of an API response (with `balance` of 0),
+        `None` if the barcode is not in the store.
+        """
+        product = self.get_product_raw(barcode)
+        return _RESPONSE_PREFIX + product + _RESPONSE_SUFFIX if product is not None else None
+
+    def get(self, barcode: str) -> Optional[ProductResponse]:
+        """
+        Returns product info by barcode, `None` if the barcode is not in the store.
+        """
+        content = self.get_raw(barcode)
+        return ProductResponse.model_validate_json(content) if content is not None else None
+
+    def __contains__(self, barcode: str) -> bool:
+        return self._find(barcode) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Yields stored barcodes in sorted order.
+        """
+        for index in range(self._count):
+            position = self._index_offset + index * self._entry_struct.size
+            yield self._mmap[position:position + self._key_size].rstrip(b'\0').decode()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> 'ProductStore':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> tuple[type['ProductStore'], tuple[str]]:
+        return type(self), (self.path,)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.path!r}, products={self._count})'
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m eandb.store', description='Builds an offline product store from JSONL files.'
+    )
+    parser.add_argument('output', help='Store file')
+    parser.add_argument(
+        'inputs', nargs='+', help='JSONL files of API responses or `eandb` command output, `-` for stdin'
+    )
+    args = parser.parse_args(argv)
+
+    with ProductStoreBuilder(args.output) as builder:
+        for path in args.inputs:
+            if path == '-':
+                builder.add_jsonl(sys.stdin.buffer)
+                continue
+
+            with open(path, 'rb') as f:
+                builder.add_jsonl(f)
+
+    print(f'Stored products: {builder.count}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
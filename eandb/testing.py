@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import collections
+import http.server
+import json
+import math
+import os
+import pathlib
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import httpx
+
+from eandb.barcodes import is_valid_barcode
+from eandb.models.v2 import ErrorType
+
+#: Returns response latency in seconds, drawn using the given random generator
+LatencyDistribution = Callable[[random.Random], float]
+
+_PRODUCT_PATH = re.compile(r'^/api/v2/product/([^/?#]*)$')
+
+_ERROR_RESPONSES: dict[ErrorType, tuple[int, str]] = {
+    ErrorType.INVALID_BARCODE: (400, 'Invalid barcode: {barcode}'),
+    ErrorType.PRODUCT_NOT_FOUND: (404, 'Product not found: {barcode}'),
+    ErrorType.INVALID_JWT: (403, 'JWT is missing or invalid, check Authorization header'),
+    ErrorType.ACCOUNT_NOT_CONFIRMED: (
+        403, 'Your account is not confirmed, please check your email for confirmation link'
+    ),
+    ErrorType.JWT_REVOKED: (403, 'JWT revoked'),
+    ErrorType.JWT_EXPIRED: (403, 'JWT expired'),
+    ErrorType.EMPTY_BALANCE: (403, 'Your account balance is empty')
+}
+
+
+def constant_latency(seconds: float) -> LatencyDistribution:
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyDistribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5, maximum: Optional[float] = None) -> LatencyDistribution:
+    """
+    Long-tailed latency typical for network services: half of responses are faster than `median`,
+    `sigma` controls the tail (about 5% of responses are `exp(1.645 * sigma)` times slower than the median).
+    """
+    mu = math.log(median)
+
+    def latency(rng: random.Random) -> float:
+        value = rng.lognormvariate(mu, sigma)
+        return min(value, maximum) if maximum is not None else value
+
+    return latency
+
+
+def load_corpus(path: str | os.PathLike) -> list[dict]:
+    """
+    Loads products from JSON files of API responses (like `tests/samples/`) in the directory.
+    """
+    return [
+        json.loads(file.read_text(encoding='utf-8'))['product'] for file in sorted(pathlib.Path(path).glob('*.json'))
+    ]
+
+
+class FakeEandbServer:
+    """
+    Stand-in for EAN-DB API serving `/api/v2/product/{barcode}` from a local corpus of products,
+    for load and soak testing of clients without spending balance.
+    Works in-process as an httpx transport (`transport` and `async_transport`) or as a local HTTP server (`start()`).
+
+    Each request is checked in the same order: JWT, rate limit, injected errors, barcode and balance.
+    Only returned products are charged.
+
+    :param corpus: Product dicts, or a directory of JSON responses, see `load_corpus`
+    :param serve_any_barcode: Answer valid barcodes missing from the corpus with a corpus product
+        (chosen by barcode hash) instead of 404, so that load tests can use any number of distinct barcodes
+    :param jwt: Accepted token, any token is accepted if `None`
+    :param balance: Initial account balance, decremented by each returned product, `None` for unlimited
+    :param latency: Distribution of response latency, no latency by default
+    :param error_rates: Probability of an injected error by `ErrorType` (returned with the API message)
+        or by HTTP status code (e.g. 429, 500, 503)
+    :param rate_limit: Maximum average number of requests per second, exceeding requests get 429 with `Retry-After`
+    :param burst: Maximum number of requests at once after an idle period, defaults to `rate_limit` rounded up
+    :param validate_barcodes: Return `INVALID_BARCODE` error for malformed barcodes or wrong check digits
+    :param seed: Seed of latency and error draws
+    """
+
+    def __init__(
+        self,
+        *,
+        corpus: Iterable[dict] | str | os.PathLike,
+        serve_any_barcode: bool = False,
+        jwt: Optional[str] = None,
+        balance: Optional[int] = None,
+        latency: Optional[LatencyDistribution] = None,
+        error_rates: Optional[Mapping[ErrorType | int, float]] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        validate_barcodes: bool = True,
+        seed: Optional[int] = None
+    ):
+        corpus = load_corpus(corpus) if isinstance(corpus, (str, os.PathLike)) else list(corpus)
+
+        if not corpus:
+            raise ValueError('`corpus` param is empty')
+
+        if sum((error_rates or {}).values()) > 1:
+            raise ValueError('Sum of `error_rates` must not exceed 1')
+
+        # Products are serialized once, responses are assembled from bytes. The first product of a barcode is served
+        self._products = {}
+
+        for product in corpus:
+            self._products.setdefault(product['barcode'], json.dumps(product).encode())
+
+        self._corpus = corpus
+        self.serve_any_barcode = serve_any_barcode
+        self.jwt = jwt
+        self.balance = balance
+        self.latency = latency
+        self.error_rates = dict(error_rates or {})
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1, math.ceil(rate_limit or 1))
+        self.validate_barcodes = validate_barcodes
+
+        #: Number of responses by status code
+        self.requests: collections.Counter[int] = collections.Counter()
+
+        self._random = random.Random(seed)
+        self._tokens = float(self.burst)
+        self._tokens_updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._http_server: Optional[http.server.ThreadingHTTPServer] = None
+        self._http_thread: Optional[threading.Thread] = None
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        """
+        Transport for `EandbV2SyncClient(transport=...)`, latency blocks the calling thread.
+        """
+        return httpx.MockTransport(self.handle)
+
+    @property
+    def async_transport(self) -> httpx.MockTransport:
+        """
+        Transport for `EandbV2AsyncClient(transport=...)`, latency is awaited.
+        """
+        return httpx.MockTransport(self.handle_async)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        latency, status_code, headers, content = self.respond(
+            request.method, request.url.path, request.headers.get('Authorization')
+        )
+        time.sleep(latency)
+        return httpx.Response(status_code, headers=headers, content=content)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        latency, status_code, headers, content = self.respond(
+            request.method, request.url.path, request.headers.get('Authorization')
+        )
+        await asyncio.sleep(latency)
+        return httpx.Response(status_code, headers=headers, content=content)
+
+    def respond(
+        self, method: str, path: str, authorization: Optional[str]
+    ) -> tuple[float, int, dict[str, str], bytes]:
+        """
+        Returns latency in seconds, status code, headers and body of the response to a request.
+        """
+        with self._lock:
+            latency = self.latency(self._random) if self.latency is not None else 0.0
+            status_code, headers, content = self._respond(method, path, authorization)
+            self.requests[status_code] += 1
+
+        return latency, status_code, headers, content
+
+    def _respond(self, method: str, path: str, authorization: Optional[str]) -> tuple[int, dict[str, str], bytes]:
+        if path == '/' and method in ('GET', 'HEAD'):
+            return 200, {}, b''
+
+        match = _PRODUCT_PATH.match(path)
+
+        if match is None or method != 'GET':
+            return 404, {}, b'Not Found'
+
+        barcode = match.group(1)
+
+        if self.jwt is not None and authorization != f'Bearer {self.jwt}':
+            return self._error(ErrorType.INVALID_JWT, barcode)
+
+        retry_after = self._take_token()
+
+        if retry_after is not None:
+            return 429, {'Retry-After': str(math.ceil(retry_after))}, b'Too Many Requests'
+
+        injected = self._draw_error()
+
+        if isinstance(injected, ErrorType):
+            return self._error(injected, barcode)
+
+        if injected is not None:
+            return injected, {}, httpx.codes.get_reason_phrase(injected).encode()
+
+        # Corpus barcodes are served even if they are not valid, like `123` of `tests/samples/`
+        product = self._products.get(barcode)
+
+        if product is None:
+            if self.validate_barcodes and not is_valid_barcode(barcode):
+                return self._error(ErrorType.INVALID_BARCODE, barcode)
+
+            if not self.serve_any_barcode:
+                return self._error(ErrorType.PRODUCT_NOT_FOUND, barcode)
+
+            template = self._corpus[zlib.crc32(barcode.encode()) % len(self._corpus)]
+            product = json.dumps({**template, 'barcode': barcode}).encode()
+
+        if self.balance is not None:
+            if self.balance <= 0:
+                return self._error(ErrorType.EMPTY_BALANCE, barcode)
+
+            self.balance -= 1
+
+        balance = self.balance if self.balance is not None else 1_000_000_000
+        return 200, {'Content-Type': 'application/json'}, b'{"balance": %d, "product": %s}' % (balance, product)
+
+    def _take_token(self) -> Optional[float]:
+        """
+        Takes a token of the rate limit bucket, returns seconds until the next token if the bucket is empty.
+        """
+        if self.rate_limit is None:
+            return None
+
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._tokens_updated_at) * self.rate_limit)
+        self._tokens_updated_at = now
+
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate_limit
+
+        self._tokens -= 1
+        return None
+
+    def _draw_error(self) -> ErrorType | int | None:
+        if not self.error_rates:
+            return None
+
+        value = self._random.random()
+
+        for error, rate in self.error_rates.items():
+            if value < rate:
+                return error
+
+            value -= rate
+
+        return None
+
+    @staticmethod
+    def _error(error_type: ErrorType, barcode: str) -> tuple[int, dict[str, str], bytes]:
+        status_code, description = _ERROR_RESPONSES[error_type]
+        content = json.dumps({'error': {'code': status_code, 'description': description.format(barcode=barcode)}})
+        return status_code, {'Content-Type': 'application/json'}, content.encode()
+
+    @property
+    def base_url(self) -> str:
+        """
+        URL of the running HTTP server, to be passed as `base_url` to a client.
+        """
+        if self._http_server is None:
+            raise RuntimeError('Server is not started')
+
+        host, port = self._http_server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Starts a threaded HTTP server in the background, port 0 picks a free port.
+
+        :return: Base URL of the server.
+        """
+        fake_server = self
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._handle(send_body=True)
+
+            def do_HEAD(self):
+                self._handle(send_body=False)
+
+            def _handle(self, send_body: bool) -> None:
+                latency, status_code, headers, content = fake_server.respond(
+                    self.command, urllib.parse.unquote(urllib.parse.urlsplit(self.path).path),
+                    self.headers.get('Authorization')
+                )
+                time.sleep(latency)
+
+                self.send_response(status_code)
+
+                for name, value in headers.items():
+                    self.send_header(name, value)
+
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+
+                if send_body:
+                    self.wfile.write(content)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._http_server = http.server.ThreadingHTTPServer((host, port), RequestHandler)
+        self._http_server.daemon_threads = True
+        self._http_thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+        self._http_thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._http_server is None:
+            return
+
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._http_thread.join()
+        self._http_server = None
+        self._http_thread = None
+
+    def __enter__(self) -> 'FakeEandbServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+def _parse_error_rate(value: str) -> tuple[ErrorType | int, float]:
+    error, _, rate = value.partition('=')
+    return (int(error) if error.isdigit() else ErrorType[error.upper()]), float(rate)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m eandb.testing', description='Runs a local fake EAN-DB API server for load testing.'
+    )
+    parser.add_argument('corpus', help='Directory of JSON product responses, e.g. tests/samples')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--serve-any-barcode', action='store_true', help='Answer unknown barcodes with corpus products')
+    parser.add_argument('--jwt', help='Accepted token, any token by default')
+    parser.add_argument('--balance', type=int, help='Initial account balance, unlimited by default')
+    parser.add_argument('--latency', type=float, default=0.0, help='Median latency in seconds')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Spread of log-normal latency')
+    parser.add_argument(
+        '--error', type=_parse_error_rate, action='append', default=[], metavar='ERROR=RATE',
+        help='Injected error rate by error type or status code, e.g. PRODUCT_NOT_FOUND=0.1 or 503=0.01'
+    )
+    parser.add_argument('--rate-limit', type=float, help='Maximum requests per second')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeEandbServer(
+        corpus=args.corpus,
+        serve_any_barcode=args.serve_any_barcode,
+        jwt=args.jwt,
+        balance=args.balance,
+        latency=lognormal_latency(args.latency, args.latency_sigma) if args.latency else None,
+        error_rates=dict(args.error),
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    print(f'Serving on {server.start(args.host, args.port)}', file=sys.stderr)
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
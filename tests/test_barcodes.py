@@ -0,0 +1,113 @@
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.barcodes import (
+    BarcodeType, get_barcode_types, is_valid_barcode, validate_barcodes, filter_valid_barcodes, canonicalize_barcode
+)
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient, LRUProductCache
+from eandb.models.v2 import EandbResponse, ErrorType
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+@pytest.mark.parametrize('barcode, barcode_types', [
+    ('4006381333931', [BarcodeType.EAN13]),
+    ('9780306406157', [BarcodeType.EAN13, BarcodeType.ISBN13]),
+    ('036000291452', [BarcodeType.UPCA]),
+    ('96385074', [BarcodeType.EAN8]),
+    ('04252614', [BarcodeType.UPCE]),
+    ('0306406152', [BarcodeType.ISBN10]),
+    ('080442957X', [BarcodeType.ISBN10]),
+    ('4006381333932', []),
+    ('036000291453', []),
+    ('0306406153', []),
+    ('123', []),
+    ('TEST', []),
+    ('40063813339３', []),
+    ('', []),
+])
+def test_get_barcode_types(barcode: str, barcode_types: list[BarcodeType]):
+    assert get_barcode_types(barcode) == barcode_types
+    assert is_valid_barcode(barcode) is bool(barcode_types)
+
+
+def test_validate_barcodes():
+    barcodes = ['4006381333931', 'TEST', '96385074', '4006381333932']
+
+    assert validate_barcodes(barcodes) == [True, False, True, False]
+    assert filter_valid_barcodes(barcodes) == (['4006381333931', '96385074'], ['TEST', '4006381333932'])
+
+
+def _check_invalid_barcode(product_response: EandbResponse):
+    assert isinstance(product_response, EandbResponse)
+    assert product_response.error.code == 400
+    assert product_response.error.description == 'Invalid barcode: 4006381333932'
+    assert product_response.get_error_type() == ErrorType.INVALID_BARCODE
+
+
+def test_invalid_barcode_sync(httpx_mock: HTTPXMock):
+    with EandbV2SyncClient(jwt='TEST', validate_barcodes=True) as client:
+        _check_invalid_barcode(client.get_product('4006381333932'))
+        results = list(client.iter_products(['4006381333932'], ordered=True))
+
+    _check_invalid_barcode(results[0][1])
+    assert not httpx_mock.get_requests()
+
+
+@pytest.mark.asyncio
+async def test_invalid_barcode_async(httpx_mock: HTTPXMock):
+    async with EandbV2AsyncClient(jwt='TEST', validate_barcodes=True) as client:
+        _check_invalid_barcode(await client.get_product('4006381333932'))
+        results = await client.get_products(['4006381333932'])
+
+    _check_invalid_barcode(results['4006381333932'])
+    assert not httpx_mock.get_requests()
+
+
+@pytest.mark.parametrize('barcode, canonical_barcode', [
+    ('4006381333931', '4006381333931'),
+    (' 400-6381-33393-1 ', '4006381333931'),
+    ('036000291452', '0036000291452'),
+    ('04252614', '0042100005264'),
+    ('96385074', '96385074'),
+    ('0-306-40615-2', '9780306406157'),
+    ('080442957X', '9780804429573'),
+    ('TE ST', 'TEST'),
+])
+def test_canonicalize_barcode(barcode: str, canonical_barcode: str):
+    assert canonicalize_barcode(barcode) == canonical_barcode
+
+
+def _product_response_for(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json=_BASIC_PRODUCT)
+
+
+def test_canonical_barcodes_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_product_response_for, is_reusable=True)
+
+    with EandbV2SyncClient(jwt='TEST', canonicalize_barcodes=True, cache=LRUProductCache()) as client:
+        results = client.get_products(['036000291452', '0036000291452', '0-306-40615-2', '9780306406157'])
+        product_response = client.get_product('9780306406157')
+
+    assert [request.url.path for request in httpx_mock.get_requests()] == [
+        '/api/v2/product/0036000291452', '/api/v2/product/9780306406157'
+    ]
+    assert list(results) == ['036000291452', '0036000291452', '0-306-40615-2', '9780306406157']
+    assert results['036000291452'] is results['0036000291452']
+    assert results['0-306-40615-2'] is results['9780306406157'] is product_response
+
+
+@pytest.mark.asyncio
+async def test_canonical_barcodes_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_product_response_for, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST', canonicalize_barcodes=True) as client:
+        results = await client.get_products(['036000291452', '0036000291452'])
+        barcodes = [barcode async for barcode, _ in client.iter_products(['0-306-40615-2', '9780306406157'])]
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert results['036000291452'] is results['0036000291452']
+    assert barcodes == ['0-306-40615-2']
@@ -0,0 +1,45 @@
+import json
+
+from benchmarks import __main__ as benchmarks_main
+from benchmarks import client, imports, parsing
+from eandb.models.v2 import ProductResponse
+
+
+def test_enlarge():
+    data = json.load(open('tests/samples/ingredients.json'))
+    enlarged = parsing.enlarge(data, 10)
+
+    assert enlarged == parsing.enlarge(data, 10)
+    assert len(enlarged['product']['categories']) == 10 * len(data['product']['categories'])
+    assert 5 < len(json.dumps(enlarged)) / len(json.dumps(data)) < 15
+    assert ProductResponse.model_validate(enlarged).product.barcode == data['product']['barcode']
+
+
+def test_parsing_benchmark():
+    results = parsing.run(repeat=2, target_time=0.001, factors=(1,))
+
+    assert len(results) == 2 * len(list(parsing.SAMPLES_DIR.glob('*.json')))
+    assert all(result.memory_bytes > 0 and len(result.timings) == 2 for result in results)
+
+
+def test_client_benchmark(tmp_path, capsys):
+    assert client.get_barcodes(5) == client.get_barcodes(5)
+
+    baseline = tmp_path / 'baseline.json'
+    assert benchmarks_main.main(['client', '--quick', '--repeat', '1', '-o', str(baseline)]) == 0
+
+    report = json.loads(baseline.read_text())
+    assert report['environment']['packages']['pydantic']
+    assert {result['name'] for result in report['results']} >= {'client.sync.basic', 'client.async.food.lazy'}
+
+    assert benchmarks_main.main(
+        ['client', '--quick', '--repeat', '1', '--compare', str(baseline), '--threshold', '100']
+    ) == 0
+    assert 'client.sync.basic' in capsys.readouterr().err
+
+
+def test_imports_benchmark():
+    results = imports.run(repeat=1)
+
+    assert [result.name for result in results] == ['import.models', 'import.clients', 'first_call.sync']
+    assert all(0 < result.best < 10 for result in results)
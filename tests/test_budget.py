@@ -0,0 +1,161 @@
+import contextlib
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient, BudgetManager, BudgetExhaustedError
+from eandb.models.v2 import ProductResponse, EandbResponse, Error
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+def _balance_countdown(balance: int):
+    def _response_for(request: httpx.Request) -> httpx.Response:
+        nonlocal balance
+
+        if balance <= 0:
+            return httpx.Response(403, json={'error': {'code': 403, 'description': 'Your account balance is empty'}})
+
+        balance -= 1
+        barcode = request.url.path.rsplit('/', 1)[-1]
+        return httpx.Response(
+            200, json={**_BASIC_PRODUCT, 'balance': balance, 'product': {**_BASIC_PRODUCT['product'], 'barcode': barcode}}
+        )
+
+    return _response_for
+
+
+def test_budget_manager():
+    budget = BudgetManager(spend_limit=2)
+
+    assert budget.balance is None
+    assert budget.remaining == 2
+
+    budget.reserve()
+    budget.reserve()
+
+    with pytest.raises(BudgetExhaustedError):
+        budget.reserve()
+
+    budget.release()
+    budget.commit(ProductResponse.model_validate({**_BASIC_PRODUCT, 'balance': 100}))
+
+    assert budget.spent == 1
+    assert budget.reserved == 0
+    assert budget.balance == 100
+    assert budget.remaining == 1
+
+
+def test_budget_manager_balance():
+    budget = BudgetManager(min_balance=10)
+    budget.update_balance(12)
+
+    budget.reserve()
+    budget.reserve()
+
+    assert budget.is_exhausted()
+
+    budget.commit(EandbResponse(error=Error(code=403, description='Your account balance is empty')))
+
+    assert budget.balance == 0
+    assert budget.spent == 0
+    assert budget.reserved == 1
+
+
+def test_budget_manager_job():
+    budget = BudgetManager()
+    budget.update_balance(3)
+    job = budget.job(spend_limit=10)
+
+    for _ in range(3):
+        job.reserve()
+
+    with pytest.raises(BudgetExhaustedError):
+        job.reserve()
+
+    assert budget.reserved == 3
+    assert job.reserved == 3
+
+    job.commit(ProductResponse.model_validate({**_BASIC_PRODUCT, 'balance': 2}))
+
+    assert job.spent == 1
+    assert budget.spent == 1
+    assert job.balance == budget.balance == 2
+
+
+def test_budget_manager_burn_rate():
+    budget = BudgetManager()
+
+    assert budget.burn_rate is None
+
+    budget.update_balance(100)
+    budget._balance_history[0] = (budget._balance_history[0][0] - 10, 100)
+    budget.update_balance(50)
+
+    assert 4.5 < budget.burn_rate <= 5
+
+
+def test_get_product_budget_exhausted_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_balance_countdown(1), is_reusable=True)
+
+    with EandbV2SyncClient(jwt='TEST', budget=BudgetManager()) as client:
+        assert isinstance(client.get_product('1'), ProductResponse)
+
+        with pytest.raises(BudgetExhaustedError):
+            client.get_product('2')
+
+        assert client.budget.balance == 0
+        assert client.budget.reserved == 0
+
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_get_products_budget_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_balance_countdown(100), is_reusable=True)
+    budget = BudgetManager(spend_limit=5)
+    barcodes = [str(i) for i in range(20)]
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        results = client.get_products(barcodes, concurrency=3, budget=budget)
+
+    assert len(results) == 5
+    assert all(isinstance(result, ProductResponse) for result in results.values())
+    assert len(httpx_mock.get_requests()) == 5
+    assert budget.spent == 5
+    assert budget.reserved == 0
+    assert budget.balance == 95
+
+
+@pytest.mark.asyncio
+async def test_get_products_budget_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_balance_countdown(7), is_reusable=True)
+    budget = BudgetManager(min_balance=2)
+    budget.update_balance(7)
+    barcodes = [str(i) for i in range(20)]
+
+    async with EandbV2AsyncClient(jwt='TEST', budget=budget) as client:
+        results = await client.get_products(barcodes, concurrency=3)
+
+    assert len(results) == 5
+    assert len(httpx_mock.get_requests()) == 5
+    assert budget.balance == 2
+    assert budget.reserved == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(assert_all_responses_were_requested=False)
+async def test_iter_products_early_exit_releases_budget_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_balance_countdown(100), is_reusable=True)
+    budget = BudgetManager()
+    # Invalid barcode is yielded right away, before requests of previous barcodes are started
+    barcodes = ['4006381333931', '5901234123457', 'INVALID', '96385074']
+
+    async with EandbV2AsyncClient(jwt='TEST', budget=budget, validate_barcodes=True) as client:
+        async with contextlib.aclosing(client.iter_products(barcodes, concurrency=5)) as results:
+            async for barcode, _ in results:
+                assert barcode == 'INVALID'
+                break
+
+    assert budget.reserved == 0
@@ -0,0 +1,99 @@
+import json
+
+import httpx
+from pytest_httpx import HTTPXMock
+
+from eandb.cli import main
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+def _response_for(request: httpx.Request) -> httpx.Response:
+    barcode = request.url.path.rsplit('/', 1)[-1]
+
+    if barcode == 'MISSING':
+        return httpx.Response(404, json={'error': {'code': 404, 'description': f'Product not found: {barcode}'}})
+
+    return httpx.Response(200, json={**_BASIC_PRODUCT, 'product': {**_BASIC_PRODUCT['product'], 'barcode': barcode}})
+
+
+def _requested_barcodes(httpx_mock: HTTPXMock) -> list[str]:
+    return [request.url.path.rsplit('/', 1)[-1] for request in httpx_mock.get_requests()]
+
+
+def _read_records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_cli_jsonl(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    input_path = tmp_path / 'barcodes.txt'
+    input_path.write_text('1\n2\n\nMISSING\n1\n')
+    output_path = tmp_path / 'products.jsonl'
+
+    assert main([str(input_path), '-o', str(output_path), '--jwt', 'TEST', '--concurrency', '2']) == 0
+
+    records = {record['barcode']: record for record in _read_records(output_path)}
+
+    assert sorted(_requested_barcodes(httpx_mock)) == ['1', '2', 'MISSING']
+    assert len(_read_records(output_path)) == 4
+    assert records['1']['product']['titles']['en'] == _BASIC_PRODUCT['product']['titles']['en']
+    assert records['MISSING']['error']['code'] == 404
+
+
+def test_cli_csv(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    input_path = tmp_path / 'barcodes.txt'
+    input_path.write_text('1\nMISSING\n')
+    output_path = tmp_path / 'products.csv'
+
+    assert main([str(input_path), '-o', str(output_path), '--jwt', 'TEST', '--format', 'csv']) == 0
+
+    lines = sorted(output_path.read_text().splitlines())
+
+    assert lines[-1] == 'barcode,title,categories,manufacturer,error'
+    assert lines[0].startswith(f'1,{_BASIC_PRODUCT["product"]["titles"]["en"]},')
+    assert lines[1] == 'MISSING,,,,Product not found: MISSING'
+
+
+def test_cli_resume(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    barcodes = [str(i) for i in range(20)]
+    input_path = tmp_path / 'barcodes.txt'
+    input_path.write_text('\n'.join(barcodes) + '\n')
+    output_path = tmp_path / 'products.jsonl'
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    args = [
+        str(input_path), '-o', str(output_path), '--jwt', 'TEST', '--concurrency', '3',
+        '--checkpoint', str(checkpoint_path), '--checkpoint-interval', '2'
+    ]
+
+    # Run is stopped by the spend limit, remaining barcodes are left for the next run
+    assert main([*args, '--spend-limit', '7']) == 3
+    assert len(_read_records(output_path)) == 7
+
+    assert main(args) == 0
+
+    assert sorted(_requested_barcodes(httpx_mock)) == sorted(barcodes)
+    assert sorted(record['barcode'] for record in _read_records(output_path)) == sorted(barcodes)
+    assert json.loads(checkpoint_path.read_text()) == {
+        'input_line': 20, 'output_offset': output_path.stat().st_size, 'done': []
+    }
+
+
+def test_cli_resume_after_crash(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    input_path = tmp_path / 'barcodes.txt'
+    input_path.write_text('1\n2\n3\n4\n3\n')
+    output_path = tmp_path / 'products.jsonl'
+    checkpoint_path = tmp_path / 'checkpoint.json'
+
+    # Result of 3 was written after the last checkpoint, result of 2 was cut off by the crash
+    output_path.write_bytes(b'{"barcode": "1", "product": {}}\n{"barcode": "3", "product": {}}\n{"barcode": "2", "pro')
+    checkpoint_path.write_text(json.dumps({'input_line': 1, 'output_offset': 32, 'done': []}))
+
+    args = [str(input_path), '-o', str(output_path), '--jwt', 'TEST', '--checkpoint', str(checkpoint_path)]
+    assert main(args) == 0
+
+    assert sorted(_requested_barcodes(httpx_mock)) == ['2', '3', '4']
+    assert sorted(record['barcode'] for record in _read_records(output_path)) == ['1', '2', '3', '3', '4']
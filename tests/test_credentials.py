@@ -0,0 +1,136 @@
+import asyncio
+import collections
+import json
+import time
+
+import httpx
+import pytest
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, Credential, CredentialPool, CredentialsExhaustedError
+)
+from eandb.models.v2 import ProductResponse, ErrorType
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+class _Accounts:
+    """
+    Answers like the API for several accounts, tracking their balances and requests in flight.
+    """
+
+    def __init__(self, balances: dict[str, int], expired: tuple[str, ...] = (), delay: float = 0.0):
+        self.balances = balances
+        self.expired = expired
+        self.delay = delay
+        self.requests: collections.Counter[str] = collections.Counter()
+        self.in_flight: collections.Counter[str] = collections.Counter()
+        self.max_in_flight: collections.Counter[str] = collections.Counter()
+
+    def _response(self, jwt: str) -> httpx.Response:
+        self.requests[jwt] += 1
+
+        if jwt in self.expired:
+            return httpx.Response(403, json={'error': {'code': 403, 'description': 'JWT expired'}})
+
+        if not self.balances[jwt]:
+            return httpx.Response(403, json={'error': {'code': 403, 'description': 'Your account balance is empty'}})
+
+        self.balances[jwt] -= 1
+        return httpx.Response(200, json={**_BASIC_PRODUCT, 'balance': self.balances[jwt]})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        return self._response(request.headers['Authorization'].removeprefix('Bearer '))
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        jwt = request.headers['Authorization'].removeprefix('Bearer ')
+        self.in_flight[jwt] += 1
+        self.max_in_flight[jwt] = max(self.max_in_flight[jwt], self.in_flight[jwt])
+
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[jwt] -= 1
+
+        return self._response(jwt)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_per_token():
+    accounts = _Accounts({'A': 100, 'B': 100, 'C': 100}, delay=0.05)
+    pool = CredentialPool(['A', 'B', 'C'], max_concurrency=2)
+
+    async with EandbV2AsyncClient(credentials=pool, transport=httpx.MockTransport(accounts.async_handler)) as client:
+        started_at = time.monotonic()
+        results = await client.get_products([str(i) for i in range(12)], concurrency=12)
+
+    assert all(isinstance(result, ProductResponse) for result in results.values())
+    # Six requests are in flight at a time, so twelve requests take two round trips
+    assert time.monotonic() - started_at < 0.25
+    assert accounts.requests == {'A': 4, 'B': 4, 'C': 4}
+    assert accounts.max_in_flight == {'A': 2, 'B': 2, 'C': 2}
+    assert pool.balance == 288
+
+
+def test_retry_with_other_token():
+    accounts = _Accounts({'A': 10, 'B': 10}, expired=('A',))
+    pool = CredentialPool(['A', 'B'])
+
+    with EandbV2SyncClient(credentials=pool, transport=httpx.MockTransport(accounts.handler)) as client:
+        results = client.get_products([str(i) for i in range(4)], concurrency=1)
+
+    assert all(isinstance(result, ProductResponse) for result in results.values())
+    assert accounts.requests == {'A': 1, 'B': 4}
+    assert [credential.error_type for credential in pool.credentials] == [ErrorType.JWT_EXPIRED, None]
+    assert [credential.jwt for credential in pool.available] == ['B']
+
+
+@pytest.mark.asyncio
+async def test_balance_tracking():
+    accounts = _Accounts({'A': 1, 'B': 2, 'C': 0})
+    pool = CredentialPool(['A', 'B', 'C'])
+
+    async with EandbV2AsyncClient(credentials=pool, transport=httpx.MockTransport(accounts.async_handler)) as client:
+        results = await client.get_products([str(i) for i in range(4)], concurrency=1)
+
+        # C fails with `EMPTY_BALANCE` and the request is retried with B
+        assert [isinstance(results[str(i)], ProductResponse) for i in range(3)] == [True, True, True]
+        assert isinstance(results['3'], CredentialsExhaustedError)
+
+        with pytest.raises(CredentialsExhaustedError):
+            await client.get_product('4')
+
+        # Tokens which reported zero balance are not tried again
+        assert accounts.requests == {'A': 1, 'B': 2, 'C': 1}
+        assert [credential.error_type for credential in pool.credentials] == [ErrorType.EMPTY_BALANCE] * 3
+
+        accounts.balances['B'] = 5
+        pool.restore('B')
+        assert isinstance(await client.get_product('5'), ProductResponse)
+        assert pool.balance == 4
+
+
+def test_rate_per_token():
+    accounts = _Accounts({'A': 100, 'B': 100})
+    pool = CredentialPool(['A', Credential(jwt='B', rate=10, burst=1)], rate=20, burst=1)
+
+    with EandbV2SyncClient(credentials=pool, transport=httpx.MockTransport(accounts.handler)) as client:
+        started_at = time.monotonic()
+        results = client.get_products([str(i) for i in range(9)], concurrency=4)
+        elapsed = time.monotonic() - started_at
+
+    assert all(isinstance(result, ProductResponse) for result in results.values())
+    # 30 requests per second together, the first request of each token is sent at once
+    assert 0.2 <= elapsed < 0.5
+    assert accounts.requests['A'] > accounts.requests['B']
+
+
+def test_credential_pool_params():
+    with pytest.raises(ValueError):
+        CredentialPool([])
+
+    with pytest.raises(ValueError):
+        CredentialPool(['A'], rate=0)
+
+    with pytest.raises(ValueError):
+        EandbV2SyncClient()
@@ -0,0 +1,115 @@
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient
+from eandb.models.v2 import ProductResponse, EandbResponse, ErrorType
+from eandb.testing import FakeEandbServer, constant_latency, lognormal_latency, load_corpus
+
+_CORPUS = load_corpus('tests/samples')
+_BARCODE = '123'
+_UNKNOWN_BARCODE = '4006381333931'
+
+
+def test_corpus_sync():
+    server = FakeEandbServer(corpus='tests/samples', jwt='TEST')
+
+    with EandbV2SyncClient(jwt='TEST', transport=server.transport) as client:
+        product_response = client.get_product(_BARCODE)
+        assert isinstance(product_response, ProductResponse)
+        assert product_response.product == ProductResponse.model_validate(
+            {'balance': 0, 'product': _CORPUS[0]}
+        ).product
+
+        assert client.get_product(_UNKNOWN_BARCODE).get_error_type() == ErrorType.PRODUCT_NOT_FOUND
+        assert client.get_product('12345').get_error_type() == ErrorType.INVALID_BARCODE
+
+    with EandbV2SyncClient(jwt='OTHER', transport=server.transport) as client:
+        assert client.get_product(_BARCODE).get_error_type() == ErrorType.INVALID_JWT
+
+    assert server.requests == {200: 1, 404: 1, 400: 1, 403: 1}
+
+
+@pytest.mark.asyncio
+async def test_balance_async():
+    server = FakeEandbServer(corpus=_CORPUS, serve_any_barcode=True, balance=2)
+
+    async with EandbV2AsyncClient(jwt='TEST', transport=server.async_transport) as client:
+        first = await client.get_product(_UNKNOWN_BARCODE)
+        assert isinstance(first, ProductResponse)
+        assert first.balance == 1
+        assert first.product.barcode == _UNKNOWN_BARCODE
+
+        assert (await client.get_product(_BARCODE)).balance == 0
+        assert (await client.get_product(_BARCODE)).get_error_type() == ErrorType.EMPTY_BALANCE
+
+    assert server.balance == 0
+
+
+def test_error_rates():
+    error_rates = {ErrorType.PRODUCT_NOT_FOUND: 0.2, ErrorType.JWT_EXPIRED: 0.1, 503: 0.1}
+    server = FakeEandbServer(corpus=_CORPUS, error_rates=error_rates, seed=1)
+
+    with EandbV2SyncClient(jwt='TEST', transport=server.transport) as client:
+        results = [client.get_products([_BARCODE])[_BARCODE] for _ in range(1000)]
+
+    error_types = [result.get_error_type() for result in results if isinstance(result, EandbResponse)]
+    assert 150 < error_types.count(ErrorType.PRODUCT_NOT_FOUND) < 250
+    assert 50 < error_types.count(ErrorType.JWT_EXPIRED) < 150
+    assert 50 < sum(isinstance(result, httpx.HTTPStatusError) for result in results) < 150
+    assert sum(isinstance(result, ProductResponse) for result in results) == server.requests[200]
+
+    # The same seed gives the same responses
+    other_server = FakeEandbServer(corpus=_CORPUS, error_rates=error_rates, seed=1)
+
+    with EandbV2SyncClient(jwt='TEST', transport=other_server.transport) as client:
+        for _ in range(1000):
+            client.get_products([_BARCODE])
+
+    assert other_server.requests == server.requests
+
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    server = FakeEandbServer(corpus=_CORPUS, rate_limit=100, burst=5)
+
+    async with EandbV2AsyncClient(jwt='TEST', transport=server.async_transport) as client:
+        for _ in range(5):
+            assert isinstance(await client.get_product(_BARCODE), ProductResponse)
+
+        with pytest.raises(httpx.HTTPStatusError) as e:
+            await client.get_product(_BARCODE)
+
+        assert e.value.response.status_code == 429
+        assert e.value.response.headers['Retry-After'] == '1'
+
+        await asyncio.sleep(0.02)
+        assert isinstance(await client.get_product(_BARCODE), ProductResponse)
+
+
+def test_latency():
+    server = FakeEandbServer(corpus=_CORPUS, latency=constant_latency(0.05))
+
+    with EandbV2SyncClient(jwt='TEST', transport=server.transport) as client:
+        started_at = time.monotonic()
+        client.get_product(_BARCODE)
+        assert time.monotonic() - started_at >= 0.05
+
+    latency, rng = lognormal_latency(0.1, 0.5, maximum=0.3), random.Random(1)
+    values = sorted(latency(rng) for _ in range(1000))
+    assert 0.09 < values[500] < 0.11
+    assert values[-1] == 0.3
+
+
+def test_http_server():
+    with FakeEandbServer(corpus=_CORPUS, latency=constant_latency(0.01)) as server:
+        with EandbV2SyncClient(jwt='TEST', base_url=server.base_url) as client:
+            assert client.warmup(2) == 2
+            results = client.get_products([_BARCODE, _UNKNOWN_BARCODE], concurrency=2)
+
+    assert isinstance(results[_BARCODE], ProductResponse)
+    assert results[_UNKNOWN_BARCODE].get_error_type() == ErrorType.PRODUCT_NOT_FOUND
+    assert server.requests == {200: 3, 404: 1}
@@ -0,0 +1,83 @@
+import json
+import pathlib
+
+import pytest
+from pydantic import ValidationError
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient
+from eandb.models.v2 import ProductResponse, Product, LazyMetadata, LazyProduct, LazyProductResponse
+
+_SAMPLES = {path.stem: json.loads(path.read_text()) for path in pathlib.Path('tests/samples').glob('*.json')}
+
+
+@pytest.mark.parametrize('sample', sorted(_SAMPLES))
+def test_lazy_metadata_matches_eager(sample: str):
+    eager = ProductResponse.model_validate(_SAMPLES[sample])
+    lazy = LazyProductResponse.model_validate_json(json.dumps(_SAMPLES[sample]))
+
+    assert isinstance(lazy, ProductResponse)
+    assert isinstance(lazy.product, Product)
+    assert lazy.product.titles == eager.product.titles
+    assert lazy.product.categories == eager.product.categories
+    assert lazy.model_dump() == eager.model_dump()
+    assert lazy == eager
+    assert eager == lazy
+    assert lazy.product == eager.product
+    assert eager.product == lazy.product
+    assert lazy.to_product_response().product.metadata == eager.product.metadata
+
+    if eager.product.metadata is None:
+        assert lazy.product.metadata is None
+        return
+
+    assert isinstance(lazy.product.metadata, LazyMetadata)
+    assert lazy.product.metadata.to_metadata() == eager.product.metadata
+
+    for section in Product.Metadata.model_fields:
+        assert getattr(lazy.product.metadata, section) == getattr(eager.product.metadata, section)
+
+
+def test_lazy_metadata_validates_on_access():
+    product = LazyProduct.model_validate({
+        **_SAMPLES['basic']['product'],
+        'metadata': {'printBook': {'numPages': 'many'}, 'media': {'publicationYear': 2010}}
+    })
+
+    assert product.metadata.media.publicationYear == 2010
+    assert product.metadata.media is product.metadata.media
+
+    with pytest.raises(ValidationError):
+        product.metadata.printBook
+
+    with pytest.raises(AttributeError):
+        product.metadata.unknown
+
+
+def test_lazy_metadata_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=200, json=_SAMPLES['food'])
+
+    with EandbV2SyncClient(jwt='TEST', lazy_metadata=True) as client:
+        product_response = client.get_product('123')
+
+    assert isinstance(product_response, LazyProductResponse)
+    assert product_response.product.metadata.food.nutrimentsPer100Grams.fat.equals.value == '1'
+
+
+@pytest.mark.asyncio
+async def test_lazy_metadata_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=200, json=_SAMPLES['ingredients'])
+
+    async with EandbV2AsyncClient(jwt='TEST', lazy_metadata=True) as client:
+        product_response = await client.get_product('123')
+
+    assert isinstance(product_response, LazyProductResponse)
+    assert product_response.product.metadata.generic.ingredients[0].ingredientsGroup[1].id == 'sugar'
+
+
+def test_lazy_metadata_validated_once():
+    lazy = LazyProductResponse.model_validate(_SAMPLES['food'])
+
+    assert lazy.product.metadata.to_metadata() is lazy.product.metadata.to_metadata()
+    assert lazy != LazyProductResponse.model_validate(_SAMPLES['electric'])
+    assert lazy != ProductResponse.model_validate(_SAMPLES['electric'])
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+from eandb.models.v2.measurements import MEASUREMENT_FIELDS, normalize_measurements
+
+np = pytest.importorskip('numpy')
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+def _product(metadata: dict) -> ProductResponse:
+    return ProductResponse.model_validate({**_BASIC_PRODUCT, 'product': {**_BASIC_PRODUCT['product'], 'metadata': metadata}})
+
+
+def _measurement(value: str, unit: str, kind: str = 'equals') -> dict:
+    return {kind: {'value': value, 'unit': unit}}
+
+
+def test_measurement_fields():
+    assert MEASUREMENT_FIELDS['food.nutrimentsPer100Grams.energy'] == 'kcal'
+    assert MEASUREMENT_FIELDS['food.nutrimentsPer100Grams.sodium'] == 'g'
+    assert MEASUREMENT_FIELDS['generic.dimensions.packaging.depth'] == 'mm'
+    assert MEASUREMENT_FIELDS['generic.volume'] == 'ml'
+    assert MEASUREMENT_FIELDS['generic.power'] == 'W'
+    assert MEASUREMENT_FIELDS['electric.voltage.nominal'] == 'V'
+    assert len(MEASUREMENT_FIELDS) == 35
+
+
+def test_normalize_measurements():
+    products = [
+        _product({'generic': {'weight': {'net': _measurement('1.5', 'kilograms')}}}),
+        _product({'generic': {'weight': {'net': _measurement('250', 'grams', 'greaterThan')}}}),
+        _product({'generic': {'weight': {'net': _measurement('8', 'oz', 'lessThan')}}}),
+        _product({'generic': {'weight': {'net': _measurement('3', 'bags')}}}),
+        _product({'generic': {'weight': {'net': _measurement('n/a', 'grams')}}}),
+        _product({'food': {'nutrimentsPer100Grams': {'energy': _measurement('1046', 'kJ')}}}),
+        _product(None)
+    ]
+
+    result = normalize_measurements(products, ['generic.weight.net', 'food.nutrimentsPer100Grams.energy'])
+    weight = result['generic.weight.net']
+    energy = result['food.nutrimentsPer100Grams.energy']
+
+    assert weight.unit == 'g'
+    np.testing.assert_allclose(weight.values[:3], [1500, 250, 226.796185])
+    assert weight.missing.tolist() == [False, False, False, True, True, True, True]
+    assert weight.greater_than.tolist() == [False, True, False, False, False, False, False]
+    assert weight.less_than.tolist() == [False, False, True, False, False, False, False]
+    assert weight.unknown_unit.tolist() == [False, False, False, True, False, False, False]
+
+    assert energy.unit == 'kcal'
+    assert energy.values[5] == pytest.approx(250, rel=1e-3)
+    assert energy.missing.sum() == 6
+
+
+@pytest.mark.parametrize('sample', ['electric', 'food', 'extended'])
+def test_normalize_samples(sample: str):
+    data = json.load(open(f'tests/samples/{sample}.json'))
+    products = [ProductResponse.model_validate(data), LazyProductResponse.model_validate(data)]
+
+    result = normalize_measurements(products)
+
+    assert set(result) == set(MEASUREMENT_FIELDS)
+
+    for normalized in result.values():
+        assert normalized.values.shape == (2,)
+        np.testing.assert_array_equal(normalized.values[0], normalized.values[1])
+
+
+def test_normalize_food_sample():
+    result = normalize_measurements([ProductResponse.model_validate(json.load(open('tests/samples/food.json')))])
+
+    assert result['food.nutrimentsPer100Grams.calcium'].values[0] == pytest.approx(0.016)
+    assert result['generic.weight.unknown'].values[0] == 100
+
+
+def test_normalize_unknown_field():
+    with pytest.raises(ValueError):
+        normalize_measurements([], ['generic.color'])
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, LRUProductCache, RetryPolicy, RequestObserver, RequestTiming,
+    MetricsAggregator
+)
+from eandb.clients.v2.metrics import _Trace
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+class _Recorder(RequestObserver):
+    def __init__(self):
+        self.timings: list[RequestTiming] = []
+
+    def on_request(self, timing: RequestTiming) -> None:
+        self.timings.append(timing)
+
+
+def test_observers_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url='https://ean-db.com/api/v2/product/1', status_code=503)
+    httpx_mock.add_response(url='https://ean-db.com/api/v2/product/1', json=_BASIC_PRODUCT)
+    httpx_mock.add_response(
+        url='https://ean-db.com/api/v2/product/2',
+        status_code=404,
+        json={'error': {'code': 404, 'description': 'Product not found: 2'}}
+    )
+    recorder = _Recorder()
+    retry = RetryPolicy(backoff_base=0.01, jitter=False)
+
+    with EandbV2SyncClient(jwt='TEST', cache=LRUProductCache(), retry=retry, observers=[recorder]) as client:
+        client.get_product('1')
+        client.get_product('1')
+        client.get_product('2')
+
+    first, cached, not_found = recorder.timings
+
+    assert (first.status_code, first.error_type, first.cache, first.attempts) == (200, None, 'miss', 2)
+    assert first.queue == pytest.approx(0.01)
+    assert first.parse > 0
+    assert first.total >= first.queue + first.parse
+    assert (cached.status_code, cached.cache, cached.attempts) == (200, 'hit', 0)
+    assert (not_found.status_code, not_found.error_type) == (404, 'PRODUCT_NOT_FOUND')
+
+
+@pytest.mark.asyncio
+async def test_observers_async(httpx_mock: HTTPXMock):
+    async def _response_for(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+
+        if request.url.path.endswith('BROKEN'):
+            return httpx.Response(502)
+
+        return httpx.Response(200, json=_BASIC_PRODUCT)
+
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    recorder = _Recorder()
+    metrics = MetricsAggregator()
+
+    async with EandbV2AsyncClient(jwt='TEST', cache=LRUProductCache(), observers=[recorder, metrics]) as client:
+        await asyncio.gather(client.get_product('1'), client.get_product('1'))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_product('BROKEN')
+
+    assert sorted(timing.cache for timing in recorder.timings) == ['coalesced', 'miss', 'miss']
+    assert recorder.timings[-1].status_code == 502
+    assert recorder.timings[-1].error_type == 'HTTPStatusError'
+    assert metrics.requests == 3
+
+    prometheus = metrics.to_prometheus()
+
+    assert 'eandb_requests_total{status="200",error_type="",cache="coalesced"} 1' in prometheus
+    assert 'eandb_requests_total{status="502",error_type="HTTPStatusError",cache="miss"} 1' in prometheus
+    assert 'eandb_request_phase_seconds_bucket{phase="total",le="+Inf"} 3' in prometheus
+    assert 'eandb_request_phase_seconds_count{phase="parse"} 3' in prometheus
+
+
+def test_trace():
+    timing = RequestTiming(barcode='1')
+    trace = _Trace(timing)
+
+    for name in (
+        'connection.connect_tcp.started', 'connection.connect_tcp.complete',
+        'connection.start_tls.started', 'connection.start_tls.complete',
+        'http11.send_request_headers.started', 'http11.send_request_headers.complete',
+        'http11.receive_response_headers.started', 'http11.receive_response_headers.complete',
+        'http11.receive_response_body.started', 'http11.receive_response_body.complete'
+    ):
+        trace(name, {})
+
+    assert timing.connect > 0
+    assert timing.ttfb > 0
+    assert timing.read > 0
+
+
+def test_metrics_histogram():
+    metrics = MetricsAggregator(buckets=(0.1, 1.0))
+    metrics.on_request(RequestTiming(barcode='1', status_code=200, total=0.05))
+    metrics.on_request(RequestTiming(barcode='2', status_code=200, total=0.5))
+    metrics.on_request(RequestTiming(barcode='3', status_code=200, total=5))
+
+    prometheus = metrics.to_prometheus()
+
+    assert 'eandb_request_phase_seconds_bucket{phase="total",le="0.1"} 1' in prometheus
+    assert 'eandb_request_phase_seconds_bucket{phase="total",le="1.0"} 2' in prometheus
+    assert 'eandb_request_phase_seconds_bucket{phase="total",le="+Inf"} 3' in prometheus
+    assert 'eandb_request_phase_seconds_sum{phase="total"} 5.55' in prometheus
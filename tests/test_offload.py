@@ -0,0 +1,58 @@
+import concurrent.futures
+import json
+import threading
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from benchmarks.parsing import enlarge
+from eandb.clients.v2 import EandbV2AsyncClient
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+
+_INGREDIENTS_PRODUCT = json.load(open('tests/samples/ingredients.json'))
+_LARGE_PRODUCT = enlarge(_INGREDIENTS_PRODUCT, 20)
+
+
+class _ThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.thread_ids = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        def _call():
+            self.thread_ids.append(threading.get_ident())
+            return fn(*args, **kwargs)
+
+        return super().submit(_call)
+
+
+@pytest.mark.asyncio
+async def test_offload_large_responses(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url='https://ean-db.com/api/v2/product/1', json=_LARGE_PRODUCT)
+    httpx_mock.add_response(url='https://ean-db.com/api/v2/product/2', json=_INGREDIENTS_PRODUCT)
+    executor = _ThreadPoolExecutor()
+
+    async with EandbV2AsyncClient(jwt='TEST', offload_threshold=10_000, offload_executor=executor) as client:
+        results = await client.get_products(['1', '2'])
+
+    executor.shutdown()
+
+    assert results['1'] == ProductResponse.model_validate(_LARGE_PRODUCT)
+    assert results['2'] == ProductResponse.model_validate(_INGREDIENTS_PRODUCT)
+    # Only the large response is validated on the pool
+    assert len(executor.thread_ids) == 1
+    assert executor.thread_ids[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_offload_to_process_pool(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json=_LARGE_PRODUCT)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        async with EandbV2AsyncClient(
+            jwt='TEST', lazy_metadata=True, offload_threshold=0, offload_executor=executor
+        ) as client:
+            product_response = await client.get_product('123')
+
+    assert isinstance(product_response, LazyProductResponse)
+    assert product_response.product.metadata.food == ProductResponse.model_validate(_LARGE_PRODUCT).product.metadata.food
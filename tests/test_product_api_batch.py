@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient, LRUProductCache
+from eandb.models.v2 import ProductResponse, EandbResponse, ErrorType
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+def _product_json(barcode: str) -> dict:
+    return {**_BASIC_PRODUCT, 'product': {**_BASIC_PRODUCT['product'], 'barcode': barcode}}
+
+
+def _response_for(request: httpx.Request) -> httpx.Response:
+    barcode = request.url.path.rsplit('/', 1)[-1]
+
+    if barcode == 'MISSING':
+        return httpx.Response(404, json={'error': {'code': 404, 'description': f'Product not found: {barcode}'}})
+
+    if barcode == 'BROKEN':
+        return httpx.Response(502)
+
+    return httpx.Response(200, json=_product_json(barcode))
+
+
+def test_get_products_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        results = client.get_products(['1', '2', 'MISSING', 'BROKEN', '1', '2'])
+
+    assert len(httpx_mock.get_requests()) == 4
+    assert set(results) == {'1', '2', 'MISSING', 'BROKEN'}
+    assert isinstance(results['1'], ProductResponse)
+    assert results['2'].product.barcode == '2'
+    assert isinstance(results['MISSING'], EandbResponse)
+    assert results['MISSING'].get_error_type() == ErrorType.PRODUCT_NOT_FOUND
+    assert isinstance(results['BROKEN'], httpx.HTTPStatusError)
+
+
+@pytest.mark.asyncio
+async def test_get_products_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST') as client:
+        results = await client.get_products(['1', '2', 'MISSING', 'BROKEN', '1', '2'])
+
+    assert len(httpx_mock.get_requests()) == 4
+    assert set(results) == {'1', '2', 'MISSING', 'BROKEN'}
+    assert isinstance(results['1'], ProductResponse)
+    assert results['2'].product.barcode == '2'
+    assert isinstance(results['MISSING'], EandbResponse)
+    assert results['MISSING'].get_error_type() == ErrorType.PRODUCT_NOT_FOUND
+    assert isinstance(results['BROKEN'], httpx.HTTPStatusError)
+
+
+def test_iter_products_concurrency_sync(httpx_mock: HTTPXMock):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def _slow_response_for(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+
+        time.sleep(0.01)
+
+        with lock:
+            in_flight -= 1
+
+        return _response_for(request)
+
+    httpx_mock.add_callback(_slow_response_for, is_reusable=True)
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        barcodes = [barcode for barcode, _ in client.iter_products(map(str, range(20)), concurrency=3, ordered=True)]
+
+    assert barcodes == list(map(str, range(20)))
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_products_concurrency_async(httpx_mock: HTTPXMock):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _slow_response_for(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+        return _response_for(request)
+
+    httpx_mock.add_callback(_slow_response_for, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST') as client:
+        barcodes = [barcode async for barcode, _ in client.iter_products(map(str, range(20)), concurrency=3)]
+
+    assert sorted(barcodes, key=int) == list(map(str, range(20)))
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_products_early_exit_cancels_requests_async(httpx_mock: HTTPXMock):
+    finished = []
+
+    async def _slow_response_for(request: httpx.Request) -> httpx.Response:
+        barcode = request.url.path.rsplit('/', 1)[-1]
+        await asyncio.sleep(0.01 * (int(barcode) + 1))
+        finished.append(barcode)
+        return _response_for(request)
+
+    httpx_mock.add_callback(_slow_response_for, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST', cache=LRUProductCache()) as client:
+        async with contextlib.aclosing(client.iter_products(map(str, range(20)), concurrency=5)) as results:
+            async for barcode, _ in results:
+                break
+
+        await asyncio.sleep(0.1)
+
+    assert barcode == '0'
+    assert finished == ['0']
+    assert not client._in_flight
@@ -365,3 +365,22 @@ async def test_product_with_ingredients_metadata_async(httpx_mock: HTTPXMock):
         product_response = await client.get_product('123')
 
     _check_product_with_ingredients_metadata(product_response)
+
+
+def test_product_raw_sync(httpx_mock: HTTPXMock):
+    _set_mock(httpx_mock, 'PRODUCT_WITH_FOOD_METADATA')
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        content = client.get_product_raw('123')
+
+    assert json.loads(content) == _MOCK_RESPONSES['PRODUCT_WITH_FOOD_METADATA']
+
+
+@pytest.mark.asyncio
+async def test_product_raw_async(httpx_mock: HTTPXMock):
+    _set_mock(httpx_mock, 'PRODUCT_WITH_FOOD_METADATA')
+
+    async with EandbV2AsyncClient(jwt='TEST') as client:
+        content = await client.get_product_raw('123')
+
+    assert json.loads(content) == _MOCK_RESPONSES['PRODUCT_WITH_FOOD_METADATA']
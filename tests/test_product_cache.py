@@ -0,0 +1,175 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, CacheStats, LRUProductCache, SQLiteProductCache
+)
+from eandb.models.v2 import ProductResponse, EandbResponse, ErrorType
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+_NOT_FOUND = {'error': {'code': 404, 'description': 'Product not found: 404'}}
+_INVALID_JWT = {'error': {'code': 403, 'description': 'JWT is missing or invalid, check Authorization header'}}
+
+
+def _response_for(request: httpx.Request) -> httpx.Response:
+    barcode = request.url.path.rsplit('/', 1)[-1]
+
+    if barcode == '404':
+        return httpx.Response(404, json=_NOT_FOUND)
+
+    if barcode == '403':
+        return httpx.Response(403, json=_INVALID_JWT)
+
+    return httpx.Response(200, json=_BASIC_PRODUCT)
+
+
+def test_sqlite_cache_sync(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    cache = SQLiteProductCache(tmp_path / 'cache.sqlite')
+
+    with EandbV2SyncClient(jwt='TEST', cache=cache) as client:
+        for _ in range(3):
+            assert isinstance(client.get_product('123'), ProductResponse)
+            assert client.get_product('404').get_error_type() == ErrorType.PRODUCT_NOT_FOUND
+            assert client.get_product('403').get_error_type() == ErrorType.INVALID_JWT
+
+    assert [request.url.path for request in httpx_mock.get_requests()] == [
+        '/api/v2/product/123', '/api/v2/product/404', '/api/v2/product/403',
+        '/api/v2/product/403', '/api/v2/product/403'
+    ]
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_async(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    cache = SQLiteProductCache(tmp_path / 'cache.sqlite', not_found_ttl=None)
+
+    async with EandbV2AsyncClient(jwt='TEST', cache=cache) as client:
+        for _ in range(3):
+            product_response = await client.get_product('123')
+            assert product_response.product.barcode == '123'
+            assert isinstance(await client.get_product('404'), EandbResponse)
+
+    assert len(httpx_mock.get_requests()) == 4
+
+
+def test_sqlite_cache_ttl_and_eviction(tmp_path):
+    cache = SQLiteProductCache(tmp_path / 'cache.sqlite', ttl=0.05, max_entries=3)
+    content = json.dumps(_BASIC_PRODUCT).encode()
+
+    for barcode in ('1', '2', '3', '4', '5'):
+        cache.set(barcode, 200, content, ProductResponse.model_validate(_BASIC_PRODUCT))
+
+    assert len(cache) == 3
+    assert cache.get('1') is None
+    assert cache.get('5').content == content
+
+    time.sleep(0.06)
+
+    assert cache.get('5') is None
+
+
+def _fill_cache(path: str, start: int):
+    cache = SQLiteProductCache(path)
+
+    for i in range(start, start + 50):
+        cache.set(str(i), 200, b'{}', None)
+
+
+def test_sqlite_cache_multiprocess(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    SQLiteProductCache(path)
+
+    processes = [multiprocessing.Process(target=_fill_cache, args=(path, i * 50)) for i in range(4)]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert len(SQLiteProductCache(path)) == 200
+
+
+def test_lru_cache_eviction():
+    cache = LRUProductCache(max_entries=2)
+    product_response = ProductResponse.model_validate(_BASIC_PRODUCT)
+
+    for barcode in ('1', '2'):
+        cache.set(barcode, 200, b'', product_response)
+
+    assert cache.get('1').response is product_response
+
+    cache.set('3', 200, b'', product_response)
+
+    assert cache.get('2') is None
+    assert cache.get('1') is not None
+    assert cache.get('3').content is None
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_single_flight_async(httpx_mock: HTTPXMock):
+    async def _slow_response_for(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return _response_for(request)
+
+    httpx_mock.add_callback(_slow_response_for, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST', cache=LRUProductCache()) as client:
+        responses = await asyncio.gather(*(client.get_product('123') for _ in range(5)))
+        cached_response = await client.get_product('123')
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert all(product_response is responses[0] for product_response in responses)
+    assert cached_response is responses[0]
+    assert client.cache_stats == CacheStats(hits=1, misses=5, coalesced=4)
+
+
+def test_sqlite_cache_access_time_updates(tmp_path):
+    cache = SQLiteProductCache(tmp_path / 'cache.sqlite', access_update_interval=3600)
+    cache.set('1', 200, b'{}', None)
+
+    def _accessed_at() -> float:
+        return cache._connection().execute('SELECT accessed_at FROM products').fetchone()[0]
+
+    stored_at = _accessed_at()
+    cache.get('1')
+
+    assert _accessed_at() == stored_at
+    assert not cache._connection().in_transaction
+
+    cache.access_update_interval = 0
+    cache.get('1')
+
+    assert _accessed_at() > stored_at
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_off_event_loop_async(httpx_mock: HTTPXMock, tmp_path, monkeypatch):
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    cache = SQLiteProductCache(tmp_path / 'cache.sqlite')
+    loop_thread = threading.get_ident()
+    cache_threads = set()
+
+    for method in ('get', 'set'):
+        def _recording(*args, _method=getattr(cache, method), **kwargs):
+            cache_threads.add(threading.get_ident())
+            return _method(*args, **kwargs)
+
+        monkeypatch.setattr(cache, method, _recording)
+
+    async with EandbV2AsyncClient(jwt='TEST', cache=cache) as client:
+        await client.get_product('123')
+        await client.get_product('123')
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert cache_threads and loop_thread not in cache_threads
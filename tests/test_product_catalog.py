@@ -0,0 +1,132 @@
+import gc
+import json
+import tracemalloc
+
+from eandb.models.v2 import ProductResponse, Product, LazyProductResponse
+from eandb.models.v2.catalog import ProductCatalog, CompactProduct
+
+_EXTENDED_PRODUCT = json.load(open('tests/samples/extended.json'))
+
+
+def _product_response(barcode: str) -> ProductResponse:
+    return ProductResponse.model_validate({
+        **_EXTENDED_PRODUCT, 'product': {**_EXTENDED_PRODUCT['product'], 'barcode': barcode}
+    })
+
+
+def test_product_catalog():
+    catalog = ProductCatalog()
+    product_responses = [_product_response(str(i)) for i in range(3)]
+
+    for product_response in product_responses:
+        catalog.add(product_response)
+
+    assert len(catalog) == 3
+    assert '1' in catalog
+    assert catalog.get('4') is None
+    assert [product.barcode for product in catalog] == ['0', '1', '2']
+
+    first, second = catalog['0'], catalog['1']
+
+    assert isinstance(first, CompactProduct)
+    assert first.titles == {'en': 'Test', 'no': 'Tœst'}
+    assert first.categories[0].titles == {'en': 'Bath Toys', 'de': 'Bad-Spielzeug'}
+    assert first.manufacturer.wikidataId == 'TEST'
+    assert first.metadata.externalIds.amazonAsin == 'TEST'
+
+    assert first.categories[0] is second.categories[0]
+    assert first.categories[0].titles is second.categories[0].titles
+    assert first.manufacturer is second.manufacturer
+    assert first.relatedBrands[0] is second.relatedBrands[0]
+    assert first.barcodeDetails is second.barcodeDetails
+    assert next(iter(first.titles)) is next(iter(second.titles))
+
+
+def test_compact_product_to_product():
+    catalog = ProductCatalog()
+    product_response = _product_response('123')
+    compact_product = catalog.add(product_response)
+
+    product = compact_product.to_product()
+
+    assert isinstance(product, Product)
+    assert product == product_response.product
+    assert product.categories[0] is not compact_product.categories[0]
+
+
+def test_compact_product_to_product_lazy_metadata():
+    catalog = ProductCatalog()
+    food_product = json.load(open('tests/samples/food.json'))
+    product_response = LazyProductResponse.model_validate(food_product)
+
+    product = catalog.add(product_response).to_product()
+
+    assert product == ProductResponse.model_validate(food_product).product
+    assert isinstance(product.metadata, Product.Metadata)
+
+
+def test_product_catalog_shared_objects():
+    catalog = ProductCatalog()
+
+    for i in range(100):
+        catalog.add(_product_response(str(i)))
+
+    # barcode details, 2 categories, manufacturer and related brand
+    assert catalog.shared_objects_count == 5
+
+    basic_product = json.load(open('tests/samples/basic.json'))
+
+    for i in range(100):
+        catalog.add(ProductResponse.model_validate(
+            {**basic_product, 'product': {**basic_product['product'], 'barcode': str(i)}}
+        ))
+
+    assert catalog.shared_objects_count == 5
+
+    catalog.compact()
+
+    assert catalog.shared_objects_count == 1
+
+
+def _payloads(count: int) -> list[bytes]:
+    payloads = []
+
+    for i in range(count):
+        product = {**_EXTENDED_PRODUCT['product'], 'barcode': str(i), 'titles': {'en': f'Test {i}', 'no': f'Tœst {i}'}}
+        payloads.append(json.dumps({**_EXTENDED_PRODUCT, 'product': product}).encode())
+
+    return payloads
+
+
+def _traced_memory(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        result = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def test_product_catalog_memory():
+    payloads = _payloads(2000)
+
+    products_memory, products = _traced_memory(
+        lambda: [ProductResponse.model_validate_json(payload).product for payload in payloads]
+    )
+    del products
+
+    def _build_catalog() -> ProductCatalog:
+        catalog = ProductCatalog()
+
+        for payload in payloads:
+            catalog.add(ProductResponse.model_validate_json(payload))
+
+        return catalog
+
+    catalog_memory, catalog = _traced_memory(_build_catalog)
+
+    assert len(catalog) == 2000
+    assert catalog_memory * 3 < products_memory
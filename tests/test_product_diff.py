@@ -0,0 +1,73 @@
+import copy
+import json
+
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+from eandb.models.v2.catalog import ProductCatalog
+from eandb.models.v2.diff import SECTIONS, get_fingerprint, get_section_fingerprints, diff_products
+
+_PRODUCT = json.load(open('tests/samples/ingredients.json'))
+
+
+def _modified(change) -> ProductResponse:
+    data = copy.deepcopy(_PRODUCT)
+    change(data['product'])
+    return ProductResponse.model_validate(data)
+
+
+def test_fingerprint_is_stable():
+    product_response = ProductResponse.model_validate(_PRODUCT)
+    fingerprint = get_fingerprint(product_response)
+
+    # Changes only if serialization of products changes, which would make all stored fingerprints stale
+    assert fingerprint == '086937529df70fc7722fd9204ff781a4d0f20b27b2d843418a44b59235797dcc'
+    assert get_fingerprint(product_response.product) == fingerprint
+    assert get_fingerprint(ProductResponse.model_validate({**_PRODUCT, 'balance': 1})) == fingerprint
+    assert get_fingerprint(LazyProductResponse.model_validate(_PRODUCT)) == fingerprint
+
+    catalog = ProductCatalog()
+    catalog.add(product_response)
+    assert get_fingerprint(catalog[product_response.product.barcode]) == fingerprint
+
+
+def test_fingerprint_ignores_dict_order():
+    def add_titles(product):
+        product['titles'] = {'en': 'Title', 'de': 'Titel'}
+
+    def add_reversed_titles(product):
+        product['titles'] = {'de': 'Titel', 'en': 'Title'}
+        product['metadata'] = dict(reversed(product['metadata'].items()))
+
+    assert get_fingerprint(_modified(add_titles)) == get_fingerprint(_modified(add_reversed_titles))
+
+
+def test_diff_products():
+    old = ProductResponse.model_validate(_PRODUCT)
+
+    def change_nutriments(product):
+        product['metadata']['food']['nutrimentsPer100Grams']['fat'] = {'equals': {'value': '99', 'unit': 'grams'}}
+
+    def add_image(product):
+        product['titles']['xx'] = 'New title'
+        product['images'].append({'url': 'https://example.com/new.jpg', 'isCatalog': False, 'width': 1, 'height': 1})
+
+    def drop_metadata(product):
+        product['metadata'] = None
+
+    assert diff_products(old, old) == []
+    assert diff_products(old, _modified(change_nutriments)) == ['metadata.food']
+    assert diff_products(old, _modified(add_image)) == ['titles', 'images']
+    assert diff_products(old, _modified(drop_metadata)) == [
+        name for name in SECTIONS if name.startswith('metadata.') and name in get_section_fingerprints(old)
+    ]
+    assert get_fingerprint(_modified(change_nutriments)) != get_fingerprint(old)
+
+
+def test_diff_stored_fingerprints():
+    old = ProductResponse.model_validate(_PRODUCT)
+    stored = json.loads(json.dumps(get_section_fingerprints(old)))
+
+    def change_category(product):
+        product['categories'][0]['titles']['en'] = 'Other category'
+
+    assert diff_products(stored, old) == []
+    assert diff_products(stored, _modified(change_category)) == ['categories']
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+import pytest
+
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+from eandb.models.v2.export import ProductExporter
+
+_FOOD_PRODUCT = json.load(open('tests/samples/food.json'))
+_SAMPLES = ['apparel', 'basic', 'book', 'electric', 'extended', 'food', 'ingredients', 'media']
+
+
+def _product_responses(count: int):
+    for i in range(count):
+        product = {**_FOOD_PRODUCT['product'], 'barcode': str(i)}
+        yield ProductResponse.model_validate({**_FOOD_PRODUCT, 'product': product})
+
+
+def test_flatten_product():
+    exporter = ProductExporter(languages=['en', 'de'])
+    row = dict(zip(exporter.column_names, exporter.flatten(ProductResponse.model_validate(_FOOD_PRODUCT))))
+
+    assert row['barcode'] == _FOOD_PRODUCT['product']['barcode']
+    assert row['title_en'] == _FOOD_PRODUCT['product']['titles']['en']
+    assert row['nutriments_fat'] == 1.0
+    assert row['nutriments_fat_unit'] == 'grams'
+    assert row['nutriments_energy'] == 4.0
+    assert row['nutriments_sodium'] is None
+    assert row['dimensions_width'] is None
+    assert len(row) == len(exporter.columns)
+
+
+@pytest.mark.parametrize('sample', _SAMPLES)
+def test_flatten_samples(sample: str):
+    exporter = ProductExporter()
+    data = json.load(open(f'tests/samples/{sample}.json'))
+
+    row = exporter.flatten(ProductResponse.model_validate(data))
+
+    assert len(row) == len(exporter.columns)
+    assert exporter.flatten(LazyProductResponse.model_validate(data)) == row
+
+
+def test_export_csv():
+    exporter = ProductExporter()
+    output = io.StringIO()
+
+    assert exporter.to_csv(_product_responses(25), output, batch_size=10) == 25
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+
+    assert len(rows) == 25
+    assert rows[3]['barcode'] == '3'
+    assert rows[3]['nutriments_calcium'] == '16.0'
+    assert rows[3]['nutriments_calcium_unit'] == 'mg'
+    assert rows[3]['weight_net'] == ''
+
+
+def test_export_parquet_and_arrow(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    exporter = ProductExporter()
+    batches = list(exporter.iter_record_batches(_product_responses(25), batch_size=10))
+
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+
+    assert exporter.to_parquet(_product_responses(25), tmp_path / 'products.parquet', batch_size=10) == 25
+    table = pyarrow.parquet.read_table(tmp_path / 'products.parquet')
+
+    assert table.num_rows == 25
+    assert table.schema == exporter.get_arrow_schema()
+    assert table.column('nutriments_fat').to_pylist() == [1.0] * 25
+
+    assert exporter.to_arrow(_product_responses(25), tmp_path / 'products.arrow') == 25
+    assert pyarrow.ipc.open_file(tmp_path / 'products.arrow').read_all().equals(table)
@@ -0,0 +1,146 @@
+import concurrent.futures
+import json
+import pickle
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.cli import main as cli_main
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient, RequestObserver, RequestTiming
+from eandb.models.v2 import ProductResponse, LazyProductResponse
+from eandb.store import ProductStore, ProductStoreBuilder, main as store_main
+
+_SAMPLES = ('basic', 'food', 'book', 'ingredients')
+_PRODUCTS = {
+    f'{index:013}': {**json.load(open(f'tests/samples/{name}.json'))['product'], 'barcode': f'{index:013}'}
+    for index, name in enumerate(_SAMPLES, start=1)
+}
+
+
+class _Timings(RequestObserver, list):
+    def on_request(self, timing: RequestTiming) -> None:
+        self.append(timing)
+
+
+def _build_store(path) -> ProductStore:
+    with ProductStoreBuilder(path) as builder:
+        for barcode, product in _PRODUCTS.items():
+            builder.add(barcode, product)
+
+    return ProductStore(path)
+
+
+def _get_titles(store: ProductStore, barcode: str) -> dict[str, str]:
+    return store.get(barcode).product.titles
+
+
+def test_store_lookup(tmp_path):
+    with _build_store(tmp_path / 'products.store') as store:
+        assert len(store) == len(_PRODUCTS)
+        assert list(store) == sorted(_PRODUCTS)
+
+        for barcode, product in _PRODUCTS.items():
+            assert barcode in store
+            assert json.loads(store.get_product_raw(barcode)) == product
+            assert store.get(barcode) == ProductResponse(balance=0, product=product)
+
+        assert store.get('0000000000000') is None
+        assert store.get('1') is None
+        assert store.get('99999999999999999') is None
+        assert store.get_raw('') is None
+
+    assert not (tmp_path / 'products.store.tmp').exists()
+
+
+def test_store_last_record_wins(tmp_path):
+    barcode = next(iter(_PRODUCTS))
+
+    with ProductStoreBuilder(tmp_path / 'products.store') as builder:
+        builder.add_record({'balance': 10, 'product': _PRODUCTS[barcode]})
+        assert not builder.add_record({'barcode': '2', 'error': {'code': 404, 'description': 'Product not found: 2'}})
+        builder.add_record({'barcode': barcode, 'product': {**_PRODUCTS[barcode], 'titles': {'en': 'Updated'}}})
+        assert builder.count == 1
+
+    with ProductStore(tmp_path / 'products.store') as store:
+        assert len(store) == 1
+        assert _get_titles(store, barcode) == {'en': 'Updated'}
+
+
+def test_store_build_failure(tmp_path):
+    with pytest.raises(KeyError):
+        with ProductStoreBuilder(tmp_path / 'products.store') as builder:
+            builder.add_record({'product': {}})
+            builder.add_record({'product': {'titles': {}}})
+
+    assert list(tmp_path.iterdir()) == []
+
+    (tmp_path / 'other.json').write_text('{}')
+
+    with pytest.raises(ValueError):
+        ProductStore(tmp_path / 'other.json')
+
+
+def test_store_shared_by_processes(tmp_path):
+    store = _build_store(tmp_path / 'products.store')
+    assert pickle.loads(pickle.dumps(store)).get_raw('0000000000001') == store.get_raw('0000000000001')
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        titles = list(executor.map(_get_titles, [store] * len(_PRODUCTS), _PRODUCTS))
+
+    assert titles == [product['titles'] for product in _PRODUCTS.values()]
+
+
+def test_store_sync_client(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(
+        url='https://ean-db.com/api/v2/product/4006381333931', json=json.load(open('tests/samples/basic.json'))
+    )
+    timings = _Timings()
+
+    with EandbV2SyncClient(jwt='TEST', store=_build_store(tmp_path / 'products.store'), observers=[timings]) as client:
+        results = client.get_products(['0000000000002', '4006381333931'])
+
+        assert results['0000000000002'].product.barcode == '0000000000002'
+        assert isinstance(results['4006381333931'], ProductResponse)
+        assert client.cache_stats.store_hits == 1
+
+    assert len(httpx_mock.get_requests()) == 1
+    assert sorted(timing.cache or '' for timing in timings) == ['', 'store']
+
+
+@pytest.mark.asyncio
+async def test_store_async_client(tmp_path):
+    async with EandbV2AsyncClient(
+        jwt='TEST', store=_build_store(tmp_path / 'products.store'), lazy_metadata=True
+    ) as client:
+        product_response = await client.get_product('0000000000002')
+
+    assert isinstance(product_response, LazyProductResponse)
+    assert product_response.balance == 0
+    assert product_response.product.metadata.food == ProductResponse(
+        balance=0, product=_PRODUCTS['0000000000002']
+    ).product.metadata.food
+
+
+def test_store_cli(httpx_mock: HTTPXMock, tmp_path):
+    httpx_mock.add_response(
+        url='https://ean-db.com/api/v2/product/MISSING',
+        status_code=404,
+        json={'error': {'code': 404, 'description': 'Product not found: MISSING'}}
+    )
+    dump_path = tmp_path / 'dump.jsonl'
+    dump_path.write_text(
+        ''.join(json.dumps({'barcode': barcode, 'product': product}) + '\n' for barcode, product in _PRODUCTS.items())
+    )
+    store_path = tmp_path / 'products.store'
+
+    assert store_main([str(store_path), str(dump_path)]) == 0
+
+    input_path = tmp_path / 'barcodes.txt'
+    input_path.write_text('0000000000001\nMISSING\n')
+    output_path = tmp_path / 'products.jsonl'
+
+    assert cli_main([str(input_path), '-o', str(output_path), '--jwt', 'TEST', '--store', str(store_path)]) == 0
+
+    records = {record['barcode']: record for record in map(json.loads, output_path.read_text().splitlines())}
+    assert records['0000000000001']['product']['titles'] == _PRODUCTS['0000000000001']['titles']
+    assert records['MISSING']['error']['code'] == 404
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, HedgingPolicy, CircuitBreaker, CircuitOpenError, LRUProductCache,
+    RequestObserver, RequestTiming
+)
+from eandb.models.v2 import ProductResponse
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+class _Timings(RequestObserver, list):
+    def on_request(self, timing: RequestTiming) -> None:
+        self.append(timing)
+
+
+def _slow_first_handler(delays: list[float]):
+    """
+    Answers requests after the given delays, in order of arrival.
+    """
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        delay = delays[len(requests)]
+        requests.append(request)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=_BASIC_PRODUCT)
+
+    return handler, requests
+
+
+def test_hedging_policy_delay():
+    policy = HedgingPolicy(percentile=0.9, window=100, min_samples=10)
+    assert policy.delay is None
+
+    for i in range(1, 101):
+        policy.record(i / 100, hedged=False)
+
+    assert policy.delay == 0.9
+    assert HedgingPolicy(delay=0.2).delay == 0.2
+
+
+def test_hedging_policy_ratio():
+    policy = HedgingPolicy(delay=0.1, window=100, max_hedge_ratio=0.1)
+
+    assert policy.should_hedge()
+    assert not policy.should_hedge()
+
+    for _ in range(20):
+        policy.record(0.01, hedged=False)
+
+    assert policy.should_hedge()
+    assert not policy.should_hedge()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request():
+    handler, requests = _slow_first_handler([1.0, 0.0])
+    timings = _Timings()
+
+    async with EandbV2AsyncClient(
+        jwt='TEST', transport=httpx.MockTransport(handler), hedging=HedgingPolicy(delay=0.05), observers=[timings]
+    ) as client:
+        started_at = time.monotonic()
+        product_response = await client.get_product('123')
+
+    assert isinstance(product_response, ProductResponse)
+    assert time.monotonic() - started_at < 0.5
+    assert len(requests) == 2
+    assert timings[0].hedged
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_for_fast_request():
+    handler, requests = _slow_first_handler([0.0, 0.0])
+    policy = HedgingPolicy(delay=0.5)
+
+    async with EandbV2AsyncClient(jwt='TEST', transport=httpx.MockTransport(handler), hedging=policy) as client:
+        assert isinstance(await client.get_product('123'), ProductResponse)
+
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_after_failed_request():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+
+        if len(calls) == 1:
+            await asyncio.sleep(0.1)
+            raise httpx.ReadError('Connection reset')
+
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json=_BASIC_PRODUCT)
+
+    async with EandbV2AsyncClient(
+        jwt='TEST', transport=httpx.MockTransport(handler), hedging=HedgingPolicy(delay=0.05)
+    ) as client:
+        assert isinstance(await client.get_product('123'), ProductResponse)
+
+
+def test_circuit_breaker_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url='https://ean-db.com/api/v2/product/123', json=_BASIC_PRODUCT)
+    httpx_mock.add_response(status_code=503, is_reusable=True)
+
+    breaker = CircuitBreaker(min_requests=5, failure_rate=0.5, open_duration=60)
+    cache = LRUProductCache(ttl=0.01)
+
+    with EandbV2SyncClient(jwt='TEST', cache=cache, circuit_breaker=breaker) as client:
+        assert isinstance(client.get_product('123'), ProductResponse)
+        time.sleep(0.02)
+
+        results = client.get_products(['1', '2', '3', '4'], concurrency=1)
+        assert all(isinstance(result, httpx.HTTPStatusError) for result in results.values())
+        assert breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            client.get_product('5')
+
+        # Expired entry is served while the circuit is open
+        assert isinstance(client.get_product('123'), ProductResponse)
+        assert client.cache_stats.stale == 1
+
+    assert len(httpx_mock.get_requests()) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(assert_all_responses_were_requested=False)
+async def test_circuit_breaker_half_open_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_exception(httpx.ConnectError('Connection refused'))
+    httpx_mock.add_exception(httpx.ConnectError('Connection refused'))
+    httpx_mock.add_response(json=_BASIC_PRODUCT, is_reusable=True)
+
+    breaker = CircuitBreaker(min_requests=2, open_duration=0.05)
+
+    async with EandbV2AsyncClient(jwt='TEST', circuit_breaker=breaker) as client:
+        results = await client.get_products(['1', '2'], concurrency=1)
+        assert all(isinstance(result, httpx.ConnectError) for result in results.values())
+
+        results = await client.get_products(['3'])
+        assert isinstance(results['3'], CircuitOpenError)
+
+        await asyncio.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert isinstance(await client.get_product('4'), ProductResponse)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    assert len(httpx_mock.get_requests()) == 3
+
+
+def test_circuit_breaker_probe_failure():
+    breaker = CircuitBreaker(min_requests=1, open_duration=0, half_open_requests=2)
+
+    assert breaker.allow_request()
+    breaker.record(failed=True)
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() and breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record(failed=None)
+    assert breaker.allow_request()
+
+    breaker.record(failed=True)
+    breaker.open_duration = 60
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
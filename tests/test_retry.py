@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, RetryPolicy, AdaptiveConcurrencyLimiter, RateLimiter
+)
+from eandb.clients.v2.retry import get_retry_after
+from eandb.models.v2 import ProductResponse
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+_NO_DELAY_RETRY = RetryPolicy(max_attempts=3, backoff_base=0)
+
+
+def test_retry_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=503)
+    httpx_mock.add_exception(httpx.ConnectError('Connection refused'))
+    httpx_mock.add_response(status_code=200, json=_BASIC_PRODUCT)
+
+    with EandbV2SyncClient(jwt='TEST', retry=_NO_DELAY_RETRY) as client:
+        product_response = client.get_product('123')
+
+    assert isinstance(product_response, ProductResponse)
+    assert len(httpx_mock.get_requests()) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_exhausted_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=429, headers={'Retry-After': '0'}, is_reusable=True)
+
+    async with EandbV2AsyncClient(jwt='TEST', retry=_NO_DELAY_RETRY) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_product('123')
+
+    assert len(httpx_mock.get_requests()) == 3
+
+
+def test_no_retry_for_long_retry_after(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=429, headers={'Retry-After': '3600'})
+
+    with EandbV2SyncClient(jwt='TEST', retry=_NO_DELAY_RETRY) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get_product('123')
+
+
+def test_retry_delays():
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=False)
+
+    assert [policy.get_delay(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+    assert 0 <= RetryPolicy(backoff_base=1).get_delay(3) <= 4
+    assert policy.get_delay(1, httpx.Response(429, headers={'Retry-After': '7'})) == 7
+    assert get_retry_after(httpx.Response(429, headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})) == 0
+    assert get_retry_after(httpx.Response(429)) is None
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_limiter():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=5)
+
+    for _ in range(4):
+        await limiter.acquire()
+
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release(0.1)
+    await asyncio.sleep(0)
+    assert waiter.done()
+    assert limiter.limit == 4
+
+    for _ in range(10):
+        limiter.release(0.1)
+        await limiter.acquire()
+
+    assert limiter.limit == 5
+
+    limiter.release(0.1, congested=True)
+    assert limiter.limit == 2
+    assert limiter.in_flight == 3
+
+    # Only one decrease per round trip
+    limiter.release(0.5)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_async(httpx_mock: HTTPXMock):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _response_for(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+        return httpx.Response(429) if max_in_flight >= 3 else httpx.Response(200, json=_BASIC_PRODUCT)
+
+    httpx_mock.add_callback(_response_for, is_reusable=True)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, min_limit=1, max_limit=10)
+
+    async with EandbV2AsyncClient(jwt='TEST', concurrency_limiter=limiter) as client:
+        results = await client.get_products(map(str, range(10)), concurrency=10)
+
+    assert max_in_flight == 3
+    assert limiter.limit == 1
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=200, json=_BASIC_PRODUCT, is_reusable=True)
+    rate_limiter = RateLimiter(100, burst=5)
+
+    async with EandbV2AsyncClient(jwt='TEST', rate_limiter=rate_limiter) as client:
+        started_at = time.monotonic()
+        await client.get_products(map(str, range(15)), concurrency=15)
+        elapsed = time.monotonic() - started_at
+
+    # 5 requests are sent at once, the other 10 at 100 requests per second
+    assert len(httpx_mock.get_requests()) == 15
+    assert 0.09 <= elapsed < 1
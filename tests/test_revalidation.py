@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from eandb.clients.v2 import (
+    EandbV2SyncClient, EandbV2AsyncClient, LRUProductCache, SQLiteProductCache, StaleWhileRevalidate, CircuitBreaker,
+    RequestObserver, RequestTiming
+)
+from eandb.models.v2 import ProductResponse
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+class _Timings(RequestObserver, list):
+    def on_request(self, timing: RequestTiming) -> None:
+        self.append(timing)
+
+
+class _Upstream:
+    """
+    Answers with the current version of products in titles, with optional delay and error status.
+    """
+
+    def __init__(self):
+        self.version = 1
+        self.status_code = 200
+        self.delay = 0.0
+        self.requests = []
+
+    def _response(self) -> httpx.Response:
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+
+        product = {**_BASIC_PRODUCT['product'], 'titles': {'en': f'Version {self.version}'}}
+        return httpx.Response(200, json={**_BASIC_PRODUCT, 'product': product})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        time.sleep(self.delay)
+        return self._response()
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        return self._response()
+
+
+def _get_title(product_response: ProductResponse) -> str:
+    return product_response.product.titles['en']
+
+
+def _wait_for_refreshes(policy: StaleWhileRevalidate) -> None:
+    for _ in range(100):
+        if not policy.refreshing:
+            return
+
+        time.sleep(0.01)
+
+
+def test_stale_while_revalidate_sync():
+    upstream = _Upstream()
+    policy = StaleWhileRevalidate(soft_ttl=0.05)
+    timings = _Timings()
+
+    with EandbV2SyncClient(
+        jwt='TEST', transport=httpx.MockTransport(upstream.handler), cache=LRUProductCache(), revalidation=policy,
+        observers=[timings]
+    ) as client:
+        assert _get_title(client.get_product('123')) == 'Version 1'
+        assert _get_title(client.get_product('123')) == 'Version 1'
+        assert len(upstream.requests) == 1
+
+        time.sleep(0.06)
+        upstream.version = 2
+        upstream.delay = 0.2
+
+        started_at = time.monotonic()
+        assert _get_title(client.get_product('123')) == 'Version 1'
+        assert time.monotonic() - started_at < 0.1
+        # A refresh of the barcode is already in flight
+        assert _get_title(client.get_product('123')) == 'Version 1'
+
+        _wait_for_refreshes(policy)
+        assert _get_title(client.get_product('123')) == 'Version 2'
+
+    assert len(upstream.requests) == 2
+    assert client.cache_stats.refreshes == 1
+    assert [timing.cache for timing in timings].count('refresh') == 1
+
+
+def test_refresh_failure_serves_stale():
+    upstream = _Upstream()
+    policy = StaleWhileRevalidate(soft_ttl=0, retry_after=60)
+    breaker = CircuitBreaker(min_requests=1, open_duration=60)
+
+    with EandbV2SyncClient(
+        jwt='TEST', transport=httpx.MockTransport(upstream.handler), cache=LRUProductCache(), revalidation=policy,
+        circuit_breaker=breaker
+    ) as client:
+        assert _get_title(client.get_product('123')) == 'Version 1'
+
+        upstream.status_code = 503
+        assert _get_title(client.get_product('123')) == 'Version 1'
+        _wait_for_refreshes(policy)
+
+        # The failed barcode is not refreshed again before `retry_after`
+        assert _get_title(client.get_product('123')) == 'Version 1'
+        _wait_for_refreshes(policy)
+
+    assert len(upstream.requests) == 2
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.cache_stats.refreshes == 1
+    assert client.cache_stats.refresh_failures == 1
+
+
+def test_hard_ttl():
+    upstream = _Upstream()
+
+    with EandbV2SyncClient(
+        jwt='TEST', transport=httpx.MockTransport(upstream.handler), cache=LRUProductCache(ttl=0.05),
+        revalidation=StaleWhileRevalidate(soft_ttl=60)
+    ) as client:
+        assert _get_title(client.get_product('123')) == 'Version 1'
+
+        time.sleep(0.06)
+        upstream.version = 2
+        assert _get_title(client.get_product('123')) == 'Version 2'
+
+    assert client.cache_stats.refreshes == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_async(tmp_path):
+    upstream = _Upstream()
+    policy = StaleWhileRevalidate(soft_ttl=0.05, max_refreshes=1)
+    cache = SQLiteProductCache(str(tmp_path / 'cache.sqlite'))
+
+    async with EandbV2AsyncClient(
+        jwt='TEST', transport=httpx.MockTransport(upstream.async_handler), cache=cache, revalidation=policy
+    ) as client:
+        await client.get_products(['1', '2'])
+
+        await asyncio.sleep(0.06)
+        upstream.version = 2
+        upstream.delay = 1.0
+
+        started_at = time.monotonic()
+        results = await client.get_products(['1', '2'])
+        assert all(_get_title(result) == 'Version 1' for result in results.values())
+        assert time.monotonic() - started_at < 0.5
+
+        # Only one refresh is started at a time, the other stale entry is served without a refresh
+        await asyncio.sleep(0.05)
+        assert policy.refreshing == 1
+        assert client.cache_stats.refreshes == 1
+
+    # Refreshes in flight are cancelled on close
+    assert policy.refreshing == 0
+    assert len(upstream.requests) == 3
+
+
+def test_revalidation_requires_cache():
+    with pytest.raises(ValueError):
+        EandbV2SyncClient(jwt='TEST', revalidation=StaleWhileRevalidate(soft_ttl=1))
@@ -0,0 +1,103 @@
+import json
+import subprocess
+import sys
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from eandb.clients.v2 import EandbV2SyncClient, EandbV2AsyncClient, TransportConfig
+from eandb.clients.v2.transport import _get_default_ssl_context
+from eandb.models.v2 import ProductResponse
+
+_BASIC_PRODUCT = json.load(open('tests/samples/basic.json'))
+
+
+def test_client_kwargs_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url='https://eandb.test/api/v2/product/123', json=_BASIC_PRODUCT)
+
+    with EandbV2SyncClient(
+        jwt='TEST', base_url='https://eandb.test', headers={'Authorization': 'Bearer OTHER'}
+    ) as client:
+        assert isinstance(client.get_product('123'), ProductResponse)
+
+    assert httpx_mock.get_requests()[0].headers['Authorization'] == 'Bearer OTHER'
+
+
+@pytest.mark.asyncio
+async def test_transport_config_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(url='https://eandb.test/api/v2/product/123', json=_BASIC_PRODUCT)
+    transport = TransportConfig(max_connections=7, connect_timeout=1, read_timeout=2)
+
+    async with EandbV2AsyncClient(jwt='TEST', transport=transport, base_url='https://eandb.test') as client:
+        assert client._client.timeout == httpx.Timeout(connect=1, read=2, write=5, pool=5)
+        assert isinstance(await client.get_product('123'), ProductResponse)
+
+    assert httpx_mock.get_requests()[0].headers['Authorization'] == 'Bearer TEST'
+
+
+def test_httpx_transport():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=_BASIC_PRODUCT))
+
+    with EandbV2SyncClient(jwt='TEST', transport=transport) as client:
+        assert isinstance(client.get_product('123'), ProductResponse)
+
+
+def test_transport_config_kwargs():
+    kwargs = TransportConfig(max_connections=7, max_keepalive_connections=3, keepalive_expiry=30).get_client_kwargs()
+
+    assert kwargs['limits'] == httpx.Limits(max_connections=7, max_keepalive_connections=3, keepalive_expiry=30)
+    assert kwargs['http2'] is False
+
+
+def test_warmup_sync(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method='HEAD', url='https://ean-db.com/', is_reusable=True)
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        assert client.warmup(4) == 4
+
+    assert len(httpx_mock.get_requests()) == 4
+
+
+@pytest.mark.asyncio
+async def test_warmup_async(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(method='HEAD', url='https://ean-db.com/')
+    httpx_mock.add_exception(httpx.ConnectError('Connection refused'), method='HEAD')
+
+    async with EandbV2AsyncClient(jwt='TEST') as client:
+        assert await client.warmup(2) == 1
+
+
+def test_shared_ssl_context(monkeypatch):
+    created = []
+    create_ssl_context = httpx.create_ssl_context
+
+    def _create_ssl_context(*args, **kwargs):
+        created.append(kwargs)
+        return create_ssl_context(*args, **kwargs)
+
+    monkeypatch.setattr(httpx, 'create_ssl_context', _create_ssl_context)
+    _get_default_ssl_context.cache_clear()
+
+    for _ in range(3):
+        EandbV2SyncClient(jwt='TEST').close()
+
+    assert len(created) == 1
+    assert _get_default_ssl_context(False) is _get_default_ssl_context(False)
+
+    with EandbV2SyncClient(jwt='TEST') as client:
+        assert client._get_client_kwargs('TEST', None, {})['verify'] is _get_default_ssl_context(False)
+        # Explicit TLS settings and httpx transports are not overridden
+        assert client._get_client_kwargs('TEST', None, {'verify': False})['verify'] is False
+        assert 'verify' not in client._get_client_kwargs('TEST', httpx.MockTransport(lambda request: None), {})
+
+
+def test_deferred_model_build():
+    code = (
+        'from eandb.clients.v2 import EandbV2SyncClient\n'
+        'from eandb.models.v2 import ProductResponse\n'
+        'assert not ProductResponse.__pydantic_complete__\n'
+        'ProductResponse.model_validate_json(open("tests/samples/basic.json").read())\n'
+        'assert ProductResponse.__pydantic_complete__\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)